@@ -0,0 +1,219 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+
+class Rejected(Exception):
+    """승인 거부 (status_code: 429 속도 제한 / 503 과부하, retry_after: 재시도 권장 대기 초)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: Optional[float] = None) -> float:
+        """토큰 1개 소비. 성공하면 0, 부족하면 다음 토큰까지 기다려야 할 초"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """user_id별 토큰 버킷 (최근 사용한 max_users명까지만 유지)"""
+
+    def __init__(
+        self,
+        rate: float = settings.RATE_LIMIT_PER_USER,
+        burst: float = settings.RATE_LIMIT_BURST,
+        max_users: int = settings.RATE_LIMIT_MAX_USERS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, user_id: str) -> float:
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = TokenBucket(self.rate, self.burst)
+            if len(self.buckets) > self.max_users:
+                # 가장 오래 사용하지 않은 사용자는 다시 burst부터 시작해도 무방
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(user_id)
+        return bucket.take()
+
+
+class Ticket:
+    """승인된 요청의 처리 슬롯. degraded=True이면 vLLM 없이 검색 결과만으로 응답"""
+
+    def __init__(self, controller: "AdmissionController", deadline: float, degraded: bool):
+        self.controller = controller
+        self.deadline = deadline
+        self.degraded = degraded
+        self.started = time.monotonic()
+        self._released = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def release(self):
+        # 스트리밍 응답은 본문 종료와 background 양쪽에서 호출될 수 있어 한 번만 반영
+        if self._released:
+            return
+        self._released = True
+        self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    /analyze 앞단의 승인 제어.
+    1) user_id별 토큰 버킷 → 초과 시 429 (check_rate)
+    2) 동시 처리 슬롯(max_concurrency) + 길이 제한 대기열(max_queue) (acquire)
+    3) 예상 대기 시간(대기 순번 × 평균 처리 시간 / 슬롯 수)이 요청 deadline을 넘으면
+       대기열에 넣지 않고 즉시 검색 전용(degraded) 응답 또는 503
+    4) 일괄 분석은 생성 1건마다 같은 슬롯을 후순위로 사용 (acquire_background)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        rate_limiter: Optional[RateLimiter] = None,
+        degraded_mode: bool = settings.ADMISSION_DEGRADED_MODE,
+        initial_service_time: float = 1.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.degraded_mode = degraded_mode
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # 슬롯이 반환될 때마다 set (배치 생성 대기자 깨우기)
+        self._slot_freed = asyncio.Event()
+        self.in_flight = 0
+        self.queued = 0
+        # 처리 시간 지수 이동 평균 (예상 대기 시간 계산용)
+        self.service_time = initial_service_time
+        self.admitted = 0
+        self.degraded = 0
+        self.background = 0
+        self.rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "deadline": 0}
+
+    def expected_wait(self) -> float:
+        """지금 대기열 맨 뒤에 선 요청이 슬롯을 얻기까지의 예상 시간 (초)"""
+        if self.in_flight < self.max_concurrency:
+            return 0.0
+        return (self.queued + 1) * self.service_time / self.max_concurrency
+
+    def _reject(self, kind: str, status_code: int, reason: str, retry_after: float) -> Rejected:
+        self.rejected[kind] += 1
+        logger.warning(f"🚦 Rejected ({kind}): {reason}")
+        return Rejected(status_code, reason, retry_after)
+
+    def _degrade_or_reject(self, kind: str, reason: str, deadline: float) -> Ticket:
+        if self.degraded_mode:
+            self.degraded += 1
+            logger.warning(f"🪫 Serving retrieval-only answer: {reason}")
+            return Ticket(self, deadline, degraded=True)
+        raise self._reject(kind, 503, reason, self.expected_wait())
+
+    def check_rate(self, user_id: str):
+        """속도 제한 확인 (캐시 적중 응답도 소비). 초과 시 429 Rejected"""
+        retry_after = self.rate_limiter.check(user_id)
+        if retry_after > 0:
+            raise self._reject("rate_limited", 429, f"rate limit exceeded for '{user_id}'", retry_after)
+
+    async def acquire(self, deadline_s: float = settings.ADMISSION_DEADLINE) -> Ticket:
+        """처리 슬롯을 얻으면 Ticket 반환. 반드시 ticket.release() 호출 (degraded 티켓은 슬롯을 점유하지 않음)"""
+        deadline = time.monotonic() + deadline_s
+        if settings.ADMISSION_FORCE_DEGRADED:
+            return self._degrade_or_reject("deadline", "forced degraded mode", deadline)
+        if self.queued >= self.max_queue:
+            return self._degrade_or_reject("queue_full", f"queue full ({self.queued} waiting)", deadline)
+        expected = self.expected_wait()
+        if expected > deadline_s:
+            return self._degrade_or_reject(
+                "deadline", f"expected wait {expected:.2f}s exceeds deadline {deadline_s:.2f}s", deadline
+            )
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=deadline_s)
+        except asyncio.TimeoutError:
+            raise self._reject("deadline", 503, f"no slot within deadline {deadline_s:.2f}s", self.expected_wait())
+        finally:
+            self.queued -= 1
+            # 대기열이 비면 양보 중이던 배치 생성이 다시 슬롯을 확인
+            self._slot_freed.set()
+        self.in_flight += 1
+        self.admitted += 1
+        return Ticket(self, deadline, degraded=False)
+
+    async def acquire_background(self) -> Ticket:
+        """
+        일괄 분석 생성 1건용 슬롯. 대화형 요청과 같은 슬롯을 쓰므로 예상 대기 시간에 반영되고,
+        대화형 요청이 대기열에 있는 동안에는 슬롯을 가져가지 않고 양보합니다 (deadline/거절 없음).
+        """
+        while self.queued > 0 or self._slots.locked():
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        await self._slots.acquire()
+        self.in_flight += 1
+        self.background += 1
+        return Ticket(self, math.inf, degraded=False)
+
+    def expired(self, ticket: Ticket) -> Rejected:
+        """슬롯을 얻은 뒤 처리 중 deadline을 넘긴 요청 (503)"""
+        return self._reject("deadline", 503, "deadline exceeded while processing", self.expected_wait())
+
+    def _release(self, ticket: Ticket):
+        if ticket.degraded:
+            return
+        elapsed = time.monotonic() - ticket.started
+        self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+        self.in_flight -= 1
+        self._slots.release()
+        self._slot_freed.set()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "service_time_ms": round(self.service_time * 1000, 1),
+            "expected_wait_ms": round(self.expected_wait() * 1000, 1),
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "background": self.background,
+            "rejected": dict(self.rejected),
+        }
+
+
+# 프로세스(워커) 전역 승인 제어기
+admission = AdmissionController()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import click
+from loguru import logger
+
+from cine_analyst.app.agents.workflow import choose_store, generate_answer, merge_results
+from cine_analyst.app.cache import response_cache
+from cine_analyst.common.config import settings
+from cine_analyst.common.resilience import CircuitOpen, breakers
+from cine_analyst.common.schemas import AnalysisRequest, AnalysisResponse, BatchAnalysisItem
+from cine_analyst.common.telemetry import span
+from cine_analyst.rag.registry import stores
+
+# 생성 1건마다 호출해 release()가 있는 슬롯(Ticket)을 받는 함수 (admission.acquire_background)
+Admit = Callable[[], Awaitable]
+
+
+async def _search_batch_once(kind: str, queries: List[str], k: int) -> List[list]:
+    async with stores.alease(kind) as store:
+        return await store.asearch_batch(queries, k=k)
+
+
+async def _retrieve_batch(kind: str, queries: List[str], k: int, timeout: float) -> List[list]:
+    # 단건 검색과 같은 차단기를 공유하되, 배치 지연은 헤지 기준(p95) 표본에서 제외
+    with span(f"store.{kind}.search_batch") as store_span:
+        results = await breakers.get(kind).call(
+            lambda: _search_batch_once(kind, queries, k), timeout=timeout, sample=False
+        )
+        store_span.size = sum(len(r) for r in results)
+    return results
+
+
+async def _retrieve_batch_branch(kind: str, queries: List[str], k: int, timeout: float) -> List[list]:
+    """실패하거나 느린 저장소는 청크 전체를 빈 결과로 처리 (다른 저장소 결과로 계속 진행)"""
+    try:
+        return await _retrieve_batch(kind, queries, k, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ {kind} batch retrieval timed out after {timeout:.1f}s ({len(queries)} queries)")
+    except CircuitOpen as e:
+        logger.warning(f"⛔ {kind} batch retrieval skipped: {e}")
+    except Exception as e:
+        logger.error(f"❌ {kind} batch retrieval failed: {str(e)}")
+    return [[] for _ in queries]
+
+
+async def retrieve_batch(
+    queries: List[str],
+    k: int = settings.RETRIEVAL_TOP_K,
+    timeout: float = settings.BATCH_RETRIEVE_TIMEOUT,
+) -> List[Dict]:
+    """
+    청크의 모든 질의를 벡터/그래프 저장소에 각각 한 번씩 조회한 뒤 질의별로 병합.
+    문맥 순서는 단건 경로와 같이 Planner 규칙(choose_store)으로 정합니다.
+    """
+    vector, graph = await asyncio.gather(
+        _retrieve_batch_branch("vector", queries, k, timeout),
+        _retrieve_batch_branch("graph", queries, k, timeout),
+    )
+    merged = []
+    for query, vector_hits, graph_hits in zip(queries, vector, graph):
+        first, second = (graph_hits, vector_hits) if choose_store(query) == "graph" else (vector_hits, graph_hits)
+        merged.append(merge_results([*first, *second]))
+    return merged
+
+
+async def _generate(
+    index: int, request: AnalysisRequest, state: Dict, slots: asyncio.Semaphore, admit: Optional[Admit] = None
+) -> BatchAnalysisItem:
+    # 프롬프트 구성/vLLM 호출/대체 답변은 단건 분석(analyze_node)과 같은 경로 사용
+    async with slots:
+        ticket = await admit() if admit is not None else None
+        try:
+            generated = await generate_answer(state["retrieved_context"], request.query)
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    response = AnalysisResponse(
+        answer=generated["answer"],
+        context="\n".join(state["retrieved_context"]),
+        recommendations=state["recommendations"],
+        confidence_score=0.95,
+        prompt_tokens=generated["prompt_tokens"]
+    )
+    if settings.RESPONSE_CACHE_ENABLED and not generated["generation_failed"]:
+        response_cache.store(request.query, response)
+    return BatchAnalysisItem(index=index, **response.model_dump())
+
+
+async def analyze_batch(
+    requests: Sequence[AnalysisRequest],
+    chunk_size: int = settings.BATCH_CHUNK_SIZE,
+    concurrency: int = settings.BATCH_LLM_CONCURRENCY,
+    admit: Optional[Admit] = None,
+) -> AsyncIterator[BatchAnalysisItem]:
+    """
+    일괄 분석. 결과는 완료되는 순서대로 내보냅니다 (원래 위치는 index).
+    - 청크마다 질의 임베딩 encode 1회 + OpenSearch _msearch 1회 + Neo4j UNWIND 쿼리 1회
+    - 생성은 최대 concurrency개만 동시에 게이트웨이로 보내고, 그동안 다음 청크 검색을 진행
+    - admit이 주어지면 생성 1건마다 승인 제어 슬롯을 받아 대화형 요청과 처리 용량을 나눔 (API 경로)
+    - exact 응답 캐시에 있는 질의는 검색/생성 없이 바로 반환
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency)
+    generating = set()
+
+    async def generate(index: int, state: Dict):
+        try:
+            results.put_nowait(await _generate(index, requests[index], state, slots, admit))
+        except Exception as e:
+            results.put_nowait(e)
+
+    async def produce():
+        try:
+            for start in range(0, len(requests), chunk_size):
+                chunk = []
+                for index in range(start, min(start + chunk_size, len(requests))):
+                    cached = response_cache.lookup_exact(requests[index].query) if settings.RESPONSE_CACHE_ENABLED else None
+                    if cached is not None:
+                        results.put_nowait(BatchAnalysisItem(index=index, **cached.model_dump()))
+                    else:
+                        chunk.append(index)
+                if not chunk:
+                    continue
+
+                states = await retrieve_batch([requests[i].query for i in chunk])
+                for index, state in zip(chunk, states):
+                    task = asyncio.create_task(generate(index, state))
+                    generating.add(task)
+                    task.add_done_callback(generating.discard)
+                # 생성 대기열이 충분히 차 있으면 다음 청크 검색을 미뤄 메모리 사용량을 제한
+                while len(generating) > concurrency * 2:
+                    await asyncio.wait(list(generating), return_when=asyncio.FIRST_COMPLETED)
+        except Exception as e:
+            results.put_nowait(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        for _ in range(len(requests)):
+            item = await results.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        for task in list(generating):
+            task.cancel()
+
+
+def load_requests(path: str) -> List[AnalysisRequest]:
+    """JSONL의 각 줄을 AnalysisRequest로 파싱 (문자열 한 줄은 query로 취급)"""
+    requests = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            requests.append(AnalysisRequest(query=record) if isinstance(record, str) else AnalysisRequest(**record))
+    return requests
+
+
+async def _run_in_process(requests: List[AnalysisRequest], out) -> int:
+    """API 서버 없이 같은 lifespan(풀/이웃 테이블/워밍업)으로 일괄 분석 실행"""
+    from cine_analyst.app.main import app
+
+    written = 0
+    async with app.router.lifespan_context(app):
+        async for item in analyze_batch(requests):
+            out.write(item.model_dump_json() + "\n")
+            written += 1
+    return written
+
+
+async def _run_remote(requests: List[AnalysisRequest], out, url: str) -> int:
+    """
+    실행 중인 API 서버의 /api/v1/analyze/batch로 전송하고 NDJSON 응답을 기록.
+    BATCH_MAX_REQUESTS 단위로 나눠 보내고 index는 전체 입력 기준으로 보정합니다.
+    """
+    import httpx
+
+    written = 0
+    endpoint = f"{url.rstrip('/')}/api/v1/analyze/batch"
+    async with httpx.AsyncClient(timeout=None) as client:
+        for offset in range(0, len(requests), settings.BATCH_MAX_REQUESTS):
+            body = {"requests": [r.model_dump() for r in requests[offset:offset + settings.BATCH_MAX_REQUESTS]]}
+            async with client.stream("POST", endpoint, json=body) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    item = json.loads(line)
+                    item["index"] += offset
+                    out.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    written += 1
+    return written
+
+
+@click.command()
+@click.option('--input', 'input_path', required=True, help='AnalysisRequest JSONL 경로')
+@click.option('--output', 'output_path', default='-', help='결과 NDJSON 경로 (기본: stdout)')
+@click.option('--url', default=None, help='지정하면 실행 중인 API 서버로 전송 (예: http://localhost:8000)')
+def run_cli(input_path, output_path, url: Optional[str]):
+    """리포팅용 일괄 분석: 요청 JSONL을 읽어 결과를 NDJSON으로 기록"""
+    requests = load_requests(input_path)
+    logger.info(f"📥 Loaded {len(requests)} requests from {input_path}")
+    started = time.perf_counter()
+    out = click.open_file(output_path, "w", encoding="utf-8")
+    try:
+        if url:
+            written = asyncio.run(_run_remote(requests, out, url))
+        else:
+            written = asyncio.run(_run_in_process(requests, out))
+    finally:
+        out.close()
+    elapsed = time.perf_counter() - started
+    logger.success(f"✅ Analyzed {written} requests in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.1f} req/s)")
@@ -0,0 +1,111 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+# 요청과 무관한 고정 지시문. 항상 프롬프트 맨 앞에 두어 vLLM prefix cache를 요청 간에 재사용
+SYSTEM_PROMPT = (
+    "당신은 CineAnalyst의 영화 전문가 에이전트입니다. "
+    "제공된 문맥(Context)을 바탕으로 사용자의 질문에 친절하게 답변하세요."
+)
+
+
+class TokenCounter:
+    """
+    모델 토크나이저 기반 토큰 계산/절단.
+    토크나이저를 불러올 수 없으면 UTF-8 바이트 수 기반 보수적 추정치를 사용합니다.
+    """
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        # 한글 1자 ≈ 3바이트 ≈ 1토큰, 영문 ≈ 4자/토큰보다 넉넉하게 잡음
+        return math.ceil(len(text.encode("utf-8")) / 3)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self.tokenizer is not None:
+            ids = self.tokenizer.encode(text, add_special_tokens=False)
+            return text if len(ids) <= max_tokens else self.tokenizer.decode(ids[:max_tokens])
+        encoded = text.encode("utf-8")
+        return encoded[:max_tokens * 3].decode("utf-8", errors="ignore")
+
+
+@lru_cache(maxsize=None)
+def load_token_counter(model_name: str = settings.CONTEXT_TOKENIZER) -> TokenCounter:
+    """프로세스당 한 번 토크나이저 로드 (CONTEXT_TOKENIZER가 비어 있으면 추정치 사용)"""
+    if not model_name:
+        return TokenCounter()
+    try:
+        from transformers import AutoTokenizer
+        return TokenCounter(AutoTokenizer.from_pretrained(model_name))
+    except Exception as e:
+        logger.warning(f"⚠️ Tokenizer '{model_name}' unavailable, estimating token counts: {e}")
+        return TokenCounter()
+
+
+def project(item: Any, fields: Sequence[str] = ("title", "overview")) -> str:
+    """검색 결과에서 필요한 필드만 '제목: 줄거리' 한 줄로 투영 (dict repr 잡음 제거)"""
+    if not isinstance(item, dict):
+        return " ".join(str(item).split())
+    values = [" ".join(str(item[f]).split()) for f in fields if item.get(f)]
+    return ": ".join(values)
+
+
+def pack_context(items: Sequence[str], budget: int, counter: Optional[TokenCounter] = None):
+    """
+    순서를 유지한 채 중복을 제거하고 토큰 예산 안에 들어가는 만큼만 담음.
+    예산을 넘는 첫 항목은 남은 토큰만큼 잘라 넣고 이후 항목은 버립니다.
+    반환: (담긴 항목, 사용한 토큰 수, 버린 항목 수)
+    """
+    counter = counter or load_token_counter()
+    packed, seen, used = [], set(), 0
+    unique = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item.strip())
+
+    for i, item in enumerate(unique):
+        cost = counter.count(item) + 1  # 줄바꿈 구분자
+        if used + cost > budget:
+            head = counter.truncate(item, budget - used - 1)
+            if head:
+                packed.append(head)
+                used += counter.count(head) + 1
+            return packed, used, len(unique) - len(packed)
+        packed.append(item)
+        used += cost
+    return packed, used, 0
+
+
+@dataclass
+class PackedPrompt:
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    context_tokens: int
+    dropped: int
+
+
+def build_prompt(context: Sequence[str], query: str, budget: int = settings.CONTEXT_TOKEN_BUDGET) -> PackedPrompt:
+    """고정 지시문 → 예산 내 문맥 → 사용자 질문 순서로 chat 메시지 구성"""
+    counter = load_token_counter()
+    packed, context_tokens, dropped = pack_context(context, budget, counter)
+    system = SYSTEM_PROMPT + "\n\n문맥:\n" + "\n".join(packed)
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": query},
+    ]
+    prompt_tokens = counter.count(system) + counter.count(query)
+    return PackedPrompt(messages, prompt_tokens, context_tokens, dropped)
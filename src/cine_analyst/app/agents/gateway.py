@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from cine_analyst.app.agents.llm import VLLMClient, llm
+from cine_analyst.common.config import settings
+from cine_analyst.common.resilience import CircuitBreaker, breakers
+
+
+class GatewayMetrics:
+    """vLLM 게이트웨이 현황 (배치 크기, 대기 시간, single-flight 중복 제거 수)"""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.requests = 0
+        self.deduplicated = 0
+        self.immediate = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_batch_size = 0
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.batched_requests += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def record_wait(self, wait: float):
+        self.dispatched += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        avg_batch = self.batched_requests / self.batches if self.batches else 0.0
+        avg_wait = self.total_wait / self.dispatched if self.dispatched else 0.0
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "immediate": self.immediate,
+            "batches": self.batches,
+            "avg_batch_size": round(avg_batch, 3),
+            "max_batch_size": self.max_batch_size,
+            "avg_queue_wait_ms": round(avg_wait * 1000, 3),
+            "max_queue_wait_ms": round(self.max_wait * 1000, 3),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+@dataclass
+class _Pending:
+    key: str
+    messages: List[Dict[str, str]]
+    params: dict
+    enqueued_at: float
+    future: asyncio.Future
+
+
+class LLMGateway:
+    """
+    워크플로우와 vLLM 사이의 요청 병합 계층.
+    - single-flight: 처리 중인 동일 프롬프트(메시지 + 샘플링 파라미터)는 한 번만 호출하고 결과를 공유
+    - micro-batching: 동시성 여유가 있으면 창을 기다리지 않고 바로 발송하고, 여유가 없을 때만
+      window_ms 동안(또는 슬롯이 빌 때까지) 모인 요청을 system 프롬프트 기준으로 정렬해 한꺼번에 발송
+      (vLLM continuous batching의 같은 스케줄링 스텝에 들어가고 prefix cache를 공유하도록)
+    - max_concurrency: vLLM으로 동시에 나가는 요청 수를 제한해 KV 캐시 선점(preemption)을 방지
+    - breaker: 호출별 deadline(LLM_CALL_TIMEOUT, 스트리밍은 첫 토큰/토큰 간 대기마다) + 회로 차단기.
+      open 상태에서는 대기열에 넣지 않고 즉시 실패
+    """
+
+    def __init__(
+        self,
+        client: VLLMClient = llm,
+        max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+        window_ms: float = settings.LLM_BATCH_WINDOW_MS,
+        max_batch: int = settings.LLM_MAX_BATCH,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client = client
+        self.breaker = breaker or breakers.get("llm")
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.metrics = GatewayMetrics(max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # 발송되어 슬롯을 쥐고 있거나 기다리는 요청 수 (스트리밍 포함)
+        self._active = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    @staticmethod
+    def _key(messages: List[Dict[str, str]], params: dict) -> str:
+        raw = json.dumps([messages, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        """VLLMClient.chat과 같은 시그니처. 동일 프롬프트가 처리 중이면 그 결과를 기다림"""
+        self.metrics.requests += 1
+        self.breaker.ensure_closed()
+        key = self._key(messages, params)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.metrics.deduplicated += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # 대기자가 모두 취소되어도 예외가 '회수되지 않음' 경고로 남지 않도록 처리
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        pending = _Pending(key, messages, params, time.perf_counter(), future)
+
+        if not self._pending and self._has_capacity():
+            # 병합할 상대 없이 창을 기다리면 지연만 늘어나므로 바로 발송
+            self.metrics.immediate += 1
+            self._start([pending])
+            return await asyncio.shield(future)
+
+        self._pending.append(pending)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        # 호출자가 취소되어도 같은 프롬프트를 기다리는 다른 요청의 결과는 유지
+        return await asyncio.shield(future)
+
+    def _has_capacity(self) -> bool:
+        return self._active < self.metrics.max_concurrency
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.metrics.record_batch(len(batch))
+        # 같은 system 프롬프트끼리 연속으로 보내 prefix cache 적중률을 높임
+        batch.sort(key=lambda p: p.messages[0].get("content", "") if p.messages else "")
+        self._start(batch)
+
+    def _start(self, batch: List[_Pending]):
+        self._active += len(batch)
+        task = asyncio.ensure_future(asyncio.gather(*(self._dispatch(p) for p in batch)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _slot_freed(self):
+        self._active -= 1
+        # 경합 중 모인 배치는 창이 끝나기 전이라도 슬롯이 비는 즉시 발송
+        if self._pending and self._has_capacity():
+            self._flush()
+
+    async def _dispatch(self, pending: _Pending):
+        try:
+            async with self._semaphore:
+                self.metrics.record_wait(time.perf_counter() - pending.enqueued_at)
+                self.metrics.in_flight += 1
+                self.metrics.peak_in_flight = max(self.metrics.peak_in_flight, self.metrics.in_flight)
+                try:
+                    result = await self.breaker.call(
+                        lambda: self.client.chat(pending.messages, **pending.params),
+                        timeout=settings.LLM_CALL_TIMEOUT,
+                    )
+                finally:
+                    self.metrics.in_flight -= 1
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+        else:
+            if not pending.future.done():
+                pending.future.set_result(result)
+        finally:
+            self._inflight.pop(pending.key, None)
+            self._slot_freed()
+
+    async def stream(self, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        """스트리밍 호출도 동시성 제한을 공유 (토큰 순서가 요청마다 달라 병합하지 않음)"""
+        self.metrics.requests += 1
+        self.breaker.ensure_closed()
+        enqueued_at = time.perf_counter()
+        self._active += 1
+        try:
+            async with self._semaphore:
+                self.metrics.record_wait(time.perf_counter() - enqueued_at)
+                self.metrics.in_flight += 1
+                self.metrics.peak_in_flight = max(self.metrics.peak_in_flight, self.metrics.in_flight)
+                probe = self.breaker.before_call()
+                deltas = self.client.stream(messages, **params).__aiter__()
+                try:
+                    while True:
+                        # 첫 토큰과 이후 토큰 간 대기 모두 LLM_CALL_TIMEOUT 안에 도착해야 함
+                        try:
+                            delta = await asyncio.wait_for(deltas.__anext__(), settings.LLM_CALL_TIMEOUT)
+                        except StopAsyncIteration:
+                            break
+                        yield delta
+                except Exception:
+                    self.breaker.after_failure(probe)
+                    raise
+                except BaseException:
+                    # 클라이언트 연결 종료 등으로 스트림이 닫힌 경우
+                    self.breaker.after_cancel(probe)
+                    raise
+                else:
+                    self.breaker.after_success(probe)
+                finally:
+                    self.metrics.in_flight -= 1
+                    if hasattr(deltas, "aclose"):
+                        await deltas.aclose()
+        finally:
+            self._slot_freed()
+
+    async def drain(self):
+        """종료 시 대기 중인 배치를 발송하고 응답을 기다림"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"📮 LLM gateway drained: {self.metrics.snapshot()}")
+
+    def stats(self) -> Dict[str, float]:
+        return self.metrics.snapshot()
+
+
+# 프로세스 전역 게이트웨이 (analyze 노드 / SSE 스트리밍 공용)
+gateway = LLMGateway()
@@ -0,0 +1,78 @@
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+
+class VLLMClient:
+    """
+    vLLM(OpenAI 호환) 서버용 비동기 클라이언트.
+    httpx.AsyncClient 하나를 앱 수명 동안 공유하여 연결을 재사용합니다.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.VLLM_URL,
+        timeout: float = settings.VLLM_TIMEOUT,
+        max_connections: int = settings.VLLM_MAX_CONNECTIONS,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def build_payload(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: int = 512) -> dict:
+        return {
+            "model": settings.MODEL_NAME,  # .env 및 config에 설정된 'tuned-sql' 사용
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        """/chat/completions 호출 후 최종 답변 텍스트 반환"""
+        response = await self.client.post("/chat/completions", json=self.build_payload(messages, **params))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        """stream=True로 호출하여 chat-completion delta 토큰을 순서대로 yield"""
+        payload = {**self.build_payload(messages, **params), "stream": True}
+        async with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # OpenAI 호환 SSE 포맷: "data: {...}" / "data: [DONE]"
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("🔌 vLLM client closed")
+
+
+# 프로세스 전역 클라이언트 (app/main.py lifespan에서 종료)
+llm = VLLMClient()
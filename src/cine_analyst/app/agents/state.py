@@ -8,9 +8,19 @@ class AgentState(TypedDict):
     
     # OpenSearch 및 Neo4j에서 검색된 지식 데이터
     retrieved_context: List[str]
+
+    # 검색된 영화 제목 및 이웃 테이블 기반 추천 목록
+    retrieved_titles: List[str]
+    recommendations: List[str]
     
     # 현재 분석의 신뢰도 점수 (QoS 평가용)
     confidence_score: float
     
     # 다음에 실행할 노드 이름
-    next_step: str
\ No newline at end of file
+    next_step: str
+
+    # vLLM 호출 실패로 대체 답변을 반환했는지 여부 (응답 캐시 제외용)
+    generation_failed: bool
+
+    # analyst 프롬프트 토큰 수 (요청별 보고용)
+    prompt_tokens: int
\ No newline at end of file
@@ -1,115 +1,223 @@
+import asyncio
 import os
-import requests
+import time
+from typing import Optional
 from langgraph.graph import StateGraph, END
 from cine_analyst.app.agents.state import AgentState
-from cine_analyst.rag.vector import VectorSearch
-from cine_analyst.rag.graph import GraphSearch
+from cine_analyst.app.agents.context import build_prompt, project
+from cine_analyst.app.agents.gateway import gateway
+from cine_analyst.rag.neighbors import neighbor_index
+from cine_analyst.rag.registry import stores
 from cine_analyst.common.config import settings
+from cine_analyst.common.resilience import CircuitOpen, breakers, hedged
+from cine_analyst.common.telemetry import span, traced_node
 from loguru import logger
 
+# 감독, 배우, 관계 등 구조적 정보가 필요한 키워드
+GRAPH_KEYWORDS = ["감독", "배우", "관계", "출연", "나온", "작품"]
+
+def choose_store(query: str) -> str:
+    """질문에 구조적 정보 키워드가 있으면 graph, 아니면 vector (배치 분석에서도 재사용)"""
+    return "graph" if any(keyword in query for keyword in GRAPH_KEYWORDS) else "vector"
+
 # 노드 1: 질문 의도 분석 (Planner)
 def plan_node(state: AgentState):
-    """사용자 질문을 분석하여 벡터 검색을 할지, 그래프 검색을 할지 결정합니다."""
-    last_message = state["messages"][-1].content
-    
-    # 감독, 배우, 관계 등 구조적 정보가 필요한 키워드 탐지
-    graph_keywords = ["감독", "배우", "관계", "출연", "나온", "작품"]
-    if any(keyword in last_message for keyword in graph_keywords):
+    """사용자 질문을 분석하여 벡터/그래프 중 어느 검색 결과를 우선할지 결정합니다."""
+    next_step = choose_store(state["messages"][-1].content)
+    if next_step == "graph":
         logger.info("Decision: Graph Search (Neo4j)")
-        return {"next_step": "graph"}
-    
-    logger.info("Decision: Vector Search (OpenSearch)")
-    return {"next_step": "vector"}
-
-# 노드 2-A: 벡터 검색 (OpenSearch)
-def vector_retrieve_node(state: AgentState):
-    """비정형 텍스트 기반 시놉시스 및 리뷰 검색"""
-    query = state["messages"][-1].content
-    store = VectorSearch()
-    # 인터페이스 규격에 맞춰 search 호출
-    results = store.search(query, k=3) 
-    return {"retrieved_context": [str(r) for r in results]}
-
-# 노드 2-B: 그래프 검색 (Neo4j)
-def graph_retrieve_node(state: AgentState):
-    """지식 그래프 기반 인물-영화 관계 검색"""
-    query = state["messages"][-1].content
-    store = GraphSearch()
-    # 앞서 수정한 search(query, k=3) 인터페이스 호출
-    results = store.search(query, k=3)
-    return {"retrieved_context": [str(r) for r in results]}
+    else:
+        logger.info("Decision: Vector Search (OpenSearch)")
+    return {"next_step": next_step}
 
-# 노드 3: 결과 분석 및 답변 (Analyst - vLLM 연동)
-def analyze_node(state: AgentState):
-    """검색된 문맥을 바탕으로 vLLM(LoRA 적용 모델)을 호출하여 최종 답변 생성"""
-    context = "\n".join(state["retrieved_context"])
+def call_timeout(kind: str) -> float:
+    """저장소 호출별 deadline (초)"""
+    return settings.VECTOR_RETRIEVE_TIMEOUT if kind == "vector" else settings.GRAPH_RETRIEVE_TIMEOUT
+
+def hedge_delay(kind: str):
+    """최근 p95 지연 이후 헤지 요청 발송 (비활성화 또는 표본 부족 시 None)"""
+    if not settings.HEDGE_ENABLED:
+        return None
+    p95 = breakers.get(kind).percentile()
+    return None if p95 is None else max(p95, settings.HEDGE_MIN_DELAY)
+
+async def _search_once(kind: str, query: str, k: int):
+    # 요청마다 클라이언트를 만들지 않고 레지스트리의 풀링된 저장소를 임대
+    async with stores.alease(kind) as store:
+        return await store.asearch(query, k=k)
+
+async def _retrieve(kind: str, query: str, k: int = settings.RETRIEVAL_TOP_K, timeout: Optional[float] = None):
+    # 저장소별 회로 차단기 + 호출별 deadline, 필요 시 헤지 요청.
+    # 검색 캐시 적중은 차단기를 거치지 않아 헤지 기준(p95) 표본에 0에 가까운 지연이 섞이지 않음
+    breaker = breakers.get(kind)
+    with span(f"store.{kind}.search") as store_span:
+        results = stores.cached(kind, query, k)
+        if results is None:
+            results = await breaker.call(
+                lambda: hedged(lambda: _search_once(kind, query, k), hedge_delay(kind), breaker),
+                timeout=timeout or call_timeout(kind),
+            )
+        store_span.size = len(results)
+    return results
+
+def _title(item) -> str:
+    # 벡터 검색은 _source dict, 그래프 검색은 제목 문자열을 반환
+    return item.get("title", "") if isinstance(item, dict) else str(item)
+
+def merge_results(results) -> dict:
+    """
+    검색 결과를 문맥/제목/추천으로 정리.
+    dict 전체 대신 제목/줄거리만 투영해 프롬프트 토큰 낭비를 줄이고,
+    추천은 사전 계산된 이웃 테이블 조회로 채웁니다 (Neo4j 왕복 없음).
+    """
+    context, titles, seen = [], [], set()
+    for item in results:
+        line = project(item)
+        if line in seen:
+            continue
+        seen.add(line)
+        context.append(line)
+        if _title(item):
+            titles.append(_title(item))
+    return {
+        "retrieved_context": context,
+        "retrieved_titles": titles,
+        "recommendations": neighbor_index.recommend_many(titles),
+    }
+
+# 브랜치 deadline 이후 바깥 예산 대기가 끝나기까지의 여유 (초)
+_BUDGET_GRACE = 0.05
+
+async def _retrieve_branch(kind: str, query: str, timeout: float):
+    """
+    브랜치별 타임아웃. 느리거나 실패한 저장소는 빈 결과로 처리해 다른 브랜치 결과를 살림.
+    타임아웃은 차단기의 호출별 deadline으로 걸어 멈춘 저장소도 실패로 집계되게 합니다
+    (바깥에서 취소하면 차단기는 취소로만 보고 열리지 않음).
+    """
+    try:
+        return await _retrieve(kind, query, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ {kind} retrieval timed out after {timeout:.2f}s")
+    except CircuitOpen as e:
+        logger.warning(f"⛔ {kind} retrieval skipped: {e}")
+    except Exception as e:
+        logger.error(f"❌ {kind} retrieval failed: {str(e)}")
+    return []
+
+# 노드 2: 벡터/그래프 동시 검색 (Fan-out)
+async def parallel_retrieve_node(state: AgentState):
+    """
+    두 저장소를 동시에 조회해 검색 지연을 max(vector, graph)로 제한.
+    전체 예산(RETRIEVAL_BUDGET)을 넘긴 브랜치는 취소하고 도착한 결과만 병합하며,
+    Planner 결정은 어떤 저장소의 문맥을 앞에 둘지만 정합니다.
+    """
     query = state["messages"][-1].content
-    
-    # vLLM API URL (설정 파일의 주소 사용: http://vllm:8000/v1)
-    vllm_url = f"{settings.VLLM_URL}/chat/completions"
-    
-    payload = {
-        "model": settings.MODEL_NAME, # .env 및 config에 설정된 'tuned-sql' 사용
-        "messages": [
-            {
-                "role": "system", 
-                "content": (
-                    "당신은 CineAnalyst의 영화 전문가 에이전트입니다. "
-                    f"제공된 문맥(Context)을 바탕으로 사용자의 질문에 친절하게 답변하세요.\n\n"
-                    f"문맥: {context}"
-                )
-            },
-            {"role": "user", "content": query}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 512
+    order = ["graph", "vector"] if state.get("next_step") == "graph" else ["vector", "graph"]
+    timeouts = {"vector": settings.VECTOR_RETRIEVE_TIMEOUT, "graph": settings.GRAPH_RETRIEVE_TIMEOUT}
+    budget = settings.RETRIEVAL_BUDGET
+
+    started = time.perf_counter()
+    tasks = {
+        kind: asyncio.create_task(_retrieve_branch(kind, query, min(timeouts[kind], budget)))
+        for kind in order
     }
-    
+    # 브랜치 deadline(≤ budget)이 먼저 끝나도록 바깥 대기에는 약간의 여유를 둠
+    _, pending = await asyncio.wait(tasks.values(), timeout=budget + _BUDGET_GRACE)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    for kind in order:
+        task = tasks[kind]
+        if task in pending:
+            logger.warning(f"⏱️ {kind} retrieval exceeded latency budget ({budget:.2f}s)")
+            continue
+        results.extend(task.result())
+
+    merged = merge_results(results)
+    logger.info(
+        f"🔎 Retrieved {len(merged['retrieved_context'])} items in "
+        f"{(time.perf_counter() - started) * 1000:.1f}ms (order={order})"
+    )
+    return merged
+
+def fallback_answer(context: str) -> str:
+    """vLLM 호출 실패 시 검색 문맥 일부로 대체 답변 구성"""
+    return (
+        "죄송합니다. 모델 서버와 통신하는 중 오류가 발생했습니다. "
+        f"검색된 정보는 다음과 같습니다: {context[:200]}..."
+    )
+
+def retrieval_only_answer(context_lines, recommendations) -> str:
+    """과부하(degraded) 모드: vLLM 없이 검색 문맥과 추천 목록으로 답변 구성"""
+    lines = ["현재 요청이 많아 분석 대신 검색 결과를 먼저 안내해 드립니다."]
+    lines.extend(f"- {line}" for line in context_lines)
+    if recommendations:
+        lines.append(f"함께 볼 만한 영화: {', '.join(recommendations)}")
+    return "\n".join(lines)
+
+async def generate_answer(context_lines, query: str) -> dict:
+    """
+    검색 문맥과 질문으로 토큰 예산 내 프롬프트를 구성해 게이트웨이로 vLLM 호출 (단건/배치 분석 공용).
+    호출이 실패하면 검색 문맥 기반 대체 답변을 돌려주고 generation_failed=True로 표시합니다.
+    """
+    prompt = build_prompt(context_lines, query)
+    logger.info(f"🧾 Prompt tokens: {prompt.prompt_tokens} (context={prompt.context_tokens}, dropped={prompt.dropped})")
+    generation_failed = False
+
     try:
-        # 모델 추론 시간을 고려하여 타임아웃을 30초로 설정
-        response = requests.post(vllm_url, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result_json = response.json()
-        answer = result_json["choices"][0]["message"]["content"]
+        # 게이트웨이를 거쳐 동일 프롬프트 병합 + 동시성 제한 후 vLLM 호출
+        with span("llm.chat") as llm_span:
+            answer = await gateway.chat(prompt.messages, temperature=0.7, max_tokens=512)
+            llm_span.size = len(answer)
         logger.info("Successfully generated answer from vLLM")
-        
+
     except Exception as e:
         logger.error(f"❌ vLLM 호출 실패: {str(e)}")
-        answer = (
-            "죄송합니다. 모델 서버와 통신하는 중 오류가 발생했습니다. "
-            f"검색된 정보는 다음과 같습니다: {context[:200]}..."
-        )
+        answer = fallback_answer("\n".join(context_lines))
+        generation_failed = True
 
-    return {"messages": [("assistant", answer)]}
+    return {"answer": answer, "generation_failed": generation_failed, "prompt_tokens": prompt.prompt_tokens}
 
-# --- 그래프 구성 및 엣지 정의 ---
-workflow = StateGraph(AgentState)
-
-# 각 단계(Node) 등록
-workflow.add_node("planner", plan_node)
-workflow.add_node("vector_retrieve", vector_retrieve_node)
-workflow.add_node("graph_retrieve", graph_retrieve_node)
-workflow.add_node("analyst", analyze_node)
-
-# 시작점 설정
-workflow.set_entry_point("planner")
-
-# 조건부 라우팅 설정 (Planner 결과에 따라 분기)
-workflow.add_conditional_edges(
-    "planner",
-    lambda x: x["next_step"],
-    {
-        "vector": "vector_retrieve",
-        "graph": "graph_retrieve"
+# 노드 3: 결과 분석 및 답변 (Analyst - vLLM 연동)
+async def analyze_node(state: AgentState):
+    """검색된 문맥을 바탕으로 vLLM(LoRA 적용 모델)을 호출하여 최종 답변 생성"""
+    generated = await generate_answer(state["retrieved_context"], state["messages"][-1].content)
+    return {
+        "messages": [("assistant", generated["answer"])],
+        "generation_failed": generated["generation_failed"],
+        "prompt_tokens": generated["prompt_tokens"],
     }
-)
 
-# 검색 노드에서 분석 노드로 연결
-workflow.add_edge("vector_retrieve", "analyst")
-workflow.add_edge("graph_retrieve", "analyst")
-# 분석 완료 후 종료
-workflow.add_edge("analyst", END)
+# --- 그래프 구성 및 엣지 정의 ---
+def build_workflow(include_analyst: bool = True):
+    """
+    에이전트 워크플로우 구성.
+    include_analyst=False이면 검색 단계까지만 실행하는 그래프를 만듭니다 (SSE 스트리밍용).
+    """
+    workflow = StateGraph(AgentState)
+
+    # 각 단계(Node) 등록
+    # 모든 노드는 node.<이름> span으로 감싸 /metrics와 요청별 타이밍에 기록
+    workflow.add_node("planner", traced_node("planner", plan_node))
+    workflow.add_node("retrieve", traced_node("retrieve", parallel_retrieve_node))
+
+    # 시작점 설정: Planner → 동시 검색
+    workflow.set_entry_point("planner")
+    workflow.add_edge("planner", "retrieve")
+
+    if include_analyst:
+        workflow.add_node("analyst", traced_node("analyst", analyze_node))
+        # 검색 노드에서 분석 노드로 연결
+        workflow.add_edge("retrieve", "analyst")
+        # 분석 완료 후 종료
+        workflow.add_edge("analyst", END)
+    else:
+        workflow.add_edge("retrieve", END)
+
+    return workflow.compile()
 
 # 최종 워크플로우 컴파일
-app = workflow.compile()
\ No newline at end of file
+app = build_workflow()
+# 검색까지만 수행하는 워크플로우 (답변 생성은 API에서 토큰 스트리밍)
+retrieval_app = build_workflow(include_analyst=False)
@@ -1,36 +1,249 @@
-from fastapi import APIRouter, HTTPException
-from cine_analyst.common.schemas import AnalysisRequest, AnalysisResponse
-from cine_analyst.app.agents.workflow import app as agent_app
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from cine_analyst.common.schemas import AnalysisRequest, AnalysisResponse, BatchAnalysisRequest
+from cine_analyst.app.agents.workflow import (
+    app as agent_app,
+    retrieval_app,
+    fallback_answer,
+    retrieval_only_answer,
+)
+from cine_analyst.app.admission import Rejected, Ticket, admission
+from cine_analyst.app.agents.batch import analyze_batch
+from cine_analyst.app.agents.context import build_prompt
+from cine_analyst.app.agents.gateway import gateway
+from cine_analyst.app.cache import response_cache
+from cine_analyst.common.config import settings
+from cine_analyst.common.telemetry import request_timings, span, start_request, track_request
 from langchain_core.messages import HumanMessage
 from loguru import logger
 
 router = APIRouter()
 
+def _initial_state(request: AnalysisRequest) -> dict:
+    """에이전트 초기 입력 상태"""
+    return {
+        "messages": [HumanMessage(content=request.query)],
+        "retrieved_context": [],
+        "confidence_score": 0.0
+    }
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 프레임 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _finalize(response: AnalysisResponse, request: AnalysisRequest, request_id: str) -> AnalysisResponse:
+    """요청 ID와 (요청 시) span별 타이밍을 붙인 사본 반환 (캐시된 객체는 수정하지 않음)"""
+    update = {"request_id": request_id}
+    if request.include_timings:
+        update["timings"] = request_timings()
+    return response.model_copy(update=update)
+
+def _rate_key(request: AnalysisRequest, http_request: Request) -> str:
+    """속도 제한 단위: user_id, 익명(guest) 요청은 클라이언트 IP별"""
+    if request.user_id and request.user_id != "guest":
+        return request.user_id
+    return f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+
+def _deadline(request: AnalysisRequest) -> float:
+    """요청 deadline (초). 클라이언트는 서버 기본값보다 짧게만 지정 가능"""
+    if request.deadline_ms is None:
+        return settings.ADMISSION_DEADLINE
+    return min(request.deadline_ms / 1000, settings.ADMISSION_DEADLINE)
+
+def _overloaded(e: Rejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.reason, headers=e.headers)
+
+def _check_rate(request: AnalysisRequest, http_request: Request):
+    if not settings.ADMISSION_ENABLED:
+        return
+    try:
+        admission.check_rate(_rate_key(request, http_request))
+    except Rejected as e:
+        raise _overloaded(e)
+
+async def _admit(request: AnalysisRequest) -> Optional[Ticket]:
+    """처리 슬롯 획득 (승인 제어 비활성화 시 None)"""
+    if not settings.ADMISSION_ENABLED:
+        return None
+    try:
+        return await admission.acquire(_deadline(request))
+    except Rejected as e:
+        raise _overloaded(e)
+
+async def _degraded_response(request: AnalysisRequest) -> AnalysisResponse:
+    """검색 단계만 실행해 vLLM 없이 응답 (과부하 시 꼬리 지연 제한용, 캐시하지 않음)"""
+    state = await retrieval_app.ainvoke(_initial_state(request))
+    context = state.get("retrieved_context", [])
+    recommendations = state.get("recommendations", [])
+    return AnalysisResponse(
+        answer=retrieval_only_answer(context, recommendations),
+        context="\n".join(context),
+        recommendations=recommendations,
+        confidence_score=0.5,
+        degraded=True
+    )
+
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_movie(request: AnalysisRequest):
+async def analyze_movie(
+    request: AnalysisRequest,
+    http_request: Request,
+    http_response: Response,
+    x_request_id: Optional[str] = Header(None),
+):
     """LangGraph 에이전트를 호출하여 분석 결과를 반환하는 API"""
+    request_id = start_request(x_request_id, request.user_id)
+    http_response.headers["X-Request-ID"] = request_id
+
+    with track_request("analyze"):
+        # 429도 요청 지표(outcome=rejected)에 남도록 추적 구간 안에서 확인
+        _check_rate(request, http_request)
+        # 응답 캐시 조회 (exact → semantic), 적중 시 대기열/검색/생성 없이 즉시 반환
+        query_vector = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            with span("cache.lookup"):
+                cached, query_vector = await response_cache.alookup(request.query)
+            if cached is not None:
+                return _finalize(cached, request, request_id)
+
+        ticket = await _admit(request)
+        try:
+            if ticket is not None and ticket.degraded:
+                return _finalize(await _degraded_response(request), request, request_id)
+
+            # 워크플로우 실행 (승인된 요청은 남은 deadline 안에서만 처리)
+            invocation = agent_app.ainvoke(_initial_state(request))
+            result = await (asyncio.wait_for(invocation, ticket.remaining()) if ticket else invocation)
+
+            # 결과 데이터 추출
+            final_answer = result["messages"][-1].content
+            context_str = "\n".join(result.get("retrieved_context", []))
+
+            response = AnalysisResponse(
+                answer=final_answer,
+                context=context_str,
+                recommendations=result.get("recommendations", []),
+                confidence_score=0.95, # QoS 예시 점수
+                prompt_tokens=result.get("prompt_tokens")
+            )
+            # 모델 서버 장애로 만든 대체 답변은 캐시하지 않음
+            if settings.RESPONSE_CACHE_ENABLED and not result.get("generation_failed"):
+                response_cache.store(request.query, response, query_vector)
+            return _finalize(response, request, request_id)
+
+        except asyncio.TimeoutError:
+            raise _overloaded(admission.expired(ticket))
+        except Exception as e:
+            logger.error(f"❌ 에이전트 실행 실패 [{request_id}]: {str(e)}")
+            raise HTTPException(status_code=500, detail="에이전트 처리 중 내부 오류 발생")
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+async def _stream_analysis(request: AnalysisRequest, request_id: str, ticket: Optional[Ticket] = None):
+    """검색 단계 실행 후 vLLM delta 토큰을 SSE로 흘려보내고, 마지막에 문맥과 요약을 전송"""
+    # 스트리밍 본문은 핸들러 반환 후 실행되므로 요청 컨텍스트를 여기서 시작
+    start_request(request_id)
     try:
-        # 에이전트 초기 입력 상태
-        initial_state = {
-            "messages": [HumanMessage(content=request.query)],
-            "retrieved_context": [],
-            "confidence_score": 0.0
-        }
-
-        # 워크플로우 실행
-        result = await agent_app.ainvoke(initial_state)
-
-        # 결과 데이터 추출
-        final_answer = result["messages"][-1].content
-        context_str = "\n".join(result.get("retrieved_context", []))
-
-        return AnalysisResponse(
-            answer=final_answer,
+        try:
+            state = await retrieval_app.ainvoke(_initial_state(request))
+        except Exception as e:
+            logger.error(f"❌ 검색 단계 실패 [{request_id}]: {str(e)}")
+            yield _sse("error", {"detail": "에이전트 처리 중 내부 오류 발생"})
+            return
+
+        context_str = "\n".join(state.get("retrieved_context", []))
+        prompt = build_prompt(state.get("retrieved_context", []), request.query)
+        degraded = ticket is not None and ticket.degraded
+        tokens = []
+        if degraded:
+            tokens.append(retrieval_only_answer(state.get("retrieved_context", []), state.get("recommendations", [])))
+            yield _sse("token", {"delta": tokens[-1]})
+        else:
+            try:
+                with span("llm.stream") as llm_span:
+                    async for delta in gateway.stream(prompt.messages):
+                        tokens.append(delta)
+                        yield _sse("token", {"delta": delta})
+                    llm_span.size = sum(len(t) for t in tokens)
+            except Exception as e:
+                logger.error(f"❌ vLLM 스트리밍 실패: {str(e)}")
+                # 이미 일부 토큰이 나갔다면 그대로 두고, 아무것도 없으면 대체 답변을 전송
+                if not tokens:
+                    tokens.append(fallback_answer(context_str))
+                    yield _sse("token", {"delta": tokens[-1]})
+
+        yield _sse("context", {"context": state.get("retrieved_context", [])})
+
+        summary = AnalysisResponse(
+            answer="".join(tokens),
             context=context_str,
-            recommendations=[],  # 필요 시 추가 로직 구현
-            confidence_score=0.95 # QoS 예시 점수
+            recommendations=state.get("recommendations", []),
+            confidence_score=0.5 if degraded else 0.95,
+            prompt_tokens=None if degraded else prompt.prompt_tokens,
+            degraded=degraded
         )
+        yield _sse("summary", _finalize(summary, request, request_id).model_dump())
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+@router.post("/analyze/stream")
+async def analyze_movie_stream(
+    request: AnalysisRequest,
+    http_request: Request,
+    x_request_id: Optional[str] = Header(None),
+):
+    """분석 결과를 Server-Sent Events로 토큰 단위 스트리밍하는 API"""
+    request_id = start_request(x_request_id, request.user_id)
+    _check_rate(request, http_request)
+    ticket = await _admit(request)
+    return StreamingResponse(
+        _stream_analysis(request, request_id, ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Request-ID": request_id},
+        # 본문이 시작되기 전에 연결이 끊겨도 슬롯을 반환
+        background=BackgroundTask(ticket.release) if ticket is not None else None,
+    )
+
+def _admit_batch_item():
+    """일괄 분석 생성 1건마다 대화형 요청과 같은 처리 슬롯을 후순위로 사용"""
+    return admission.acquire_background()
+
+async def _stream_batch(batch: BatchAnalysisRequest, request_id: str):
+    """일괄 분석 결과를 완료 순서대로 NDJSON 한 줄씩 전송 (항목별 request_id = <배치 ID>/<index>)"""
+    start_request(request_id)
+    admit = _admit_batch_item if settings.ADMISSION_ENABLED else None
+    with track_request("analyze_batch_stream"):
+        async for item in analyze_batch(batch.requests, admit=admit):
+            item = item.model_copy(update={"request_id": f"{request_id}/{item.index}"})
+            yield item.model_dump_json() + "\n"
 
-    except Exception as e:
-        logger.error(f"❌ 에이전트 실행 실패: {str(e)}")
-        raise HTTPException(status_code=500, detail="에이전트 처리 중 내부 오류 발생")
\ No newline at end of file
+@router.post("/analyze/batch")
+async def analyze_movie_batch(
+    batch: BatchAnalysisRequest,
+    http_request: Request,
+    x_request_id: Optional[str] = Header(None),
+):
+    """
+    오프라인 리포팅용 일괄 분석 API (application/x-ndjson 스트리밍).
+    배치 호출 자체는 요청자 속도 제한 토큰 1개를 쓰고, 생성은 1건마다 승인 제어 슬롯을 받아
+    대화형 /analyze 요청이 기다리는 동안에는 양보합니다.
+    """
+    request_id = start_request(x_request_id, batch.requests[0].user_id)
+    with track_request("analyze_batch"):
+        if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"한 번에 최대 {settings.BATCH_MAX_REQUESTS}건까지 요청할 수 있습니다"
+            )
+        _check_rate(batch.requests[0], http_request)
+    logger.info(f"📦 Batch analysis [{request_id}]: {len(batch.requests)} requests")
+    return StreamingResponse(
+        _stream_batch(batch, request_id),
+        media_type="application/x-ndjson",
+        headers={"X-Request-ID": request_id},
+    )
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.cache import TTLCache
+from cine_analyst.common.config import settings
+from cine_analyst.common.schemas import AnalysisResponse
+from cine_analyst.rag.cache import IngestStamp, register_cache
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/공백 차이를 무시한 exact 캐시 키"""
+    return " ".join(query.strip().lower().split())
+
+
+class ResponseCache:
+    """
+    /api/v1/analyze 앞단의 2단 응답 캐시.
+    1) exact: 정규화된 질의 문자열 키
+    2) semantic: 질의 임베딩과 캐시된 질의 임베딩의 코사인 유사도가 threshold 이상이면 재사용
+    두 단계는 같은 LRU/TTL 저장소를 공유하며, 항목이 제거되면 임베딩 슬롯도 함께 해제됩니다.
+    검색 캐시와 같은 인제션 스탬프를 감시해 재적재 이후에는 이전 답변을 내보내지 않습니다.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.RESPONSE_CACHE_SIZE,
+        ttl: float = settings.RESPONSE_CACHE_TTL,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+        stamp_path: str = settings.INGEST_STAMP_PATH,
+    ):
+        self.threshold = threshold
+        self.embed_fn = embed_fn
+        self.entries = TTLCache(maxsize, ttl, on_evict=self._release_slot)
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._slot_of: Dict[str, int] = {}
+        self._key_of: Dict[int, str] = {}
+        self._free = list(range(maxsize - 1, -1, -1))
+        self.lookups = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.stamp = IngestStamp(stamp_path)
+        register_cache(self)
+
+    def _check_stamp(self):
+        if self.stamp.changed():
+            self.invalidate()
+
+    def _release_slot(self, key: str):
+        with self._lock:
+            slot = self._slot_of.pop(key, None)
+            if slot is not None:
+                self._key_of.pop(slot, None)
+                self._matrix[slot] = 0.0
+                self._free.append(slot)
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            return self.embed_fn(query)
+        except Exception as e:
+            # 임베딩 모델을 쓸 수 없으면 exact 단계만 사용
+            logger.warning(f"⚠️ Semantic cache disabled: {e}")
+            self.embed_fn = None
+            return None
+
+    def _semantic_lookup(self, vector: np.ndarray) -> Optional[str]:
+        # 만료된 항목의 슬롯을 먼저 비워, 만료 항목이 argmax를 차지해 살아 있는 유사 질의를 가리지 않도록 함
+        self.entries.purge_expired()
+        with self._lock:
+            if not self._slot_of:
+                return None
+            scores = self._matrix @ vector
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                return None
+            return self._key_of.get(slot)
+
+    def lookup(self, query: str) -> Tuple[Optional[AnalysisResponse], Optional[np.ndarray]]:
+        """캐시 조회. miss 시 store에 재사용할 수 있도록 계산한 질의 임베딩을 함께 반환"""
+        self._check_stamp()
+        key = normalize_query(query)
+        self.lookups += 1
+        response = self.entries.get(key)
+        if response is not None:
+            self.exact_hits += 1
+            return response, None
+
+        vector = self._embed(key)
+        if vector is None:
+            return None, None
+        similar_key = self._semantic_lookup(vector)
+        if similar_key is not None:
+            response = self.entries.get(similar_key)
+            if response is not None:
+                self.semantic_hits += 1
+                return response, vector
+        return None, vector
+
+    def lookup_exact(self, query: str) -> Optional[AnalysisResponse]:
+        """exact 단계만 조회 (배치 분석: 질의 임베딩은 검색 단계에서 한 번에 계산)"""
+        self._check_stamp()
+        self.lookups += 1
+        response = self.entries.get(normalize_query(query))
+        if response is not None:
+            self.exact_hits += 1
+        return response
+
+    def store(self, query: str, response: AnalysisResponse, vector: Optional[np.ndarray] = None):
+        key = normalize_query(query)
+        self.entries.set(key, response)
+        if vector is None:
+            return
+        with self._lock:
+            if key in self._slot_of or not self._free:
+                return
+            if self._matrix is None:
+                self._matrix = np.zeros((self.entries.maxsize, vector.shape[0]), dtype=np.float32)
+            slot = self._free.pop()
+            self._matrix[slot] = vector
+            self._slot_of[key] = slot
+            self._key_of[slot] = key
+
+    async def alookup(self, query: str):
+        # 임베딩 계산은 CPU 작업이므로 이벤트 루프 밖에서 실행
+        return await asyncio.to_thread(self.lookup, query)
+
+    def clear(self):
+        self.entries.clear()
+
+    def invalidate(self):
+        # notify_ingested / 스탬프 변경 시 호출
+        self.clear()
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "size": len(self.entries),
+            "maxsize": self.entries.maxsize,
+            "evictions": self.entries.evictions,
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+        }
+
+
+def _default_embed_fn() -> Optional[Callable[[str], np.ndarray]]:
+    if not settings.RESPONSE_CACHE_SEMANTIC:
+        return None
+    from cine_analyst.rag.embedding import embed_query
+    return embed_query
+
+
+# 프로세스 전역 응답 캐시
+response_cache = ResponseCache(embed_fn=_default_embed_fn())
@@ -1,19 +1,85 @@
+import time
+# 프로세스 시작(import)부터 요청 수신 가능 시점까지의 콜드 스타트 시간 측정용
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from loguru import logger
 from cine_analyst.app.api import router
 from cine_analyst.common.config import settings
+from cine_analyst.common.telemetry import render_metrics
+from cine_analyst.app.agents.llm import llm
+from cine_analyst.app.agents.gateway import gateway
+from cine_analyst.app.cache import response_cache
+from cine_analyst.rag.neighbors import neighbor_index
+from cine_analyst.rag.registry import stores
+from cine_analyst.app.warmup import warm_up
+from cine_analyst.app import server
+from cine_analyst.app.admission import admission
+from cine_analyst.common.resilience import breakers
+
+# 시작 단계별 소요 시간 (/health에서 확인)
+startup_report = {}
+
+async def _heartbeat_loop():
+    while True:
+        server.heartbeat()
+        await asyncio.sleep(settings.SERVER_HEARTBEAT_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 앱 수명 동안 OpenSearch / Neo4j 커넥션 풀을 유지
+    startup_report["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    stores.startup()
+    # 추천용 이웃 테이블은 시작 시 한 번 메모리에 올림
+    neighbor_index.load()
+    # 첫 요청이 모델 로드/연결 수립 비용을 치르지 않도록 미리 준비
+    if settings.WARMUP_ENABLED:
+        startup_report["warmup_ms"] = await warm_up()
+    startup_report["ready_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    logger.info(f"🚀 Server ready in {startup_report['ready_ms']}ms")
+    # 멀티 워커 모드: 이벤트 루프가 살아 있음을 마스터에 알리는 heartbeat
+    heartbeat_task = asyncio.create_task(_heartbeat_loop()) if server.worker_table is not None else None
+    yield
+    if heartbeat_task is not None:
+        heartbeat_task.cancel()
+    await gateway.drain()
+    await stores.ashutdown()
+    await llm.aclose()
 
 # 이 'app' 변수가 정의되어 있어야 테스트 코드에서 불러올 수 있습니다.
-app = FastAPI(title="Cine Analyst Enterprise API")
+app = FastAPI(title="Cine Analyst Enterprise API", lifespan=lifespan)
 
 app.include_router(router, prefix="/api/v1")
 
+@app.middleware("http")
+async def count_requests(request, call_next):
+    # 워커별 처리 요청 수 (멀티 워커 모드에서만 집계)
+    server.record_request()
+    return await call_next(request)
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "pools": stores.stats(), "response_cache": response_cache.stats(),
+            "llm_gateway": gateway.stats(), "admission": admission.stats(), "breakers": breakers.stats(), "startup": startup_report, "workers": server.worker_status()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 스크레이프용 span/요청 지연 히스토그램"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 def start():
-    uvicorn.run("cine_analyst.app.main:app", host="0.0.0.0", port=8000, reload=True)
+    """
+    개발: 단일 프로세스 + 자동 리로드 (기본값).
+    운영: SERVER_RELOAD=false 또는 SERVER_WORKERS>1 이면 preload 후 prefork 워커로 실행.
+    """
+    if settings.SERVER_RELOAD and settings.SERVER_WORKERS <= 1:
+        uvicorn.run("cine_analyst.app.main:app", host=settings.SERVER_HOST, port=settings.SERVER_PORT, reload=True)
+    else:
+        server.serve(settings.SERVER_WORKERS)
 
 if __name__ == "__main__":
-    start()
\ No newline at end of file
+    start()
@@ -0,0 +1,244 @@
+import gc
+import os
+import signal
+import socket
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+# 워커 상태 테이블의 워커당 필드 (fork 전에 만든 공유 메모리 배열에 기록)
+_FIELDS = ("pid", "started_at", "heartbeat", "requests", "restarts")
+
+
+class WorkerTable:
+    """
+    워커별 상태(pid, 시작 시각, 마지막 heartbeat, 처리 요청 수, 재시작 횟수)를 담는 공유 메모리 배열.
+    마스터가 fork 전에 만들고, 어떤 워커의 /health 요청이든 전체 워커 상태를 보고할 수 있습니다.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._data = RawArray("d", size * len(_FIELDS))
+
+    def _offset(self, index: int, field: str) -> int:
+        return index * len(_FIELDS) + _FIELDS.index(field)
+
+    def get(self, index: int, field: str) -> float:
+        return self._data[self._offset(index, field)]
+
+    def set(self, index: int, field: str, value: float):
+        self._data[self._offset(index, field)] = value
+
+    def incr(self, index: int, field: str):
+        # 각 슬롯은 해당 워커만 쓰므로 잠금 없이 갱신
+        self._data[self._offset(index, field)] += 1
+
+    def snapshot(self, heartbeat_timeout: float = settings.SERVER_WORKER_TIMEOUT) -> List[Dict]:
+        now = time.time()
+        workers = []
+        for index in range(self.size):
+            pid = int(self.get(index, "pid"))
+            heartbeat = self.get(index, "heartbeat")
+            workers.append({
+                "worker": index,
+                "pid": pid,
+                "uptime_s": round(now - self.get(index, "started_at"), 1) if pid else 0.0,
+                "heartbeat_age_s": round(now - heartbeat, 1) if heartbeat else None,
+                "healthy": bool(pid) and bool(heartbeat) and now - heartbeat < heartbeat_timeout,
+                "requests": int(self.get(index, "requests")),
+                "restarts": int(self.get(index, "restarts")),
+            })
+        return workers
+
+
+# 멀티 워커 모드에서만 설정됨 (단일 프로세스 모드에서는 None)
+worker_table: Optional[WorkerTable] = None
+worker_index: Optional[int] = None
+
+
+def worker_status() -> Optional[Dict]:
+    """/health용 워커 상태. 단일 프로세스 모드에서는 None"""
+    if worker_table is None:
+        return None
+    return {"self": worker_index, "workers": worker_table.snapshot()}
+
+
+def record_request():
+    if worker_table is not None:
+        worker_table.incr(worker_index, "requests")
+
+
+def heartbeat():
+    if worker_table is not None:
+        worker_table.set(worker_index, "heartbeat", time.time())
+
+
+def preload():
+    """
+    fork 전에 마스터에서 읽기 전용 자원을 올려 워커들이 copy-on-write로 공유.
+    임베딩 모델은 가중치만 로드하고 첫 forward는 워커에서 수행합니다
+    (fork 전에 OpenMP 스레드 풀을 초기화하면 자식 프로세스가 멈출 수 있음).
+    """
+    started = time.perf_counter()
+    from cine_analyst.app.main import app  # noqa: F401 (모듈 import 비용도 fork 전에 지불)
+    from cine_analyst.app.agents.context import load_token_counter
+    from cine_analyst.app.warmup import _needs_embedder
+    from cine_analyst.rag.neighbors import neighbor_index
+
+    neighbor_index.load()
+    load_token_counter()
+    if _needs_embedder():
+        try:
+            from cine_analyst.rag.embedding import load_embedder
+            load_embedder()
+        except Exception as e:
+            logger.warning(f"⚠️ Embedder preload failed, workers will load it lazily: {e}")
+    if settings.VECTOR_BACKEND == "local":
+        from cine_analyst.rag.local_index import local_index
+        # memmap 자체는 페이지 캐시로 공유되며, 여기서는 메타데이터(docs)를 전역 인덱스에 미리 파싱
+        local_index.load()
+
+    # 이후 GC가 공유 객체의 헤더를 건드려 페이지가 복사되지 않도록 현재 힙을 영구 세대로 이동
+    gc.collect()
+    gc.freeze()
+    logger.info(f"📦 Preloaded shared resources in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(settings.SERVER_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(index: int, sock: socket.socket, table: WorkerTable):
+    """자식 프로세스: 공유 소켓에서 uvicorn 서버 실행 (lifespan에서 연결 풀/워밍업은 워커별로 수행)"""
+    global worker_table, worker_index
+    import uvicorn
+
+    worker_table, worker_index = table, index
+    table.set(index, "pid", os.getpid())
+    table.set(index, "started_at", time.time())
+    heartbeat()
+    # 마스터의 시그널 핸들러를 물려받지 않도록 기본값으로 복구 (uvicorn이 자체 핸들러 설치)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        "cine_analyst.app.main:app",
+        lifespan="on",
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        log_level="info",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """
+    preload → 소켓 bind → N개 워커 fork 방식의 운영용 서버.
+    - 워커가 비정상 종료하거나 heartbeat가 SERVER_WORKER_TIMEOUT 이상 끊기면 재시작
+    - SIGTERM/SIGINT 수신 시 워커에 SIGTERM을 보내 진행 중 요청을 마무리하게 하고,
+      SERVER_GRACEFUL_TIMEOUT 안에 끝나지 않으면 SIGKILL
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.SERVER_WORKERS,
+        host: str = settings.SERVER_HOST,
+        port: int = settings.SERVER_PORT,
+    ):
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.table = WorkerTable(workers)
+        self.pids: Dict[int, int] = {}
+        self.stopping = False
+
+    def _spawn(self, index: int, sock: socket.socket):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(index, sock, self.table)
+            except BaseException as e:
+                logger.error(f"❌ Worker {index} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.pids[pid] = index
+        logger.info(f"👷 Worker {index} started (pid={pid})")
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def _reap(self, sock: socket.socket):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = self.pids.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            logger.warning(f"⚠️ Worker {index} (pid={pid}) exited with status {status}, restarting")
+            self.table.incr(index, "restarts")
+            self.table.set(index, "heartbeat", 0.0)
+            self._spawn(index, sock)
+
+    def _check_heartbeats(self):
+        now = time.time()
+        for pid, index in list(self.pids.items()):
+            heartbeat = self.table.get(index, "heartbeat")
+            if heartbeat and now - heartbeat > settings.SERVER_WORKER_TIMEOUT:
+                logger.error(f"❌ Worker {index} (pid={pid}) unresponsive for {now - heartbeat:.0f}s, killing")
+                os.kill(pid, signal.SIGKILL)
+
+    def _shutdown(self):
+        logger.info(f"🛑 Stopping {len(self.pids)} workers (graceful timeout {settings.SERVER_GRACEFUL_TIMEOUT}s)")
+        for pid in self.pids:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT + 5
+        while self.pids and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.pids.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in self.pids:
+            logger.warning(f"⚠️ Worker pid={pid} did not stop in time, killing")
+            os.kill(pid, signal.SIGKILL)
+
+    def run(self):
+        if settings.SERVER_PRELOAD:
+            preload()
+        sock = _bind_socket(self.host, self.port)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        logger.info(f"🚀 Serving on {self.host}:{self.port} with {self.workers} workers")
+        for index in range(self.workers):
+            self._spawn(index, sock)
+        try:
+            while not self.stopping:
+                self._reap(sock)
+                self._check_heartbeats()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+            sock.close()
+            logger.info("👋 Server stopped")
+
+
+def serve(workers: int = settings.SERVER_WORKERS):
+    """운영 모드 진입점: 워커 1개여도 preload/재시작/graceful shutdown 동작은 동일"""
+    PreforkServer(workers=workers).run()
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from loguru import logger
+
+from cine_analyst.app.agents.context import load_token_counter
+from cine_analyst.app.agents.llm import llm
+from cine_analyst.common.config import settings
+from cine_analyst.rag.registry import stores
+
+
+def _needs_embedder() -> bool:
+    # 질의 임베딩을 쓰는 경로가 하나라도 켜져 있을 때만 모델을 미리 올림
+    return settings.RESPONSE_CACHE_SEMANTIC or settings.HYBRID_SEARCH_ENABLED or settings.VECTOR_BACKEND == "local"
+
+
+async def _warm_embedder():
+    from cine_analyst.rag.embedding import embed_query
+    # 모델 로드 + 첫 forward(커널 초기화)까지 수행
+    await asyncio.to_thread(embed_query, "warm up")
+
+
+async def _warm_tokenizer():
+    await asyncio.to_thread(load_token_counter)
+
+
+async def _warm_llm():
+    # 커넥션 풀에 vLLM 연결을 하나 만들어 둠
+    response = await llm.client.get("/models")
+    response.raise_for_status()
+
+
+async def _step(name: str, fn: Callable[[], Awaitable], timings: Dict[str, float]):
+    started = time.perf_counter()
+    try:
+        await fn()
+    except Exception as e:
+        # 준비에 실패해도 서버는 뜨고, 해당 의존성은 첫 요청에서 다시 시도
+        logger.warning(f"⚠️ Warm-up '{name}' failed: {e}")
+    timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def warm_up() -> Dict[str, float]:
+    """
+    FastAPI lifespan의 워밍업 단계.
+    저장소 연결, 임베딩 모델, 토크나이저, vLLM 연결을 동시에 준비하고 단계별 소요 시간(ms)을 반환합니다.
+    """
+    steps = {"stores": stores.awarm_up, "tokenizer": _warm_tokenizer, "llm": _warm_llm}
+    if _needs_embedder():
+        steps["embedder"] = _warm_embedder
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(_step(name, fn, timings) for name, fn in steps.items()))
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"🔥 Warm-up finished: {timings}")
+    return timings
@@ -0,0 +1,353 @@
+import asyncio
+import json
+import random
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import click
+import httpx
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.config import settings
+from cine_analyst.rag.base import GraphStoreBase, VectorStoreBase
+
+DEFAULT_QUERIES = [
+    "봉준호 감독의 기생충과 비슷한 사회 비판적인 영화 추천해줘",
+    "크리스토퍼 놀란 감독 작품 알려줘",
+    "비 오는 날 보기 좋은 잔잔한 로맨스 영화",
+    "액션 영화 추천해줘",
+    "마블 영화에 나온 배우들 관계 정리해줘",
+    "가족이 함께 볼 만한 애니메이션",
+]
+
+
+@dataclass
+class LatencyModel:
+    """
+    대역 서비스의 응답 지연 분포 (로그정규: 중앙값 median_ms, 꼬리 두께 sigma).
+    error_rate 비율로 예외를, stall_rate 비율로 stall_ms 동안의 멈춤(느린 샤드/끊긴 연결)을 주입합니다.
+    """
+    median_ms: float = 10.0
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 30000.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.stall_rate and rng.random() < self.stall_rate:
+            return self.stall_ms / 1000
+        return self.median_ms * rng.lognormvariate(0.0, self.sigma) / 1000
+
+    async def wait(self, rng: random.Random):
+        await asyncio.sleep(self.sample(rng))
+        if self.error_rate and rng.random() < self.error_rate:
+            raise ConnectionError("injected stand-in failure")
+
+
+class StubVectorStore(VectorStoreBase):
+    """OpenSearch 대역: 지연 후 고정 문서를 반환"""
+
+    def __init__(self, latency: LatencyModel, seed: int = 0):
+        self.latency = latency
+        self.rng = random.Random(seed)
+
+    def ingest(self, df):
+        pass
+
+    def search(self, query: str, k: int = 5):
+        time.sleep(self.latency.sample(self.rng))
+        return self._results(k)
+
+    async def asearch(self, query: str, k: int = 5):
+        await self.latency.wait(self.rng)
+        return self._results(k)
+
+    def _results(self, k: int):
+        return [{"title": f"영화 {i}", "overview": "벤치마크용 줄거리 " * 20} for i in range(k)]
+
+    def close(self):
+        pass
+
+
+class StubGraphStore(GraphStoreBase):
+    """Neo4j 대역: 지연 후 관련 영화 제목을 반환"""
+
+    def __init__(self, latency: LatencyModel, seed: int = 1):
+        self.latency = latency
+        self.rng = random.Random(seed)
+
+    def ingest(self, df):
+        pass
+
+    def search(self, query: str, k: int = 5):
+        time.sleep(self.latency.sample(self.rng))
+        return self._results(k)
+
+    async def asearch(self, query: str, k: int = 5):
+        await self.latency.wait(self.rng)
+        return self._results(k)
+
+    def _results(self, k: int):
+        return [f"관련 영화 {i}" for i in range(k)]
+
+    def close(self):
+        pass
+
+
+class StubLLM:
+    """
+    vLLM 대역: 첫 토큰까지 지연(ttft) + 토큰당 지연으로 chat/stream을 흉내냄.
+    capacity > 0이면 동시에 처리하는 요청 수를 제한해 포화된 모델 서버의 대기열을 재현합니다.
+    """
+
+    def __init__(self, latency: LatencyModel, tokens: int = 32, per_token_ms: float = 0.0, seed: int = 2,
+                 capacity: int = 0):
+        self.latency = latency
+        self.tokens = tokens
+        self.per_token_ms = per_token_ms
+        self.rng = random.Random(seed)
+        self.capacity = capacity
+        self._slots = asyncio.Semaphore(capacity) if capacity > 0 else None
+
+    @asynccontextmanager
+    async def _slot(self):
+        if self._slots is None:
+            yield
+            return
+        async with self._slots:
+            yield
+
+    async def chat(self, messages: List[Dict[str, str]], **params) -> str:
+        async with self._slot():
+            await self.latency.wait(self.rng)
+            await asyncio.sleep(self.tokens * self.per_token_ms / 1000)
+        return "벤치마크 답변 " * self.tokens
+
+    async def stream(self, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        async with self._slot():
+            await self.latency.wait(self.rng)
+            for _ in range(self.tokens):
+                await asyncio.sleep(self.per_token_ms / 1000)
+                yield "토큰 "
+
+    async def aclose(self):
+        pass
+
+
+@asynccontextmanager
+async def stand_in_app(
+    vector: LatencyModel,
+    graph: LatencyModel,
+    llm: LatencyModel,
+    response_cache: bool = False,
+    llm_capacity: int = 0,
+):
+    """대역 서비스를 끼운 FastAPI 앱을 lifespan까지 실행한 채로 제공하고, 종료 시 원래 설정으로 복구"""
+    from cine_analyst.app.agents.gateway import gateway
+    from cine_analyst.app.main import app
+    from cine_analyst.rag.registry import stores
+
+    previous_vector = stores.set_factory("vector", lambda: StubVectorStore(vector))
+    previous_graph = stores.set_factory("graph", lambda: StubGraphStore(graph))
+    previous_client, gateway.client = gateway.client, StubLLM(llm, capacity=llm_capacity)
+    previous_cache, settings.RESPONSE_CACHE_ENABLED = settings.RESPONSE_CACHE_ENABLED, response_cache
+    # 대역 환경에서는 임베딩 모델/vLLM 워밍업이 필요 없음
+    previous_warmup, settings.WARMUP_ENABLED = settings.WARMUP_ENABLED, False
+    try:
+        async with app.router.lifespan_context(app):
+            yield app
+    finally:
+        stores.set_factory("vector", previous_vector)
+        stores.set_factory("graph", previous_graph)
+        gateway.client = previous_client
+        settings.RESPONSE_CACHE_ENABLED = previous_cache
+        settings.WARMUP_ENABLED = previous_warmup
+
+
+def load_queries(path: Optional[str]) -> List[str]:
+    """JSONL에서 질의 목록 로드 ('query' 필드, 없으면 'title'/'body'). 경로가 없으면 기본 질의 사용"""
+    if not path:
+        return list(DEFAULT_QUERIES)
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            query = record.get("query") or record.get("title") or record.get("body")
+            if query:
+                queries.append(query)
+    if not queries:
+        raise ValueError(f"No queries found in {path}")
+    return queries
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.status: Dict[str, int] = {}
+        self.errors = 0
+        self.degraded = 0
+
+    async def send(self, client: httpx.AsyncClient, endpoint: str, query: str, started: float, user_id: str):
+        try:
+            response = await client.post(endpoint, json={"query": query, "user_id": user_id})
+            code = str(response.status_code)
+            if response.status_code >= 400:
+                self.errors += 1
+            elif response.headers.get("content-type", "").startswith("application/json") \
+                    and response.json().get("degraded"):
+                # 과부하로 검색 전용 응답을 받은 요청 (승인 제어의 load shedding)
+                self.degraded += 1
+        except Exception as e:
+            code = type(e).__name__
+            self.errors += 1
+        # 개방형 부하에서는 예정 도착 시각부터 측정해 대기 시간까지 포함 (coordinated omission 방지)
+        self.latencies.append(time.perf_counter() - started)
+        self.status[code] = self.status.get(code, 0) + 1
+
+
+async def run_closed_loop(client, endpoint: str, queries: List[str], concurrency: int, total: int, seed: int = 42):
+    """고정 동시성: 워커 concurrency개가 응답을 받자마자 다음 요청을 보냄"""
+    recorder, rng = _Recorder(), random.Random(seed)
+    counter = iter(range(total))
+
+    async def worker(user_id: str):
+        for _ in counter:
+            await recorder.send(client, endpoint, rng.choice(queries), time.perf_counter(), user_id)
+
+    # 워커 하나를 사용자 한 명으로 취급 (사용자별 속도 제한이 걸리는지도 함께 관찰)
+    await asyncio.gather(*(worker(f"load-user-{i}") for i in range(concurrency)))
+    return recorder
+
+
+async def run_open_loop(
+    client, endpoint: str, queries: List[str], rate: float, total: int, seed: int = 42, users: int = 50
+):
+    """개방형 부하: 응답과 무관하게 포아송 도착(평균 rate rps)으로 users명 중 임의의 사용자가 요청을 발생"""
+    recorder, rng = _Recorder(), random.Random(seed)
+    tasks = []
+    next_at = time.perf_counter()
+    for _ in range(total):
+        next_at += rng.expovariate(rate)
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        user_id = f"load-user-{rng.randrange(users)}"
+        tasks.append(asyncio.create_task(recorder.send(client, endpoint, rng.choice(queries), next_at, user_id)))
+    await asyncio.gather(*tasks)
+    return recorder
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def summarize(recorder: _Recorder, elapsed: float, params: dict) -> dict:
+    latencies = np.asarray(recorder.latencies) * 1000
+    total = len(latencies)
+    percentiles = {
+        f"p{p}": round(float(np.percentile(latencies, p)), 3) if total else 0.0 for p in (50, 95, 99)
+    }
+    return {
+        **params,
+        "commit": _git_commit(),
+        "requests": total,
+        "errors": recorder.errors,
+        "error_rate": round(recorder.errors / total, 4) if total else 0.0,
+        "degraded": recorder.degraded,
+        "duration_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            **percentiles,
+            "mean": round(float(latencies.mean()), 3) if total else 0.0,
+            "max": round(float(latencies.max()), 3) if total else 0.0,
+        },
+        "status_codes": recorder.status,
+    }
+
+
+async def run_load_test(
+    queries: List[str],
+    requests: int = 200,
+    concurrency: int = 16,
+    rate: Optional[float] = None,
+    endpoint: str = "/api/v1/analyze",
+    vector: LatencyModel = LatencyModel(15.0),
+    graph: LatencyModel = LatencyModel(10.0),
+    llm: LatencyModel = LatencyModel(150.0),
+    response_cache: bool = False,
+    seed: int = 42,
+    users: int = 50,
+    llm_capacity: int = 0,
+) -> dict:
+    """rate가 주어지면 개방형, 아니면 고정 동시성으로 부하를 주고 RPS/지연 백분위/오류율을 집계"""
+    async with stand_in_app(vector, graph, llm, response_cache, llm_capacity) as app:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            started = time.perf_counter()
+            if rate:
+                recorder = await run_open_loop(client, endpoint, queries, rate, requests, seed, users)
+            else:
+                recorder = await run_closed_loop(client, endpoint, queries, concurrency, requests, seed)
+            elapsed = time.perf_counter() - started
+
+    params = {
+        "endpoint": endpoint,
+        "mode": "open" if rate else "closed",
+        "concurrency": None if rate else concurrency,
+        "rate": rate,
+        "users": users if rate else concurrency,
+        "stand_ins": {"vector": vars(vector), "graph": vars(graph), "llm": vars(llm), "llm_capacity": llm_capacity},
+        "response_cache": response_cache,
+    }
+    return summarize(recorder, elapsed, params)
+
+
+@click.command()
+@click.option('--queries', 'queries_path', default=None, help='질의 JSONL 경로 (query/title/body 필드)')
+@click.option('--requests', 'total', default=200, type=int, help='총 요청 수')
+@click.option('--concurrency', default=16, type=int, help='고정 동시성 모드의 워커 수')
+@click.option('--rate', default=None, type=float, help='개방형 모드의 평균 도착률 (rps)')
+@click.option('--endpoint', default="/api/v1/analyze", help='부하 대상 엔드포인트')
+@click.option('--users', default=50, type=int, help='개방형 모드에서 요청을 나눠 보낼 사용자 수 (속도 제한 단위)')
+@click.option('--vector-ms', default=15.0, type=float, help='OpenSearch 대역 지연 중앙값 (ms)')
+@click.option('--graph-ms', default=10.0, type=float, help='Neo4j 대역 지연 중앙값 (ms)')
+@click.option('--llm-ms', default=150.0, type=float, help='vLLM 대역 지연 중앙값 (ms)')
+@click.option('--llm-capacity', default=0, type=int, help='vLLM 대역의 동시 처리 한도 (0: 무제한)')
+@click.option('--sigma', default=0.5, type=float, help='로그정규 지연 분포의 sigma (꼬리 두께)')
+@click.option('--error-rate', default=0.0, type=float, help='대역 서비스 오류 주입 비율')
+@click.option('--stall-rate', default=0.0, type=float, help='검색 대역이 stall-ms 동안 멈추는 비율')
+@click.option('--stall-ms', default=30000.0, type=float, help='주입된 멈춤 시간 (ms)')
+@click.option('--cache/--no-cache', 'response_cache', default=False, help='응답 캐시 사용 여부')
+@click.option('--output', 'output_path', default=None, help='결과 JSON 저장 경로')
+def run_cli(queries_path, total, concurrency, rate, endpoint, users, vector_ms, graph_ms, llm_ms, llm_capacity, sigma, error_rate,
+            stall_rate, stall_ms, response_cache, output_path):
+    """대역 서비스로 /api/v1/analyze 처리량과 꼬리 지연을 측정"""
+    report = asyncio.run(run_load_test(
+        load_queries(queries_path),
+        requests=total,
+        concurrency=concurrency,
+        rate=rate,
+        endpoint=endpoint,
+        vector=LatencyModel(vector_ms, sigma, error_rate, stall_rate, stall_ms),
+        graph=LatencyModel(graph_ms, sigma, error_rate, stall_rate, stall_ms),
+        llm=LatencyModel(llm_ms, sigma, error_rate),
+        response_cache=response_cache,
+        users=users,
+        llm_capacity=llm_capacity,
+    ))
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.success(f"✅ Load test report saved: {output_path}")
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,122 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import click
+import httpx
+from loguru import logger
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """/proc/<pid>/smaps_rollup의 Rss/Pss/Shared (kB). Pss는 공유 페이지를 공유 프로세스 수로 나눈 값"""
+    fields = {"Rss": "rss_kb", "Pss": "pss_kb", "Shared_Clean": "shared_clean_kb", "Private_Dirty": "private_dirty_kb"}
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] = int(rest.split()[0])
+    except OSError:
+        pass
+    return usage
+
+
+def _wait_ready(url: str, workers: int, timeout: float) -> Optional[dict]:
+    """모든 워커가 heartbeat를 보고할 때까지 /health 폴링"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            health = httpx.get(url, timeout=1.0).json()
+            status = health.get("workers") or {}
+            if sum(w["healthy"] for w in status.get("workers", [])) == workers:
+                return health
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    return None
+
+
+def measure(workers: int, preload: bool, env: Optional[Dict[str, str]] = None, timeout: float = 180.0) -> dict:
+    """prefork 서버를 띄워 준비 완료까지의 시간, 워커별 RSS/PSS, graceful shutdown 시간을 측정"""
+    port = _free_port()
+    child_env = {
+        **os.environ,
+        **(env or {}),
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "SERVER_RELOAD": "false",
+        "SERVER_PRELOAD": str(preload).lower(),
+        "SERVER_HEARTBEAT_INTERVAL": "0.5",
+    }
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", f"from cine_analyst.app.server import serve; serve({workers})"],
+        env=child_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        health = _wait_ready(f"http://127.0.0.1:{port}/health", workers, timeout)
+        ready_s = time.perf_counter() - started
+        if health is None:
+            return {"workers": workers, "preload": preload, "error": "server did not become ready"}
+
+        worker_pids: List[int] = [w["pid"] for w in health["workers"]["workers"]]
+        per_worker = [{"pid": pid, **memory_kb(pid)} for pid in worker_pids]
+        master = {"pid": proc.pid, **memory_kb(proc.pid)}
+        total_pss = master.get("pss_kb", 0) + sum(w.get("pss_kb", 0) for w in per_worker)
+
+        stop_started = time.perf_counter()
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+        return {
+            "workers": workers,
+            "preload": preload,
+            "ready_s": round(ready_s, 3),
+            "shutdown_s": round(time.perf_counter() - stop_started, 3),
+            "master": master,
+            "per_worker": per_worker,
+            "total_pss_mb": round(total_pss / 1024, 1),
+            "avg_worker_rss_mb": round(sum(w.get("rss_kb", 0) for w in per_worker) / len(per_worker) / 1024, 1),
+            "avg_worker_pss_mb": round(sum(w.get("pss_kb", 0) for w in per_worker) / len(per_worker) / 1024, 1),
+        }
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def run_benchmark(workers: List[int], env: Optional[Dict[str, str]] = None) -> List[dict]:
+    results = []
+    for count in workers:
+        for preload in (True, False):
+            result = measure(count, preload, env)
+            logger.info(f"⏱️ workers={count} preload={preload}: {result.get('ready_s')}s, "
+                        f"total PSS {result.get('total_pss_mb')}MB")
+            results.append(result)
+    return results
+
+
+@click.command()
+@click.option('--workers', 'workers', multiple=True, type=int, default=(1, 2, 4), help='측정할 워커 수 (반복 지정)')
+@click.option('--no-warmup', is_flag=True, help='워밍업 없이 측정 (임베딩 모델 없는 환경)')
+@click.option('--output', 'output_path', default=None, help='결과 JSON 저장 경로')
+def run_cli(workers, no_warmup, output_path):
+    """prefork 서빙 모드의 준비 시간과 워커별 메모리(RSS/PSS)를 preload 유무로 비교"""
+    env = {"WARMUP_ENABLED": "false"} if no_warmup else None
+    results = run_benchmark(list(workers), env)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    click.echo(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,85 @@
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import click
+from loguru import logger
+
+# CLI 엔트리포인트별 모듈 (pyproject.toml [tool.poetry.scripts] 기준)
+ENTRY_POINTS = {
+    "cine-download": "cine_analyst.data.crawler",
+    "cine-preprocess": "cine_analyst.data.preprocessor",
+    "cine-ingest": "cine_analyst.data.ingestor",
+    "cine-train": "cine_analyst.training.trainer",
+    "cine-server": "cine_analyst.app.main",
+}
+
+# 지연 로딩 대상 무거운 의존성 (엔트리포인트 import 시 로드되면 보고)
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "langgraph", "opensearchpy", "neo4j")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """`python -X importtime` 출력 → [{module, self_us, cumulative_us, depth}]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": depth,
+        })
+    return rows
+
+
+def profile_module(module: str, top: int = 10, python: str = sys.executable) -> Dict:
+    """새 인터프리터에서 모듈 import 시간을 측정하고 가장 비싼 패키지와 로드된 무거운 의존성을 보고"""
+    probe = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    started = time.perf_counter()
+    result = subprocess.run([python, "-X", "importtime", "-c", probe], capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        return {"module": module, "error": result.stderr.strip().splitlines()[-1:]}
+
+    rows = parse_importtime(result.stderr)
+    total_us = sum(r["cumulative_us"] for r in rows if r["depth"] == 0)
+    # 최상위 패키지(점 없는 이름)가 처음 로드된 지점 기준으로 비싼 의존성 순위
+    packages = sorted(
+        (r for r in rows if "." not in r["module"] and not r["module"].startswith("cine_analyst")),
+        key=lambda r: r["cumulative_us"], reverse=True,
+    )
+    return {
+        "module": module,
+        "wall_s": round(wall, 3),
+        "import_s": round(total_us / 1e6, 3),
+        "heavy_modules": [m for m in result.stdout.strip().split(",") if m],
+        "top_imports": [
+            {"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in packages[:top]
+        ],
+    }
+
+
+def profile_entry_points(names: Optional[Sequence[str]] = None, top: int = 10) -> Dict:
+    report = {}
+    for name in names or ENTRY_POINTS:
+        report[name] = profile_module(ENTRY_POINTS[name], top=top)
+        logger.info(f"⏱️ {name}: {report[name].get('wall_s')}s heavy={report[name].get('heavy_modules')}")
+    return report
+
+
+@click.command()
+@click.option('--entry', 'entries', multiple=True, type=click.Choice(list(ENTRY_POINTS)), help='측정할 엔트리포인트 (기본: 전체)')
+@click.option('--top', default=10, type=int, help='보고할 상위 import 수')
+@click.option('--output', 'output_path', default=None, help='결과 JSON 저장 경로')
+def run_cli(entries, top, output_path):
+    """CLI 엔트리포인트별 import(콜드 스타트) 시간 프로파일링"""
+    report = profile_entry_points(entries, top)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
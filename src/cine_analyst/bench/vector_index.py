@@ -0,0 +1,109 @@
+import json
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import click
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.config import settings
+from cine_analyst.rag.local_index import LocalVectorIndex
+
+# 질의 벡터 1개 → 상위 k개 문서 id 목록
+SearchFn = Callable[[np.ndarray, int], List[str]]
+
+
+def recall_at_k(truth: Sequence[Sequence[str]], found: Sequence[Sequence[str]], k: int) -> float:
+    """정확 검색 결과 대비 상위 k개 중 되찾은 비율의 평균"""
+    scores = [len(set(t[:k]) & set(f[:k])) / max(len(t[:k]), 1) for t, f in zip(truth, found)]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def benchmark(backends: Dict[str, SearchFn], query_vectors: np.ndarray, truth: List[List[str]], k: int = 10) -> Dict:
+    """백엔드별로 질의를 하나씩 실행해 recall@k와 지연 분포(ms)를 측정"""
+    results = {}
+    for name, search_fn in backends.items():
+        found, latencies = [], []
+        for vector in query_vectors:
+            started = time.perf_counter()
+            found.append(search_fn(vector, k))
+            latencies.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            f"recall@{k}": round(recall_at_k(truth, found, k), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "mean_ms": round(float(np.mean(latencies)), 3),
+        }
+        logger.info(f"⏱️ {name}: {results[name]}")
+    return {"queries": len(query_vectors), "k": k, "backends": results}
+
+
+def local_search_fn(index: LocalVectorIndex) -> SearchFn:
+    def search(vector: np.ndarray, k: int) -> List[str]:
+        return [index.docs[i]["id"] for i in index.search_vectors(vector, k)[0]]
+    return search
+
+
+def opensearch_search_fn(client, index_name: str = settings.OPENSEARCH_INDEX) -> SearchFn:
+    """OpenSearchStore.search와 같은 kNN 쿼리 (id만 반환받아 응답 크기 영향 제거)"""
+    def search(vector: np.ndarray, k: int) -> List[str]:
+        body = {"size": k, "_source": False, "query": {"knn": {"overview_vector": {"vector": vector.tolist(), "k": k}}}}
+        response = client.search(index=index_name, body=body)
+        return [hit["_id"] for hit in response["hits"]["hits"]]
+    return search
+
+
+def run_benchmark(
+    index_dir: str = settings.LOCAL_INDEX_DIR,
+    num_queries: int = 200,
+    k: int = 10,
+    with_opensearch: bool = True,
+    output_path: Optional[str] = None,
+    seed: int = 42,
+) -> Dict:
+    """
+    카탈로그 문서 임베딩에서 질의를 샘플링해 정확 검색(matmul)을 정답으로 두고,
+    로컬 정확/근사 인덱스와 OpenSearch kNN의 recall@k, p50/p99 지연을 비교합니다.
+    """
+    # 정답 산출용 인덱스는 근사 인덱스를 끄고 정확 검색만 사용
+    approx = LocalVectorIndex(index_dir).load()
+    exact = LocalVectorIndex(index_dir).load()
+    exact.ann = None
+
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(exact.docs), size=min(num_queries, len(exact.docs)), replace=False)
+    query_vectors = np.asarray(exact.matrix[np.sort(picks)])
+    truth = [[exact.docs[i]["id"] for i in row] for row in exact.search_vectors(query_vectors, k)]
+
+    backends: Dict[str, SearchFn] = {"local_exact": local_search_fn(exact)}
+    if approx.ann is not None:
+        backends["local_ann"] = local_search_fn(approx)
+
+    client = None
+    if with_opensearch:
+        from opensearchpy import OpenSearch
+        client = OpenSearch(hosts=[settings.OPENSEARCH_URL], http_compress=True, use_ssl=False, verify_certs=False)
+        backends["opensearch_knn"] = opensearch_search_fn(client)
+    try:
+        report = benchmark(backends, query_vectors, truth, k)
+    finally:
+        if client is not None:
+            client.close()
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.success(f"✅ Benchmark report saved: {output_path}")
+    return report
+
+
+@click.command()
+@click.option('--index-dir', default=settings.LOCAL_INDEX_DIR, help='로컬 인덱스 경로')
+@click.option('--queries', 'num_queries', default=200, type=int, help='샘플링할 질의 수')
+@click.option('--k', default=10, type=int, help='recall@k의 k')
+@click.option('--opensearch/--no-opensearch', 'with_opensearch', default=True, help='OpenSearch kNN 비교 여부')
+@click.option('--output', 'output_path', default=None, help='결과 JSON 저장 경로')
+def run_cli(index_dir, num_queries, k, with_opensearch, output_path):
+    """로컬 벡터 인덱스 vs OpenSearch kNN 벤치마크"""
+    report = run_benchmark(index_dir, num_queries, k, with_opensearch, output_path)
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
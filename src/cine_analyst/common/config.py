@@ -16,12 +16,38 @@ class Settings(BaseSettings):
     # docker-compose 호스트 이름과 포트를 기본값으로 설정
     VLLM_URL: str = "http://vllm:8000/v1"
     MODEL_NAME: str = "tuned-sql"
+    VLLM_TIMEOUT: float = 30.0
+    VLLM_MAX_CONNECTIONS: int = 200
+    # 요청 병합 게이트웨이: 배치 수집 창(ms), 배치 최대 크기, vLLM 동시 요청 상한
+    LLM_BATCH_WINDOW_MS: float = 5.0
+    LLM_MAX_BATCH: int = 16
+    LLM_MAX_CONCURRENCY: int = 32
+
+    # [Server]
+    # SERVER_WORKERS > 1 또는 SERVER_RELOAD=false이면 preload + prefork 운영 모드로 실행
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    SERVER_RELOAD: bool = True
+    SERVER_PRELOAD: bool = True
+    SERVER_BACKLOG: int = 2048
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # 워커 heartbeat 주기와, 이 시간 이상 heartbeat가 없으면 재시작하는 기준 (초)
+    SERVER_HEARTBEAT_INTERVAL: float = 5.0
+    SERVER_WORKER_TIMEOUT: float = 60.0
+
+    # [Startup]
+    # lifespan 시작 시 임베딩 모델/토크나이저 로드와 저장소·vLLM 연결을 미리 수행
+    WARMUP_ENABLED: bool = True
 
     # [OpenSearch]
     OPENSEARCH_URL: str = "http://opensearch:9200"
     OPENSEARCH_USER: str = "admin"
     OPENSEARCH_PASSWORD: str = "admin"
     OPENSEARCH_INDEX: str = "movies"
+    # 벌크 요청당 문서 수 / parallel_bulk 스레드 수 (1이면 streaming_bulk)
+    OPENSEARCH_BULK_SIZE: int = 500
+    OPENSEARCH_BULK_THREADS: int = 1
 
     # [Neo4j]
     # docker-compose 설정값과 일치시킴
@@ -29,9 +55,122 @@ class Settings(BaseSettings):
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password123"
 
+    # [Connection Pool]
+    # 앱 수명 동안 재사용되는 클라이언트 풀 크기 (요청마다 새 연결을 만들지 않음)
+    OPENSEARCH_POOL_MAXSIZE: int = 20
+    OPENSEARCH_TIMEOUT: int = 10
+    NEO4J_MAX_POOL_SIZE: int = 50
+    NEO4J_ACQUISITION_TIMEOUT: float = 30.0
+    # 연결 오류가 이 횟수만큼 연속되면 클라이언트를 교체 (한두 번은 드라이버 자체 재연결에 맡김)
+    STORE_RESET_AFTER_FAILURES: int = 5
+    # UNWIND 한 번에 적재할 행 수 (명시적 쓰기 트랜잭션 단위)
+    NEO4J_BATCH_SIZE: int = 2000
+
+    # [Ingestion]
+    # 스트리밍 인제션 시 CSV를 읽어들이는 청크 크기 (메모리 상한)
+    INGEST_CHUNK_SIZE: int = 1000
+    # 증분 인제션용 매니페스트 (TMDB id → 행 내용 해시)
+    INGEST_MANIFEST_PATH: str = "./data/cache/ingest_manifest.json"
+
+    # [Response Cache]
+    # 정규화된 질의 exact 매칭 + 임베딩 코사인 유사도 기반 semantic 매칭
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL: float = 600.0
+    RESPONSE_CACHE_SEMANTIC: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+
+    # [Retrieval Cache]
+    # 저장소별 검색 결과 메모이제이션 (인제션 후 스탬프 파일로 무효화)
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_SIZE: int = 2048
+    VECTOR_CACHE_TTL: float = 300.0
+    GRAPH_CACHE_TTL: float = 900.0
+    INGEST_STAMP_PATH: str = "./data/cache/ingest.stamp"
+
+    # [Retrieval]
+    # 벡터/그래프 동시 검색의 브랜치별 타임아웃과 전체 지연 예산 (초)
+    RETRIEVAL_TOP_K: int = 3
+    VECTOR_RETRIEVE_TIMEOUT: float = 1.5
+    GRAPH_RETRIEVE_TIMEOUT: float = 1.5
+    RETRIEVAL_BUDGET: float = 2.0
+
+    # [Admission Control]
+    # /analyze 앞단 속도 제한(user_id별 토큰 버킷)과 과부하 시 조기 거절/검색 전용 응답
+    ADMISSION_ENABLED: bool = True
+    RATE_LIMIT_PER_USER: float = 5.0
+    RATE_LIMIT_BURST: float = 20.0
+    RATE_LIMIT_MAX_USERS: int = 10000
+    ADMISSION_MAX_CONCURRENCY: int = 32
+    ADMISSION_MAX_QUEUE: int = 128
+    # 요청별 deadline 기본값이자 상한 (초). 예상 대기 시간이 이를 넘으면 대기열에 넣지 않음
+    ADMISSION_DEADLINE: float = 10.0
+    # True: 과부하 시 503 대신 vLLM 없이 검색 결과만으로 응답
+    ADMISSION_DEGRADED_MODE: bool = True
+    # vLLM 장애 대응 등으로 모든 요청을 검색 전용으로 처리
+    ADMISSION_FORCE_DEGRADED: bool = False
+
+    # [Batch Analysis]
+    # /api/v1/analyze/batch, cine-analyze-batch: 청크 단위로 encode/_msearch/UNWIND 한 번씩 수행
+    BATCH_MAX_REQUESTS: int = 5000
+    BATCH_CHUNK_SIZE: int = 64
+    # 배치 하나가 동시에 점유할 수 있는 vLLM 호출 수 (게이트웨이 전체 한도 LLM_MAX_CONCURRENCY 이내)
+    BATCH_LLM_CONCURRENCY: int = 16
+    BATCH_RETRIEVE_TIMEOUT: float = 30.0
+
+    # [Circuit Breaker]
+    # 백엔드(vector / graph / llm)별 연속 실패 임계값과 open 유지 시간 (초), half-open 시험 호출 수
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 10.0
+    BREAKER_HALF_OPEN_PROBES: int = 1
+    # vLLM 호출별 deadline (VLLM_TIMEOUT보다 짧게 두어 게이트웨이에서 먼저 끊음)
+    LLM_CALL_TIMEOUT: float = 20.0
+
+    # [Hedged Retrieval]
+    # 검색 호출이 최근 p95 지연을 넘기면 같은 요청을 한 번 더 보내 먼저 온 결과 사용
+    HEDGE_ENABLED: bool = False
+    HEDGE_MIN_DELAY: float = 0.02
+    # p95 계산에 필요한 최소 표본 수 (부족하면 헤지하지 않음)
+    HEDGE_MIN_SAMPLES: int = 20
+
+    # [Context Packing]
+    # analyst 프롬프트에 넣을 검색 문맥 토큰 상한과 토큰 계산용 토크나이저 (빈 값이면 추정치)
+    CONTEXT_TOKEN_BUDGET: int = 768
+    CONTEXT_TOKENIZER: str = "unsloth/Qwen2.5-1.5B-Instruct"
+
+    # [Hybrid Retrieval]
+    # BM25(multi_match) + kNN(overview_vector)를 _msearch 한 번으로 조회 후 RRF로 결합
+    HYBRID_SEARCH_ENABLED: bool = True
+    # 각 검색기에서 가져올 후보 수 (최종 k보다 작으면 k 사용)
+    HYBRID_CANDIDATES: int = 20
+    RRF_K: int = 60
+
+    # [Recommendations]
+    # cine-build-neighbors로 생성하는 감독/장르 겹침 기반 이웃 테이블
+    NEIGHBOR_INDEX_PATH: str = "./data/index/neighbors.npz"
+    NEIGHBOR_TOP_N: int = 20
+    NEIGHBOR_DIRECTOR_WEIGHT: float = 2.0
+    NEIGHBOR_GENRE_WEIGHT: float = 1.0
+    RECOMMENDATION_K: int = 5
+
+    # [Vector Backend]
+    # "opensearch": kNN 쿼리 / "local": memmap 행렬 기반 인프로세스 검색 (cine-build-index로 생성)
+    VECTOR_BACKEND: str = "opensearch"
+    LOCAL_INDEX_DIR: str = "./data/index/vectors"
+    # 문서 수가 임계값 이상일 때만 HNSW(hnswlib) 근사 인덱스 사용
+    LOCAL_INDEX_ANN: bool = False
+    LOCAL_INDEX_ANN_MIN_SIZE: int = 50000
+    LOCAL_INDEX_ANN_EF: int = 128
+
     # [Model Settings]
     BASE_MODEL_NAME: str = "unsloth/Qwen2.5-1.5B-Instruct"
     EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE: int = 64
+    # 0: 단일 프로세스, -1: 모든 CPU 코어, N: N개 프로세스 풀
+    EMBEDDING_NUM_WORKERS: int = 0
+    # 모델명 + 텍스트 해시 기반 디스크 임베딩 캐시 (재인제션 시 재계산 방지)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIR: str = "./data/cache/embeddings"
     MAX_SEQ_LENGTH: int = 2048
     LOAD_IN_4BIT: bool = True
     HF_TOKEN: Optional[str] = None
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """차단기가 열려 있어 백엔드를 호출하지 않고 즉시 실패"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit '{name}' is open (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    백엔드별 회로 차단기.
+    - closed: 연속 실패(오류/타임아웃)가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 호출 없이 CircuitOpen으로 즉시 실패
+    - half_open: reset_timeout 후 half_open_probes개의 시험 호출만 통과시켜 성공하면 closed, 실패하면 다시 open
+    성공한 호출의 지연 시간을 모아 헤지 요청 기준(p95)으로도 사용합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = settings.BREAKER_RESET_TIMEOUT,
+        half_open_probes: int = settings.BREAKER_HALF_OPEN_PROBES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probes_in_flight = 0
+        self.latencies: deque = deque(maxlen=256)
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.opened = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self.probes_in_flight = 0
+            logger.info(f"🔌 Circuit '{self.name}' half-open, probing")
+        return self._state
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def ensure_closed(self):
+        """호출 전 빠른 확인 (시험 호출 슬롯은 소비하지 않음)"""
+        if self.state == OPEN:
+            self.short_circuited += 1
+            raise CircuitOpen(self.name, self._retry_after())
+
+    def before_call(self) -> bool:
+        """호출 허가. half_open 시험 호출이면 True 반환 (결과를 반드시 after_* 로 보고)"""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self.probes_in_flight >= self.half_open_probes):
+            self.short_circuited += 1
+            raise CircuitOpen(self.name, self._retry_after())
+        self.calls += 1
+        if state == HALF_OPEN:
+            self.probes_in_flight += 1
+            return True
+        return False
+
+    def after_success(self, probe: bool, elapsed: Optional[float] = None):
+        if probe:
+            self.probes_in_flight -= 1
+        if elapsed is not None:
+            self.latencies.append(elapsed)
+        self.consecutive_failures = 0
+        if self._state != CLOSED:
+            logger.success(f"✅ Circuit '{self.name}' closed")
+            self._state = CLOSED
+
+    def after_failure(self, probe: bool):
+        if probe:
+            self.probes_in_flight -= 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def after_cancel(self, probe: bool):
+        # 상위 지연 예산 초과 등 호출자 사정으로 취소된 호출은 성공/실패로 세지 않음
+        if probe:
+            self.probes_in_flight -= 1
+
+    def reset(self):
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.probes_in_flight = 0
+        self.latencies.clear()
+
+    def _open(self):
+        if self._state != OPEN:
+            self.opened += 1
+            logger.error(f"⛔ Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures")
+        self._state = OPEN
+        self.opened_at = self.clock()
+
+    async def call(self, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None, sample: bool = True) -> T:
+        """차단기를 거쳐 fn() 실행. timeout(호출별 deadline) 초과도 실패로 집계"""
+        probe = self.before_call()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(fn(), timeout=timeout) if timeout else await fn()
+        except asyncio.CancelledError:
+            self.after_cancel(probe)
+            raise
+        except Exception:
+            self.after_failure(probe)
+            raise
+        self.after_success(probe, time.perf_counter() - started if sample else None)
+        return result
+
+    def percentile(self, q: float = 95.0, min_samples: int = settings.HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """최근 성공 호출 지연의 백분위 (초). 표본이 부족하면 None"""
+        if len(self.latencies) < min_samples:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    def snapshot(self) -> Dict:
+        p95 = self.percentile(min_samples=1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "opened": self.opened,
+            "retry_after_s": round(self._retry_after(), 1) if self._state == OPEN else 0.0,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+class BreakerRegistry:
+    """백엔드 이름(vector / graph / llm)별 차단기 (처음 조회할 때 생성)"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name)
+        return breaker
+
+    def reset(self):
+        """모든 차단기를 closed로 되돌림 (테스트/운영자 수동 복구용)"""
+        for breaker in self._breakers.values():
+            breaker.reset()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    hedge_after: Optional[float],
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """
+    헤지 요청: 첫 호출이 hedge_after초 안에 끝나지 않으면 같은 호출을 하나 더 보내
+    먼저 성공한 결과를 사용하고 나머지는 취소합니다 (hedge_after=None이면 단일 호출).
+    """
+    if hedge_after is None:
+        return await call()
+
+    first = asyncio.ensure_future(call())
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done:
+            return first.result()
+        second = asyncio.ensure_future(call())
+        tasks.add(second)
+        if breaker is not None:
+            breaker.hedged += 1
+
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second and breaker is not None:
+                        breaker.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# 프로세스 전역 차단기 (/health에서 상태 확인)
+breakers = BreakerRegistry()
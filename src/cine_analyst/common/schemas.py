@@ -24,10 +24,24 @@ class AnalysisRequest(BaseModel):
     """사용자로부터 받는 분석 요청 규격"""
     query: str = Field(..., example="봉준호 감독의 기생충과 비슷한 사회 비판적인 영화 추천해줘")
     user_id: Optional[str] = Field("guest", description="사용자 식별자")
+    include_timings: bool = Field(False, description="응답에 단계별 소요 시간(ms)을 포함할지 여부")
+    deadline_ms: Optional[int] = Field(None, gt=0, description="응답 기한 (ms, 서버 기본값 ADMISSION_DEADLINE보다 길게는 불가)")
 
 class AnalysisResponse(BaseModel):
     """에이전트 분석 결과 응답 규격"""
     answer: str = Field(..., description="LLM 에이전트가 생성한 최종 답변")
     context: Optional[str] = Field(None, description="RAG 과정에서 참조된 데이터베이스 컨텍스트")
     recommendations: List[str] = Field(default_factory=list, description="그래프 DB 기반 추천 영화 목록")
-    confidence_score: float = Field(0.0, description="답변의 신뢰도 점수 (QoS 평가용)")
\ No newline at end of file
+    confidence_score: float = Field(0.0, description="답변의 신뢰도 점수 (QoS 평가용)")
+    prompt_tokens: Optional[int] = Field(None, description="analyst 프롬프트 토큰 수 (vLLM prefill 비용 추적용)")
+    request_id: Optional[str] = Field(None, description="요청 추적 ID (X-Request-ID 헤더 또는 user_id 기반 생성)")
+    timings: Optional[Dict[str, float]] = Field(None, description="include_timings 요청 시 span별 소요 시간 (ms)")
+    degraded: bool = Field(False, description="과부하로 vLLM 없이 검색 결과만으로 응답했는지 여부")
+
+class BatchAnalysisRequest(BaseModel):
+    """오프라인 리포팅용 일괄 분석 요청"""
+    requests: List[AnalysisRequest] = Field(..., min_length=1, description="분석할 요청 목록")
+
+class BatchAnalysisItem(AnalysisResponse):
+    """일괄 분석 NDJSON 한 줄 (완료 순서대로 전송되므로 원래 위치를 index로 표시)"""
+    index: int = Field(..., description="requests 목록에서의 위치")
@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+# 요청 단위 식별자와 span 기록 (LangGraph 노드 태스크에도 컨텍스트가 복사되어 전파됨)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_spans_var: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("spans", default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Prometheus 텍스트 포맷으로 노출하는 누적 버킷 히스토그램 (라벨 조합별, 스레드 안전)"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for key, (counts, total, count) in items:
+                base = ",".join(f'{n}="{v}"' for n, v in zip(self.labelnames, key))
+                cumulative = 0
+                for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    sep = "," if base else ""
+                    lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+                labels = f"{{{base}}}" if base else ""
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+SPAN_SECONDS = Histogram(
+    "cine_span_duration_seconds", "Duration of workflow nodes and store/LLM calls", ("span", "outcome"), LATENCY_BUCKETS
+)
+SPAN_PAYLOAD = Histogram(
+    "cine_span_payload_size", "Payload size per span (items for stores, characters for LLM)", ("span",), SIZE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "cine_request_duration_seconds", "End-to-end API request duration", ("endpoint", "outcome"), LATENCY_BUCKETS
+)
+HISTOGRAMS = (SPAN_SECONDS, SPAN_PAYLOAD, REQUEST_SECONDS)
+
+
+def render_metrics() -> str:
+    """/metrics 응답 본문 (Prometheus text exposition 0.0.4)"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+class Span:
+    """span 안에서 payload 크기를 기록하기 위한 핸들"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.size: Optional[float] = None
+
+
+@contextmanager
+def span(name: str):
+    """
+    구간 소요 시간/결과(ok, error)/payload 크기를 히스토그램에 기록하고,
+    요청 컨텍스트가 있으면 요청별 타이밍 목록에도 추가합니다.
+    """
+    handle = Span(name)
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield handle
+    except BaseException as e:
+        outcome = "timeout" if isinstance(e, (asyncio.TimeoutError, asyncio.CancelledError)) else "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        SPAN_SECONDS.observe(elapsed, span=name, outcome=outcome)
+        if handle.size is not None:
+            SPAN_PAYLOAD.observe(handle.size, span=name)
+        spans = _spans_var.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def traced_node(name: str, fn: Callable) -> Callable:
+    """LangGraph 노드(sync/async)를 node.<name> span으로 감쌈"""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            with span(f"node.{name}"):
+                return await fn(state)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        with span(f"node.{name}"):
+            return fn(state)
+    return wrapper
+
+
+def start_request(header_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+    """
+    요청 컨텍스트 시작. X-Request-ID 헤더가 있으면 그대로 쓰고,
+    없으면 user_id를 접두어로 새 ID를 만듭니다 (로그/트레이스에서 사용자 단위 추적용).
+    """
+    request_id = header_id or f"{user_id or 'anonymous'}-{uuid.uuid4().hex[:12]}"
+    request_id_var.set(request_id)
+    _spans_var.set([])
+    return request_id
+
+
+def request_timings() -> Dict[str, float]:
+    """현재 요청의 span별 소요 시간 합계 (ms)"""
+    timings: Dict[str, float] = {}
+    for name, elapsed in _spans_var.get() or []:
+        timings[name] = round(timings.get(name, 0.0) + elapsed * 1000, 3)
+    return timings
+
+
+@contextmanager
+def track_request(endpoint: str):
+    """API 핸들러 전체 소요 시간 기록 + 요청 ID를 로그 컨텍스트에 바인딩"""
+    started = time.perf_counter()
+    outcome = "ok"
+    with logger.contextualize(request_id=request_id_var.get()):
+        try:
+            yield
+        except BaseException as e:
+            # 승인 제어의 429/503 거절은 처리 오류와 구분해 집계
+            outcome = "rejected" if getattr(e, "status_code", None) in (429, 503) else "error"
+            raise
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, outcome=outcome)
@@ -1,27 +1,63 @@
 import os
 import json
+import time
 import click
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from loguru import logger
 from opensearchpy import OpenSearch, helpers
 from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
 
 from cine_analyst.common.config import settings
 from cine_analyst.rag.base import VectorStoreBase, GraphStoreBase
+from cine_analyst.rag.embedding import EmbeddingCache, encode_texts
+from cine_analyst.rag.graph import RELATED_MOVIES_QUERY, write_in_batches
+from cine_analyst.data.pipeline import FanOutConsumer, IngestionReport, fan_out
+from cine_analyst.data.manifest import IngestManifest
+from cine_analyst.rag.cache import notify_ingested
 
 class OpenSearchStore(VectorStoreBase):
     """OpenSearch를 이용한 VectorStore 구현체"""
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        num_workers: int = settings.EMBEDDING_NUM_WORKERS,
+        use_cache: bool = settings.EMBEDDING_CACHE_ENABLED
+    ):
         self.client = OpenSearch(
             hosts=[settings.OPENSEARCH_URL],
             http_compress=True, 
             use_ssl=False, 
             verify_certs=False
         )
-        self.embedder = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.bulk_size = settings.OPENSEARCH_BULK_SIZE
+        self.bulk_threads = settings.OPENSEARCH_BULK_THREADS
+        self._index_ready = False
+        # 단계별 리포트용 누적 통계
+        self.stats = {"rows": 0, "skipped": 0, "indexed": 0, "embed_time": 0.0, "bulk_time": 0.0}
+        # raise_on_error=False로 건너뛴 문서 _id (증분 인제션 매니페스트에서 제외)
+        self.failed_ids = set()
+        self.cache = EmbeddingCache() if use_cache else None
+        # 캐시가 모두 적중하면 모델 로딩 자체를 건너뛰도록 지연 로딩
+        self._embedder = None
 
-    def ingest(self, df: pd.DataFrame):
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            # torch를 끌고 오는 sentence-transformers는 실제 임베딩이 필요할 때만 import
+            from sentence_transformers import SentenceTransformer
+            self._embedder = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        return self._embedder
+
+    def _encode(self, texts):
+        return encode_texts(self.embedder, texts, batch_size=self.batch_size, num_workers=self.num_workers)
+
+    def ensure_index(self):
+        """kNN 인덱스가 없으면 생성 (스트리밍 모드에서는 첫 청크에서 한 번만 확인)"""
+        if self._index_ready:
+            return
         index_name = settings.OPENSEARCH_INDEX
         index_body = {
             "settings": {"index": {"knn": True}},
@@ -38,33 +74,119 @@ class OpenSearchStore(VectorStoreBase):
         
         if not self.client.indices.exists(index=index_name):
             self.client.indices.create(index=index_name, body=index_body)
-        
-        requests = []
-        logger.info(f"Generating embeddings for {len(df)} docs...")
-        
-        for _, row in df.iterrows():
-            if pd.isna(row['overview']): continue
-            
-            vector = self.embedder.encode(row['overview']).tolist()
-            doc = {
-                "_index": index_name,
+        self._index_ready = True
+
+    def iter_actions(self, df: pd.DataFrame):
+        """한 청크를 임베딩한 뒤 벌크 액션을 하나씩 생성"""
+        docs = df[df['overview'].notna()]
+        self.stats["rows"] += len(df)
+        self.stats["skipped"] += len(df) - len(docs)
+        logger.info(f"Generating embeddings for {len(docs)} docs...")
+
+        # 행 단위 encode 대신 배치(또는 멀티 프로세스) 인코딩, 직렬화 직전까지 float32 유지
+        started = time.perf_counter()
+        texts = docs['overview'].astype(str).tolist()
+        if self.cache is not None:
+            # 신규/변경된 overview만 임베딩하고 나머지는 디스크 캐시 재사용
+            vectors = self.cache.encode(texts, self._encode)
+        else:
+            vectors = self._encode(texts)
+        self.stats["embed_time"] += time.perf_counter() - started
+
+        # TMDB id를 문서 _id로 사용해 재실행 시에도 중복 문서 없이 덮어쓰기
+        doc_ids = docs['id'] if 'id' in docs else [None] * len(docs)
+        for doc_id, title, overview, vector in zip(doc_ids, docs['title'], docs['overview'], vectors):
+            action = {
+                "_index": settings.OPENSEARCH_INDEX,
                 "_source": {
-                    "title": row['title'],
-                    "overview": row['overview'],
-                    "overview_vector": vector
+                    "title": title,
+                    "overview": overview,
+                    "overview_vector": vector.tolist()
                 }
             }
-            requests.append(doc)
-        
-        helpers.bulk(self.client, requests)
-        logger.success(f"✅ Vector DB Ingestion complete: {len(requests)} docs")
+            if doc_id is not None:
+                action["_id"] = str(doc_id)
+            yield action
+
+    def _bulk(self, actions) -> int:
+        """
+        액션 제너레이터를 streaming_bulk(또는 parallel_bulk)로 소비.
+        필요한 만큼만 당겨 오므로 상류(CSV 읽기/임베딩)에 자연스럽게 backpressure가 걸립니다.
+        """
+        started = time.perf_counter()
+        embed_before = self.stats["embed_time"]
+        success = self._consume_bulk(actions)
+        # 제너레이터 안에서 소요된 임베딩 시간을 빼고 순수 벌크 시간만 집계
+        elapsed = time.perf_counter() - started
+        self.stats["bulk_time"] += elapsed - (self.stats["embed_time"] - embed_before)
+        self.stats["indexed"] += success
+        return success
+
+    def _consume_bulk(self, actions) -> int:
+        if self.bulk_threads > 1:
+            results = helpers.parallel_bulk(
+                self.client, actions,
+                thread_count=self.bulk_threads,
+                chunk_size=self.bulk_size,
+                queue_size=self.bulk_threads,
+                raise_on_error=False
+            )
+        else:
+            results = helpers.streaming_bulk(
+                self.client, actions,
+                chunk_size=self.bulk_size,
+                raise_on_error=False
+            )
+
+        success, failed = 0, 0
+        for ok, item in results:
+            if ok:
+                success += 1
+            else:
+                failed += 1
+                # item 예: {"index": {"_id": "42", "status": 429, "error": {...}}}
+                doc_id = next(iter(item.values()), {}).get("_id")
+                if doc_id is not None:
+                    self.failed_ids.add(str(doc_id))
+                logger.warning(f"⚠️ Bulk item failed: {item}")
+        if failed:
+            logger.error(f"❌ {failed} docs failed to index")
+        return success
+
+    def ingest(self, df: pd.DataFrame):
+        self.ensure_index()
+        success = self._bulk(self.iter_actions(df))
+        logger.success(f"✅ Vector DB Ingestion complete: {success} docs")
+        return success
+
+    def ingest_stream(self, chunks):
+        """DataFrame 청크 이터레이터를 임베딩 → 벌크 색인하는 제한 메모리 파이프라인"""
+        self.ensure_index()
+        actions = (action for chunk in chunks for action in self.iter_actions(chunk))
+        success = self._bulk(actions)
+        logger.success(f"✅ Vector DB streaming ingestion complete: {success} docs")
+        return success
+
+    def delete(self, doc_ids):
+        """증분 인제션에서 원본에서 사라진 문서 삭제"""
+        actions = (
+            {"_op_type": "delete", "_index": settings.OPENSEARCH_INDEX, "_id": str(doc_id)}
+            for doc_id in doc_ids
+        )
+        deleted, _ = helpers.bulk(self.client, actions, raise_on_error=False)
+        logger.info(f"🗑️ OpenSearch: {deleted} docs deleted")
+        return deleted
+
+    def close(self):
+        self.client.close()
 
     def search(self, query: str, k: int = 5):
-        """벡터 검색 구현 (필수 추상 메서드)"""
+        """벡터 검색 구현 (필수 추상 메서드). 임베딩 필드를 뺀 _source 목록 반환"""
         query_vector = self.embedder.encode(query).tolist()
         
         search_query = {
             "size": k,
+            "_source": {"excludes": ["overview_vector"]},
             "query": {
                 "knn": {
                     "overview_vector": {
@@ -79,70 +201,214 @@ class OpenSearchStore(VectorStoreBase):
             index=settings.OPENSEARCH_INDEX,
             body=search_query
         )
-        return response
+        return [hit["_source"] for hit in response["hits"]["hits"]]
 
 class Neo4jStore(GraphStoreBase):
     """Neo4j를 이용한 GraphStore 구현체"""
-    def __init__(self):
+    # 행마다 session.run 하지 않고 배치 단위로 UNWIND (MERGE 기반이라 배치 재시도에도 멱등)
+    BATCH_QUERY = """
+    UNWIND $rows AS row
+    MERGE (m:Movie {title: row.title})
+    SET m.overview = row.overview, m.id = row.id
+    WITH m, row
+    OPTIONAL MATCH (m)-[old:HAS_GENRE]->(:Genre)
+    DELETE old
+    WITH DISTINCT m, row
+    UNWIND row.genres AS g_data
+    MERGE (g:Genre {name: g_data.name})
+    MERGE (m)-[:HAS_GENRE]->(g)
+    """
+    DELETE_QUERY = """
+    UNWIND $rows AS doc_id
+    MATCH (m:Movie {id: doc_id})
+    DETACH DELETE m
+    """
+
+    def __init__(self, batch_size: int = settings.NEO4J_BATCH_SIZE):
         self.driver = GraphDatabase.driver(
             settings.NEO4J_URI,
             auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
         )
+        self.batch_size = batch_size
+        self._schema_ready = False
+        self.stats = {"rows": 0, "skipped": 0, "written": 0, "graph_time": 0.0}
+
+    def ensure_schema(self):
+        if self._schema_ready:
+            return
+        with self.driver.session() as session:
+            session.run("CREATE CONSTRAINT movie_title IF NOT EXISTS FOR (m:Movie) REQUIRE m.title IS UNIQUE").consume()
+        self._schema_ready = True
+
+    @staticmethod
+    def to_rows(df: pd.DataFrame):
+        """DataFrame을 UNWIND 파라미터 행으로 변환 (장르 JSON 파싱 실패 행은 건너뜀)"""
+        rows = []
+        doc_ids = df['id'] if 'id' in df else [None] * len(df)
+        for doc_id, title, overview, genres in zip(doc_ids, df['title'], df['overview'], df['genres']):
+            try:
+                rows.append({"id": doc_id, "title": title, "overview": str(overview), "genres": json.loads(genres)})
+            except Exception:
+                continue
+        return rows
 
     def ingest(self, df: pd.DataFrame):
-        query_create = """
-        MERGE (m:Movie {title: $title})
-        SET m.overview = $overview
-        WITH m
-        UNWIND $genres as g_data
-        MERGE (g:Genre {name: g_data.name})
-        MERGE (m)-[:HAS_GENRE]->(g)
-        """
-        
         logger.info("Ingesting Knowledge Graph to Neo4j...")
+        started = time.perf_counter()
+        self.ensure_schema()
+
+        rows = self.to_rows(df)
+        count = write_in_batches(self.driver, self.BATCH_QUERY, rows, self.batch_size)
+
+        self.stats["rows"] += len(df)
+        self.stats["skipped"] += len(df) - len(rows)
+        self.stats["written"] += count
+        self.stats["graph_time"] += time.perf_counter() - started
+        logger.success(f"✅ Graph DB Ingestion complete: {count} nodes created")
+        return count
+
+    def search(self, query: str, k: int = 5):
+        """적재 결과 확인용 관계형 검색 (서빙 경로의 GraphSearch와 같은 쿼리)"""
         with self.driver.session() as session:
-            session.run("CREATE CONSTRAINT movie_title IF NOT EXISTS FOR (m:Movie) REQUIRE m.title IS UNIQUE")
-            
-            count = 0
-            for _, row in df.iterrows():
-                try:
-                    genres = json.loads(row['genres'])
-                    session.run(query_create, 
-                                title=row['title'], 
-                                overview=str(row['overview']), 
-                                genres=genres)
-                    count += 1
-                except Exception:
-                    continue
-        
+            result = session.run(RELATED_MOVIES_QUERY, title=query, k=k)
+            return [record["title"] for record in result]
+
+    def ingest_stream(self, chunks):
+        """청크 이터레이터를 순서대로 배치 적재"""
+        return sum(self.ingest(chunk) for chunk in chunks)
+
+    def delete(self, doc_ids):
+        """증분 인제션에서 원본에서 사라진 영화 노드 삭제"""
+        deleted = write_in_batches(self.driver, self.DELETE_QUERY, list(doc_ids), self.batch_size)
+        logger.info(f"🗑️ Neo4j: {deleted} movies deleted")
+        return deleted
+
+    def close(self):
         self.driver.close()
-        logger.success(f"✅ Graph DB Ingestion complete: {count} nodes created")
 
-def run_ingestion(input_path: str, sample_size: int = 100):
-    """전체 인제션 파이프라인 실행 엔진"""
+def iter_csv_chunks(input_path: str, chunk_size: int = settings.INGEST_CHUNK_SIZE, limit: int = None):
+    """CSV를 chunk_size 단위로 읽어 DataFrame 청크를 생성 (limit이 없으면 전체)"""
+    remaining = limit
+    for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            chunk = chunk.head(remaining)
+            remaining -= len(chunk)
+        yield chunk
+
+def _run_stage(name: str, fn, *args):
+    """저장소별 적재를 실행하고 실패해도 다른 저장소 작업은 계속되도록 예외를 기록"""
+    try:
+        return fn(*args)
+    except Exception as e:
+        logger.error(f"Ingestion failed ({name}): {e}")
+    finally:
+        # 스트리밍 소비자가 청크를 받기 전에 실패해도 fan_out 생산자가 이 큐에서 막히지 않도록 닫음
+        for arg in args:
+            if isinstance(arg, FanOutConsumer):
+                arg.close()
+
+def run_ingestion(
+    input_path: str,
+    sample_size: int = 100,
+    batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    num_workers: int = settings.EMBEDDING_NUM_WORKERS,
+    use_cache: bool = settings.EMBEDDING_CACHE_ENABLED,
+    stream: bool = False,
+    chunk_size: int = settings.INGEST_CHUNK_SIZE,
+    report_path: str = None,
+    incremental: bool = False
+):
+    """
+    전체 인제션 파이프라인 실행 엔진 (OpenSearch / Neo4j 적재를 동시에 실행)
+    incremental=True이면 매니페스트와 비교해 신규/변경/삭제분만 반영합니다.
+    삭제는 --limit 없이 전체 입력을 읽은 경우에만 계산합니다.
+    """
     if not os.path.exists(input_path):
         logger.error(f"Input file not found: {input_path}")
         return
 
-    # 데이터 로드 및 샘플링 적용
-    df = pd.read_csv(input_path).head(sample_size)
-    
     # 추상화된 구현체 사용 (의존성 주입 형태)
-    vector_store = OpenSearchStore()
+    vector_store = OpenSearchStore(batch_size=batch_size, num_workers=num_workers, use_cache=use_cache)
     graph_store = Neo4jStore()
+    manifest = IngestManifest() if incremental else None
+    deleted_ids = []
     
+    started = time.perf_counter()
     try:
-        vector_store.ingest(df)
-        graph_store.ingest(df)
-    except Exception as e:
-        logger.error(f"Ingestion failed: {e}")
+        # 두 저장소는 서로 독립적이므로 스레드 풀에서 동시에 적재
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest") as executor:
+            if stream:
+                # CSV 청크를 두 저장소에 제한 큐로 분배 (메모리 상한 = 청크 크기 × 큐 길이)
+                chunks = iter_csv_chunks(input_path, chunk_size=chunk_size, limit=sample_size or None)
+                if manifest is not None:
+                    chunks = (manifest.changed(chunk) for chunk in chunks)
+                vector_chunks, graph_chunks = fan_out(chunks, consumers=2)
+                futures = [
+                    executor.submit(_run_stage, "opensearch", vector_store.ingest_stream, vector_chunks),
+                    executor.submit(_run_stage, "neo4j", graph_store.ingest_stream, graph_chunks),
+                ]
+            else:
+                # 데이터 로드 및 샘플링 적용 (0이면 전체)
+                df = pd.read_csv(input_path)
+                if sample_size:
+                    df = df.head(sample_size)
+                if manifest is not None:
+                    df = manifest.changed(df)
+                futures = [
+                    executor.submit(_run_stage, "opensearch", vector_store.ingest, df),
+                    executor.submit(_run_stage, "neo4j", graph_store.ingest, df),
+                ]
+            results = [future.result() for future in futures]
+
+        # 양쪽 적재가 모두 성공했을 때만 삭제를 반영하고 매니페스트를 갱신 (실패 시 다음 실행에서 재시도)
+        if manifest is not None and all(r is not None for r in results):
+            deleted_ids = manifest.deleted_ids() if not sample_size else []
+            if deleted_ids:
+                vector_store.delete(deleted_ids)
+                graph_store.delete(deleted_ids)
+            # 벌크 색인에서 실패한 문서는 해시를 남기지 않아 다음 실행에서 다시 적재
+            manifest.commit(deleted_ids, failed_ids=vector_store.failed_ids)
+    finally:
+        vector_store.close()
+        graph_store.close()
+        # 일부만 적재되었더라도 서빙 중인 검색 캐시가 오래된 결과를 돌려주지 않도록 무효화
+        notify_ingested()
+
+    report = IngestionReport.collect(vector_store.stats, graph_store.stats, time.perf_counter() - started)
+    if manifest is not None:
+        report.rows_unchanged = manifest.unchanged
+        report.rows_read += manifest.unchanged
+        report.rows_deleted = len(deleted_ids)
+    report.log()
+    if report_path:
+        report.save(report_path)
+    return report
 
 @click.command()
 @click.option('--input', 'input_path', default=settings.RAW_DATA_PATH, help='적재할 원본 CSV 경로')
 @click.option('--limit', 'limit', default=100, type=int, help='적재할 최대 데이터 개수')
-def run_cli(input_path, limit):
+@click.option('--batch-size', default=settings.EMBEDDING_BATCH_SIZE, type=int, help='임베딩 배치 크기')
+@click.option('--workers', default=settings.EMBEDDING_NUM_WORKERS, type=int, help='임베딩 프로세스 수 (0: 단일, -1: 전체 코어)')
+@click.option('--cache/--no-cache', 'use_cache', default=settings.EMBEDDING_CACHE_ENABLED, help='디스크 임베딩 캐시 사용 여부')
+@click.option('--stream', is_flag=True, help='CSV를 청크 단위로 읽어 제한 메모리로 적재 (--limit 0이면 전체)')
+@click.option('--chunk-size', default=settings.INGEST_CHUNK_SIZE, type=int, help='스트리밍 모드 청크 크기')
+@click.option('--report', 'report_path', default=None, help='단계별 리포트를 JSON으로 저장할 경로')
+@click.option('--incremental', is_flag=True, help='매니페스트 기준 신규/변경/삭제분만 반영 (삭제는 --limit 0일 때만)')
+def run_cli(input_path, limit, batch_size, workers, use_cache, stream, chunk_size, report_path, incremental):
     """
     CLI 명령어 실행. 
     인자가 있으면 입력받은 값을 사용하고, 없으면 config의 기본값을 사용합니다.
     """
-    run_ingestion(input_path=input_path, sample_size=limit)
\ No newline at end of file
+    run_ingestion(
+        input_path=input_path,
+        sample_size=limit,
+        batch_size=batch_size,
+        num_workers=workers,
+        use_cache=use_cache,
+        stream=stream,
+        chunk_size=chunk_size,
+        report_path=report_path,
+        incremental=incremental
+    )
\ No newline at end of file
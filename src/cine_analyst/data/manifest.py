@@ -0,0 +1,79 @@
+import json
+import os
+from typing import Dict, Iterable, List
+
+import pandas as pd
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+
+def _canonical(column: pd.Series) -> pd.Series:
+    """
+    dtype과 무관한 값의 문자열 표현 (결측 → "", 정수값 float 123.0 → "123").
+    청크마다 결측 유무로 int64/float64 추론이 달라져도 같은 행은 같은 문자열이 됩니다.
+    """
+    text = column.astype(str)
+    if pd.api.types.is_float_dtype(column):
+        whole = column.notna() & (column % 1 == 0)
+        text[whole] = column[whole].astype("int64").astype(str)
+    return text.mask(column.isna(), "")
+
+
+class IngestManifest:
+    """
+    증분 인제션을 위한 로컬 매니페스트 (TMDB id → 행 내용 해시).
+    이전 실행과 비교해 신규/변경 행만 골라내고, 입력에서 사라진 id를 삭제 대상으로 계산합니다.
+    """
+
+    def __init__(self, path: str = settings.INGEST_MANIFEST_PATH, id_column: str = "id"):
+        self.path = path
+        self.id_column = id_column
+        self.hashes: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+        self._seen = set()
+        self.unchanged = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.hashes = json.load(f)
+
+    def changed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """청크에서 신규/변경 행만 반환 (해시는 commit 전까지 보류)"""
+        ids = _canonical(df[self.id_column])
+        # 정규화한 컬럼 값을 행 단위 문자열로 이어 붙여 한 번에 해시 (행 순회 없음, dtype 무관)
+        rows = _canonical(df[df.columns[0]])
+        for name in df.columns[1:]:
+            rows = rows + "\x1f" + _canonical(df[name])
+        row_hashes = pd.util.hash_pandas_object(rows, index=False).astype(str)
+
+        previous = ids.map(self.hashes)
+        mask = (previous != row_hashes).to_numpy()
+
+        self._seen.update(ids)
+        self._pending.update(zip(ids[mask], row_hashes[mask]))
+        self.unchanged += int((~mask).sum())
+        return df[mask]
+
+    def deleted_ids(self) -> List:
+        """매니페스트에는 있지만 이번 입력에 없는 id (전체 입력을 읽은 경우에만 의미 있음)"""
+        return [int(i) if i.isdigit() else i for i in self.hashes.keys() - self._seen]
+
+    def commit(self, deleted_ids: List = (), failed_ids: Iterable = ()):
+        """
+        양쪽 저장소 적재가 끝난 뒤 보류된 해시를 반영하고 원자적으로 저장.
+        failed_ids(색인에 실패한 문서)의 해시는 반영하지 않아 다음 실행에서 다시 적재합니다.
+        """
+        failed = {str(doc_id) for doc_id in failed_ids}
+        if failed:
+            logger.warning(f"⚠️ {len(failed)} failed rows left out of the manifest (retried next run)")
+        self.hashes.update((doc_id, row_hash) for doc_id, row_hash in self._pending.items() if doc_id not in failed)
+        for doc_id in deleted_ids:
+            self.hashes.pop(str(doc_id), None)
+        self._pending = {}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.hashes, f)
+        os.replace(tmp_path, self.path)
+        logger.info(f"📒 Ingest manifest updated: {len(self.hashes)} tracked rows")
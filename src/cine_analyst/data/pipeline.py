@@ -0,0 +1,134 @@
+import json
+import queue
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List
+
+from loguru import logger
+
+_SENTINEL = object()
+
+
+def fan_out(chunks: Iterable, consumers: int, maxsize: int = 2) -> List["FanOutConsumer"]:
+    """
+    하나의 청크 스트림을 여러 소비자(저장소)에게 동시에 나눠주는 제한 큐 기반 분배기.
+    가장 느린 소비자의 큐가 가득 차면 생산자(CSV 읽기)가 멈추므로 메모리가 제한됩니다.
+    소비자가 실패하면 해당 큐만 버리고 나머지 소비자는 계속 진행합니다.
+    """
+    queues = [queue.Queue(maxsize=maxsize) for _ in range(consumers)]
+    dead = set()
+
+    def _put(idx: int, item):
+        while idx not in dead:
+            try:
+                queues[idx].put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce():
+        try:
+            for chunk in chunks:
+                for idx in range(consumers):
+                    _put(idx, chunk)
+        except Exception as e:
+            logger.error(f"❌ Chunk reader failed: {e}")
+            for idx in range(consumers):
+                _put(idx, e)
+        finally:
+            for idx in range(consumers):
+                _put(idx, _SENTINEL)
+
+    threading.Thread(target=_produce, name="ingest-reader", daemon=True).start()
+    return [FanOutConsumer(queues[idx], lambda idx=idx: dead.add(idx)) for idx in range(consumers)]
+
+
+class FanOutConsumer:
+    """
+    fan_out 소비자 이터레이터.
+    제너레이터와 달리 첫 next() 전에 close()해도 생산자가 이 큐를 건너뛰므로,
+    소비자가 반복을 시작하기 전에 실패(예: 인덱스 생성 실패)해도 생산자가 막히지 않습니다.
+    """
+
+    def __init__(self, q: queue.Queue, on_close):
+        self._queue = q
+        self._on_close = on_close
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is _SENTINEL:
+            self._done = True
+            raise StopIteration
+        if isinstance(item, Exception):
+            self.close()
+            raise item
+        return item
+
+    def close(self):
+        # 조기 종료/예외 시 생산자가 이 큐에서 막히지 않도록 제외 (끝까지 받은 경우는 무시)
+        if not self._done:
+            self._done = True
+            self._on_close()
+
+
+@dataclass
+class IngestionReport:
+    """인제션 단계별 처리량/소요 시간 리포트"""
+    rows_read: int = 0
+    rows_skipped_vector: int = 0
+    rows_skipped_graph: int = 0
+    docs_indexed: int = 0
+    graph_rows_written: int = 0
+    embedding_time: float = 0.0
+    bulk_time: float = 0.0
+    graph_time: float = 0.0
+    wall_time: float = 0.0
+    rows_unchanged: int = 0
+    rows_deleted: int = 0
+
+    @classmethod
+    def collect(cls, vector_stats: Dict, graph_stats: Dict, wall_time: float) -> "IngestionReport":
+        return cls(
+            rows_read=max(int(vector_stats.get("rows", 0)), int(graph_stats.get("rows", 0))),
+            rows_skipped_vector=int(vector_stats.get("skipped", 0)),
+            rows_skipped_graph=int(graph_stats.get("skipped", 0)),
+            docs_indexed=int(vector_stats.get("indexed", 0)),
+            graph_rows_written=int(graph_stats.get("written", 0)),
+            embedding_time=float(vector_stats.get("embed_time", 0.0)),
+            bulk_time=float(vector_stats.get("bulk_time", 0.0)),
+            graph_time=float(graph_stats.get("graph_time", 0.0)),
+            wall_time=wall_time,
+        )
+
+    @property
+    def throughput(self) -> float:
+        return self.rows_read / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "throughput_rows_per_sec": round(self.throughput, 2)}
+
+    def log(self):
+        logger.success(
+            "📊 Ingestion report\n"
+            f"  rows read      : {self.rows_read}\n"
+            f"  rows skipped   : {self.rows_skipped_vector} (vector) / {self.rows_skipped_graph} (graph)\n"
+            f"  rows unchanged : {self.rows_unchanged}\n"
+            f"  rows deleted   : {self.rows_deleted}\n"
+            f"  docs indexed   : {self.docs_indexed}\n"
+            f"  graph rows     : {self.graph_rows_written}\n"
+            f"  embedding time : {self.embedding_time:.2f}s\n"
+            f"  bulk time      : {self.bulk_time:.2f}s\n"
+            f"  graph time     : {self.graph_time:.2f}s\n"
+            f"  wall time      : {self.wall_time:.2f}s\n"
+            f"  throughput     : {self.throughput:.1f} rows/sec"
+        )
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
@@ -1,69 +1,112 @@
 import os
 import json
 import pandas as pd
-from typing import List
+from typing import Iterator, List
 from loguru import logger
 from cine_analyst.common.config import settings
-from cine_analyst.common.schemas import TrainingExample
 import click
 
 SYSTEM_PROMPT = """You are an expert movie analyst. Analyze the movie details and output a JSON response."""
+ANALYSIS_TEXT = "This movie features strong narrative elements."
+
+# TrainingExample(messages=[system, user, assistant]).model_dump()를 json.dumps 한 것과 같은 포맷을
+# 행마다 pydantic 객체를 만들지 않고 문자열 템플릿으로 조립
+_LINE_PREFIX = '{"messages": [' + json.dumps({"role": "system", "content": SYSTEM_PROMPT}, ensure_ascii=False)
+_USER_PREFIX = ', {"role": "user", "content": '
+_ASSISTANT_PREFIX = '}, {"role": "assistant", "content": '
+_LINE_SUFFIX = '}]}\n'
+
+def _to_json_str(series: pd.Series) -> pd.Series:
+    return series.map(lambda text: json.dumps(text, ensure_ascii=False))
+
+def _column(df: pd.DataFrame, name: str, default: str) -> pd.Series:
+    if name not in df:
+        return pd.Series(default, index=df.index)
+    return df[name].astype(str)
+
+def build_jsonl_lines(df: pd.DataFrame) -> pd.Series:
+    """
+    컬럼 단위 연산으로 학습용 JSONL 라인을 생성합니다.
+    overview가 NaN이거나 10자 미만인 행은 제외합니다.
+    """
+    overview = df['overview']
+    df = df[overview.notna() & (overview.astype(str).str.len() >= 10)]
+    overview = df['overview'].astype(str)
+
+    # User Input Construction
+    user_content = (
+        "Title: " + _column(df, 'title', '')
+        + "\nGenres: " + _column(df, 'genres', '[]')
+        + "\nOverview: " + overview
+    )
+
+    # AI Output Construction (Pseudo-Labeling for PoC)
+    assistant_content = (
+        '{"summary": ' + _to_json_str(overview.str[:50] + "...")
+        + ', "analysis": ' + json.dumps(ANALYSIS_TEXT) + '}'
+    )
+
+    return (
+        _LINE_PREFIX
+        + _USER_PREFIX + _to_json_str(user_content)
+        + _ASSISTANT_PREFIX + _to_json_str(assistant_content)
+        + _LINE_SUFFIX
+    )
+
+def shard_paths(output_path: str, num_shards: int) -> List[str]:
+    """train.jsonl → train-00000-of-00004.jsonl ... (num_shards가 1이면 원래 경로)"""
+    if num_shards <= 1:
+        return [output_path]
+    stem, ext = os.path.splitext(output_path)
+    return [f"{stem}-{i:05d}-of-{num_shards:05d}{ext}" for i in range(num_shards)]
+
+def _iter_frames(input_path: str, sample_size: int, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if sample_size:
+        # 무작위 샘플링은 전체 분포가 필요하므로 한 번에 로드
+        df = pd.read_csv(input_path)
+        yield df.sample(n=min(len(df), sample_size), random_state=42)
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
 
 def preprocess_for_training(
     input_path: str = settings.RAW_DATA_PATH,
     output_path: str = settings.PROCESSED_DATA_PATH,
-    sample_size: int = None
+    sample_size: int = None,
+    num_shards: int = 1,
+    chunk_size: int = settings.INGEST_CHUNK_SIZE
 ):
     """
     CSV 데이터를 읽어 LLM 학습용 JSONL 포맷(Chat Template)으로 변환합니다.
+    청크 단위로 변환 즉시 파일에 기록하며, num_shards > 1이면 행을 라운드로빈으로 여러 파일에 나눕니다.
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
     logger.info(f"⚙️ Preprocessing data: {input_path}")
-    
-    df = pd.read_csv(input_path)
-    if sample_size:
-        df = df.sample(n=min(len(df), sample_size), random_state=42)
-    
-    formatted_data = []
-    
-    for _, row in df.iterrows():
-        title = row.get('title', '')
-        overview = row.get('overview', '')
-        genres = row.get('genres', '[]')
-        
-        if pd.isna(overview) or len(str(overview)) < 10:
-            continue
-
-        # User Input Construction
-        user_content = f"Title: {title}\nGenres: {genres}\nOverview: {overview}"
-        
-        # AI Output Construction (Pseudo-Labeling for PoC)
-        assistant_content = json.dumps({
-            "summary": str(overview)[:50] + "...",
-            "analysis": "This movie features strong narrative elements."
-        }, ensure_ascii=False)
-        
-        # Construct Chat Message
-        example = TrainingExample(messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_content},
-            {"role": "assistant", "content": assistant_content}
-        ])
-        formatted_data.append(example.model_dump())
-
-    # Save to JSONL
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for item in formatted_data:
-            f.write(json.dumps(item, ensure_ascii=False) + '\n')
-            
-    logger.success(f"✅ Preprocessing complete: {output_path} ({len(formatted_data)} items)")
+
+    paths = shard_paths(output_path, num_shards)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    files = [open(path, 'w', encoding='utf-8') for path in paths]
+
+    written = 0
+    try:
+        for frame in _iter_frames(input_path, sample_size, chunk_size):
+            lines = build_jsonl_lines(frame).tolist()
+            for shard, f in enumerate(files):
+                # 전역 행 번호 기준 라운드로빈 분배
+                f.writelines(lines[(shard - written) % len(files)::len(files)])
+            written += len(lines)
+    finally:
+        for f in files:
+            f.close()
+
+    logger.success(f"✅ Preprocessing complete: {output_path} ({written} items, {len(paths)} shards)")
+    return written
 
 @click.command()
 @click.option('--input', default=settings.RAW_DATA_PATH)
 @click.option('--output', default=settings.PROCESSED_DATA_PATH)
 @click.option('--sample', type=int, help='샘플링 수')
-def run_cli(input, output, sample):
-    preprocess_for_training(input_path=input, output_path=output, sample_size=sample)
\ No newline at end of file
+@click.option('--shards', default=1, type=int, help='출력 JSONL 샤드 수 (멀티 프로세스 소비용)')
+def run_cli(input, output, sample, shards):
+    preprocess_for_training(input_path=input, output_path=output, sample_size=sample, num_shards=shards)
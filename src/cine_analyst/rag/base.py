@@ -1,13 +1,40 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import List
 import pandas as pd
 
 class VectorStoreBase(ABC):
     @abstractmethod
     def ingest(self, df: pd.DataFrame): pass
-    
+
     @abstractmethod
     def search(self, query: str, k: int = 5): pass
 
+    async def asearch(self, query: str, k: int = 5):
+        """비동기 검색 (기본 구현: 동기 search를 워커 스레드에서 실행)"""
+        return await asyncio.to_thread(self.search, query, k)
+
+    async def asearch_batch(self, queries: List[str], k: int = 5) -> List[list]:
+        """여러 질의 검색 (기본 구현: 질의별 asearch를 동시에 실행). 저장소별로 한 번의 왕복으로 재정의"""
+        return list(await asyncio.gather(*(self.asearch(query, k) for query in queries)))
+
+    async def awarm_up(self):
+        """서버 시작 시 연결/인덱스를 미리 준비 (기본: 아무것도 하지 않음)"""
+
 class GraphStoreBase(ABC):
     @abstractmethod
-    def ingest(self, df: pd.DataFrame): pass
\ No newline at end of file
+    def ingest(self, df: pd.DataFrame): pass
+
+    @abstractmethod
+    def search(self, query: str, k: int = 5): pass
+
+    async def asearch(self, query: str, k: int = 5):
+        """비동기 검색 (기본 구현: 동기 search를 워커 스레드에서 실행)"""
+        return await asyncio.to_thread(self.search, query, k)
+
+    async def asearch_batch(self, queries: List[str], k: int = 5) -> List[list]:
+        """여러 질의 검색 (기본 구현: 질의별 asearch를 동시에 실행)"""
+        return list(await asyncio.gather(*(self.asearch(query, k) for query in queries)))
+
+    async def awarm_up(self):
+        """서버 시작 시 연결을 미리 준비 (기본: 아무것도 하지 않음)"""
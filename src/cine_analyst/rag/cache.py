@@ -0,0 +1,167 @@
+import os
+import time
+import weakref
+
+import pandas as pd
+from loguru import logger
+
+from cine_analyst.common.cache import TTLCache
+from cine_analyst.common.config import settings
+from cine_analyst.rag.base import GraphStoreBase, VectorStoreBase
+
+# 프로세스 안의 모든 검색/응답 캐시 (인제션 후 일괄 무효화용, invalidate() 메서드 필요)
+_caches: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def register_cache(cache):
+    """인제션 훅(notify_ingested)에서 함께 비울 캐시 등록"""
+    _caches.add(cache)
+
+
+def invalidate_retrieval_caches():
+    """같은 프로세스의 모든 검색/응답 캐시를 비움"""
+    for cache in list(_caches):
+        cache.invalidate()
+
+
+def notify_ingested(stamp_path: str = settings.INGEST_STAMP_PATH):
+    """
+    인제션 파이프라인이 쓰기를 마친 뒤 호출하는 무효화 훅.
+    같은 프로세스의 캐시는 즉시 비우고, 별도 프로세스(API 서버)는 스탬프 파일 mtime 변경으로 감지합니다.
+    """
+    invalidate_retrieval_caches()
+    os.makedirs(os.path.dirname(stamp_path) or ".", exist_ok=True)
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        f.write(str(time.time()))
+    logger.info("🧹 Retrieval/response caches invalidated after ingestion")
+
+
+class IngestStamp:
+    """인제션 스탬프 파일 감시. 다른 프로세스의 인제션 여부는 최대 1초에 한 번만 확인"""
+
+    def __init__(self, path: str = settings.INGEST_STAMP_PATH):
+        self.path = path
+        self.value = self._read()
+        self.checked_at = time.monotonic()
+
+    def _read(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        now = time.monotonic()
+        if now - self.checked_at < 1.0:
+            return False
+        self.checked_at = now
+        value = self._read()
+        if value == self.value:
+            return False
+        self.value = value
+        return True
+
+
+class _RetrievalCacheMixin:
+    """(메서드, 질의, k) 단위 검색 결과 메모이제이션"""
+
+    def _init_cache(self, inner, ttl: float, maxsize: int, stamp_path: str):
+        self.inner = inner
+        self.results = TTLCache(maxsize, ttl)
+        self.stamp = IngestStamp(stamp_path)
+        register_cache(self)
+
+    def _check_stamp(self):
+        if self.stamp.changed():
+            self.invalidate()
+
+    def invalidate(self):
+        self.results.clear()
+
+    def cached(self, query: str, k: int = 5):
+        """저장소를 호출하지 않고 캐시된 검색 결과만 조회 (없으면 None)"""
+        self._check_stamp()
+        return self.results.get(("search", query, k))
+
+    def search(self, query: str, k: int = 5):
+        self._check_stamp()
+        key = ("search", query, k)
+        results = self.results.get(key)
+        if results is None:
+            results = self.inner.search(query, k=k)
+            self.results.set(key, results)
+        return results
+
+    async def asearch(self, query: str, k: int = 5):
+        self._check_stamp()
+        key = ("search", query, k)
+        results = self.results.get(key)
+        if results is None:
+            results = await self.inner.asearch(query, k=k)
+            self.results.set(key, results)
+        return results
+
+    async def asearch_batch(self, queries, k: int = 5):
+        """캐시에 없는 질의만 모아 내부 저장소의 배치 검색 한 번으로 조회"""
+        self._check_stamp()
+        results = [self.results.get(("search", query, k)) for query in queries]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            fetched = await self.inner.asearch_batch([queries[i] for i in missing], k=k)
+            for i, found in zip(missing, fetched):
+                results[i] = found
+                self.results.set(("search", queries[i], k), found)
+        return results
+
+    def ingest(self, df: pd.DataFrame):
+        try:
+            return self.inner.ingest(df)
+        finally:
+            self.invalidate()
+
+    async def awarm_up(self):
+        await self.inner.awarm_up()
+
+    def close(self):
+        self.inner.close()
+
+    async def aclose(self):
+        if hasattr(self.inner, "aclose"):
+            await self.inner.aclose()
+        else:
+            self.inner.close()
+
+    def stats(self):
+        return self.results.stats()
+
+    def __getattr__(self, name):
+        # 캐시하지 않는 나머지 메서드는 원래 저장소로 위임
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+
+class CachedVectorStore(_RetrievalCacheMixin, VectorStoreBase):
+    """VectorStoreBase 구현체를 감싸는 TTL/LRU 검색 캐시"""
+
+    def __init__(
+        self,
+        inner: VectorStoreBase,
+        ttl: float = settings.VECTOR_CACHE_TTL,
+        maxsize: int = settings.RETRIEVAL_CACHE_SIZE,
+        stamp_path: str = settings.INGEST_STAMP_PATH,
+    ):
+        self._init_cache(inner, ttl, maxsize, stamp_path)
+
+
+class CachedGraphStore(_RetrievalCacheMixin, GraphStoreBase):
+    """GraphStoreBase 구현체를 감싸는 TTL/LRU 검색 캐시"""
+
+    def __init__(
+        self,
+        inner: GraphStoreBase,
+        ttl: float = settings.GRAPH_CACHE_TTL,
+        maxsize: int = settings.RETRIEVAL_CACHE_SIZE,
+        stamp_path: str = settings.INGEST_STAMP_PATH,
+    ):
+        self._init_cache(inner, ttl, maxsize, stamp_path)
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.config import settings
+
+
+def resolve_num_workers(num_workers: int) -> int:
+    """-1이면 CPU 코어 수, 그 외에는 입력값 그대로 사용"""
+    if num_workers < 0:
+        return os.cpu_count() or 1
+    return num_workers
+
+
+def encode_texts(
+    embedder,
+    texts: List[str],
+    batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    num_workers: int = settings.EMBEDDING_NUM_WORKERS,
+) -> np.ndarray:
+    """
+    SentenceTransformer 배치 인코딩.
+    num_workers > 1이면 멀티 프로세스 풀에 배치를 분산하고, 결과는 float32 행렬로 반환합니다.
+    """
+    if not texts:
+        dim = embedder.get_sentence_embedding_dimension()
+        return np.empty((0, dim), dtype=np.float32)
+
+    workers = resolve_num_workers(num_workers)
+    started = time.perf_counter()
+
+    if workers > 1:
+        pool = embedder.start_multi_process_pool(target_devices=["cpu"] * workers)
+        try:
+            vectors = embedder.encode(
+                texts,
+                pool=pool,
+                batch_size=batch_size,
+                chunk_size=max(batch_size, len(texts) // (workers * 4) or 1),
+            )
+        finally:
+            embedder.stop_multi_process_pool(pool)
+    else:
+        vectors = embedder.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"🧮 Embedded {len(texts)} docs in {elapsed:.2f}s "
+        f"({len(texts) / max(elapsed, 1e-9):.1f} docs/sec, batch={batch_size}, workers={max(workers, 1)})"
+    )
+    return vectors
+
+
+class EmbeddingCache:
+    """
+    모델명 + 텍스트 해시로 주소화되는 디스크 임베딩 캐시.
+    벡터는 float32 memmap 행렬(vectors.f32)에, 같은 행 순서의 SHA-1 다이제스트는 keys.sha1에 이어 붙입니다.
+    두 파일 모두 append-only라 청크마다 인덱스 전체를 다시 쓰지 않고,
+    메모리에는 정렬된 다이제스트 배열(행당 28바이트)만 둡니다.
+    """
+
+    KEY_BYTES = 20
+    # 청크마다 생기는 정렬 구간이 이 개수를 넘으면 하나로 합침
+    MAX_SEGMENTS = 16
+
+    def __init__(
+        self,
+        cache_dir: str = settings.EMBEDDING_CACHE_DIR,
+        model_name: str = settings.EMBEDDING_MODEL_NAME,
+    ):
+        self.model_name = model_name
+        self.root = os.path.join(cache_dir, model_name.replace("/", "__"))
+        self.vectors_path = os.path.join(self.root, "vectors.f32")
+        self.keys_path = os.path.join(self.root, "keys.sha1")
+        self.meta_path = os.path.join(self.root, "meta.json")
+        self.dim: Optional[int] = None
+        self.size = 0
+        # (정렬된 다이제스트, 해당 행 번호) 구간 목록
+        self._segments: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            logger.warning(f"⚠️ Embedding cache model mismatch, ignoring: {self.meta_path}")
+            return
+        self.dim = meta["dim"]
+        keys = np.empty(0, dtype=f"S{self.KEY_BYTES}")
+        if os.path.exists(self.keys_path):
+            keys = np.fromfile(self.keys_path, dtype=f"S{self.KEY_BYTES}")
+        n_vectors = os.path.getsize(self.vectors_path) // (self.dim * 4) if os.path.exists(self.vectors_path) else 0
+        # 두 파일 쓰기 사이에 중단된 경우 짝이 맞는 행까지만 유지
+        self.size = min(len(keys), n_vectors)
+        if self.size < max(len(keys), n_vectors):
+            logger.warning(f"⚠️ Embedding cache truncated to {self.size} consistent rows: {self.root}")
+            self._truncate()
+        self._add_segment(keys[:self.size], np.arange(self.size, dtype=np.int64))
+
+    def _truncate(self):
+        for path, row_bytes in ((self.vectors_path, self.dim * 4), (self.keys_path, self.KEY_BYTES)):
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(self.size * row_bytes)
+
+    def _add_segment(self, keys: np.ndarray, rows: np.ndarray):
+        if not len(keys):
+            return
+        order = np.argsort(keys, kind="stable")
+        self._segments.append((keys[order], rows[order]))
+        if len(self._segments) > self.MAX_SEGMENTS:
+            merged_keys = np.concatenate([seg_keys for seg_keys, _ in self._segments])
+            merged_rows = np.concatenate([seg_rows for _, seg_rows in self._segments])
+            self._segments = []
+            self._add_segment(merged_keys, merged_rows)
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """다이제스트별 행 번호 (없으면 -1)"""
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        for seg_keys, seg_rows in self._segments:
+            pos = np.minimum(np.searchsorted(seg_keys, keys), len(seg_keys) - 1)
+            hit = seg_keys[pos] == keys
+            rows[hit] = seg_rows[pos[hit]]
+        return rows
+
+    def _matrix(self) -> np.ndarray:
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.size, self.dim))
+
+    def _append(self, keys: np.ndarray, vectors: np.ndarray):
+        os.makedirs(self.root, exist_ok=True)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            # 이전 형식(index.json)이나 다른 모델의 파일이 남아 있으면 비우고 처음부터 채움
+            self._truncate()
+            tmp_path = f"{self.meta_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+            os.replace(tmp_path, self.meta_path)
+        # 벡터를 먼저 쓰고 다이제스트를 나중에 써서, 다이제스트가 있는 행은 항상 벡터도 있음
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.keys_path, "ab") as f:
+            f.write(keys.tobytes())
+        self._add_segment(keys, np.arange(self.size, self.size + len(keys), dtype=np.int64))
+        self.size += len(keys)
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """캐시에 없는(신규/변경) 텍스트만 encode_fn으로 계산하고 나머지는 캐시 벡터 재사용"""
+        keys = np.array([self.key(text) for text in texts], dtype=f"S{self.KEY_BYTES}")
+        rows = self._lookup(keys)
+        pending = {}
+        for key, text, row in zip(keys, texts, rows):
+            if row < 0 and key not in pending:
+                pending[key] = text
+
+        if pending:
+            self._append(np.array(list(pending), dtype=f"S{self.KEY_BYTES}"), encode_fn(list(pending.values())))
+            rows = self._lookup(keys)
+        logger.info(f"🗄️ Embedding cache: {len(texts) - len(pending)} hits, {len(pending)} computed")
+
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self._matrix()[rows], dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def load_embedder(model_name: str = settings.EMBEDDING_MODEL_NAME):
+    """서빙 경로에서 공유하는 SentenceTransformer (프로세스당 한 번만 로드)"""
+    from sentence_transformers import SentenceTransformer
+
+    logger.info(f"🧠 Loading embedding model: {model_name}")
+    return SentenceTransformer(model_name)
+
+
+def embed_query(query: str, model_name: str = settings.EMBEDDING_MODEL_NAME) -> np.ndarray:
+    """단일 질의를 L2 정규화된 float32 벡터로 임베딩 (코사인 유사도 = 내적)"""
+    vector = load_embedder(model_name).encode(query, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(vector, dtype=np.float32)
+
+
+def embed_queries(queries: List[str], model_name: str = settings.EMBEDDING_MODEL_NAME) -> np.ndarray:
+    """여러 질의를 한 번의 encode 호출로 임베딩 (배치 분석용, 행별 L2 정규화)"""
+    vectors = load_embedder(model_name).encode(
+        queries,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
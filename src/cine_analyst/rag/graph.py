@@ -1,28 +1,95 @@
+from typing import List
 from cine_analyst.rag.base import GraphStoreBase
 from cine_analyst.common.config import settings
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 import pandas as pd
 from loguru import logger
 
+RELATED_MOVIES_QUERY = """
+MATCH (m:Movie {title: $title})<-[:DIRECTED]-(d:Person)-[:DIRECTED]->(other:Movie)
+RETURN other.title AS title
+LIMIT $k
+"""
+
+# 여러 제목의 관련 영화를 한 번의 왕복으로 조회 (제목별 LIMIT은 서브쿼리에서 적용)
+RELATED_MOVIES_BATCH_QUERY = """
+UNWIND range(0, size($titles) - 1) AS i
+CALL {
+    WITH i
+    MATCH (m:Movie {title: $titles[i]})<-[:DIRECTED]-(d:Person)-[:DIRECTED]->(other:Movie)
+    RETURN other.title AS title
+    LIMIT $k
+}
+RETURN i, collect(title) AS titles
+"""
+
+DIRECTED_BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (m:Movie {id: row.id, title: row.title})
+MERGE (p:Person {name: row.director})
+MERGE (p)-[:DIRECTED]->(m)
+"""
+
+def _run_batch(tx, query: str, rows: List[dict]):
+    tx.run(query, rows=rows).consume()
+
+def write_in_batches(driver, query: str, rows: List[dict], batch_size: int = settings.NEO4J_BATCH_SIZE) -> int:
+    """
+    rows를 batch_size 단위로 나눠 `UNWIND $rows` 쿼리를 명시적 쓰기 트랜잭션으로 실행.
+    쿼리는 MERGE 기반이므로 일시 오류로 execute_write가 배치를 재시도해도 결과가 중복되지 않습니다.
+    """
+    written = 0
+    with driver.session() as session:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            session.execute_write(_run_batch, query, batch)
+            written += len(batch)
+    return written
+
 class GraphSearch(GraphStoreBase):
     def __init__(self):
         # 실제 Neo4j 드라이버 연결
         self.driver = GraphDatabase.driver(
-            settings.NEO4J_URI, 
-            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+            max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
         )
+        # 비동기 드라이버는 이벤트 루프 안에서 처음 사용할 때 생성
+        self._async_driver = None
 
-    def ingest(self, df: pd.DataFrame):
-        """영화를 노드로, 감독/배우를 관계로 적재 (Cypher 사용)"""
-        with self.driver.session() as session:
-            for _, row in df.iterrows():
-                query = """
-                MERGE (m:Movie {id: $id, title: $title})
-                MERGE (p:Person {name: $director})
-                MERGE (p)-[:DIRECTED]->(m)
-                """
-                session.run(query, id=row['id'], title=row['title'], director=row['director'])
-        logger.info("✅ Neo4j 그래프 데이터 적재 완료")
+    @property
+    def async_driver(self):
+        if self._async_driver is None:
+            self._async_driver = AsyncGraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+                connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+            )
+        return self._async_driver
+
+    async def awarm_up(self):
+        """첫 요청 전에 비동기 드라이버의 Bolt 연결을 미리 수립"""
+        await self.async_driver.verify_connectivity()
+
+    def close(self):
+        """Bolt 드라이버 및 커넥션 풀 종료"""
+        self.driver.close()
+
+    async def aclose(self):
+        """비동기 드라이버까지 포함해 종료"""
+        if self._async_driver is not None:
+            await self._async_driver.close()
+            self._async_driver = None
+        self.close()
+
+    def ingest(self, df: pd.DataFrame, batch_size: int = settings.NEO4J_BATCH_SIZE):
+        """영화를 노드로, 감독/배우를 관계로 적재 (UNWIND 배치 Cypher 사용)"""
+        rows = df[['id', 'title', 'director']].to_dict('records')
+        written = write_in_batches(self.driver, DIRECTED_BATCH_QUERY, rows, batch_size)
+        logger.info(f"✅ Neo4j 그래프 데이터 적재 완료: {written}건")
+        return written
 
     def search(self, query: str, k: int = 5, **kwargs):
         """
@@ -30,15 +97,30 @@ class GraphSearch(GraphStoreBase):
         에이전트 워크플로우에서 요구하는 인터페이스(search, k 인자)로 통합됨
         """
         logger.info(f"🔍 그래프 검색 실행 (상위 {k}개): {query}")
-        
+
         with self.driver.session() as session:
             # 기존 get_related_movies의 로직을 그대로 가져옴
-            cypher_query = """
-            MATCH (m:Movie {title: $title})<-[:DIRECTED]-(d:Person)-[:DIRECTED]->(other:Movie)
-            RETURN other.title AS title
-            """
-            result = session.run(cypher_query, title=query)
-            titles = [record["title"] for record in result]
-            
-            # 검색 결과 중 k개만 반환하여 에러 방지
-            return titles[:k]
\ No newline at end of file
+            # LIMIT을 쿼리에 넘겨 필요한 k개만 가져옴
+            result = session.run(RELATED_MOVIES_QUERY, title=query, k=k)
+            return [record["title"] for record in result]
+
+    async def asearch(self, query: str, k: int = 5, **kwargs):
+        """비동기 Neo4j 드라이버를 이용한 논블로킹 관계형 검색"""
+        logger.info(f"🔍 그래프 검색 실행 (상위 {k}개): {query}")
+
+        async with self.async_driver.session() as session:
+            result = await session.run(RELATED_MOVIES_QUERY, title=query, k=k)
+            return [record["title"] async for record in result]
+
+    async def asearch_batch(self, queries: List[str], k: int = 5):
+        """여러 질의를 UNWIND 파라미터 쿼리 한 번으로 검색 (관련 영화가 없는 질의는 빈 목록)"""
+        if not queries:
+            return []
+        logger.info(f"🔍 그래프 배치 검색 실행: {len(queries)}건 (질의당 상위 {k}개)")
+
+        results = [[] for _ in queries]
+        async with self.async_driver.session() as session:
+            result = await session.run(RELATED_MOVIES_BATCH_QUERY, titles=list(queries), k=k)
+            async for record in result:
+                results[record["i"]] = list(record["titles"])
+        return results
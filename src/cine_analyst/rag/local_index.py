@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+import click
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from cine_analyst.common.config import settings
+from cine_analyst.rag.base import VectorStoreBase
+
+VECTORS_FILE = "vectors.f32"
+DOCS_FILE = "docs.json"
+META_FILE = "meta.json"
+HNSW_FILE = "hnsw.bin"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """행별 상위 k개 인덱스 (argpartition 후 k개만 정렬)"""
+    k = min(k, scores.shape[-1])
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.take_along_axis(scores, part, axis=-1).argsort(axis=-1)[..., ::-1]
+    return np.take_along_axis(part, order, axis=-1)
+
+
+def write_local_index(index_dir: str, docs: List[Dict], vectors: np.ndarray, ann: bool = settings.LOCAL_INDEX_ANN):
+    """
+    정규화된 float32 행렬(vectors.f32) + 문서 메타데이터(docs.json)로 인덱스를 저장.
+    ann=True이고 문서 수가 LOCAL_INDEX_ANN_MIN_SIZE 이상이면 hnswlib HNSW 인덱스도 함께 생성합니다.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    matrix = _normalize(vectors)
+    matrix.tofile(os.path.join(index_dir, VECTORS_FILE))
+    with open(os.path.join(index_dir, DOCS_FILE), "w", encoding="utf-8") as f:
+        json.dump(docs, f, ensure_ascii=False)
+
+    has_ann = False
+    if ann and len(docs) >= settings.LOCAL_INDEX_ANN_MIN_SIZE:
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("⚠️ 'hnswlib' not installed, falling back to exact search")
+        else:
+            index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            index.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+            index.add_items(matrix, np.arange(len(matrix)))
+            index.save_index(os.path.join(index_dir, HNSW_FILE))
+            has_ann = True
+
+    with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"count": len(docs), "dim": int(matrix.shape[1]), "ann": has_ann}, f)
+    logger.success(f"✅ Local vector index written: {index_dir} ({len(docs)} docs, ann={has_ann})")
+
+
+class LocalVectorIndex(VectorStoreBase):
+    """
+    네트워크 왕복 없는 인프로세스 벡터 검색.
+    memmap으로 연 정규화 임베딩 행렬에 행렬곱 top-k(정확 검색)를 수행하고,
+    HNSW 인덱스가 있으면 근사 검색을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        index_dir: str = settings.LOCAL_INDEX_DIR,
+        embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        block_size: int = 65536,
+    ):
+        self.index_dir = index_dir
+        self.embed_fn = embed_fn
+        self.block_size = block_size
+        self.matrix: Optional[np.ndarray] = None
+        self.docs: List[Dict] = []
+        self.ann = None
+
+    def load(self):
+        """프로세스당 한 번 memmap으로 연결 (fork 이후에도 페이지 캐시를 공유)"""
+        if self.matrix is not None:
+            return self
+        with open(os.path.join(self.index_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(self.index_dir, DOCS_FILE), "r", encoding="utf-8") as f:
+            self.docs = json.load(f)
+        self.matrix = np.memmap(
+            os.path.join(self.index_dir, VECTORS_FILE), dtype=np.float32, mode="r",
+            shape=(meta["count"], meta["dim"])
+        )
+        if meta.get("ann"):
+            try:
+                import hnswlib
+            except ImportError:
+                logger.warning("⚠️ 'hnswlib' not installed, using exact search")
+            else:
+                self.ann = hnswlib.Index(space="ip", dim=meta["dim"])
+                self.ann.load_index(os.path.join(self.index_dir, HNSW_FILE), max_elements=meta["count"])
+                self.ann.set_ef(max(64, settings.LOCAL_INDEX_ANN_EF))
+        logger.info(f"📦 Local vector index loaded: {meta['count']} docs (ann={self.ann is not None})")
+        return self
+
+    def _embed(self, queries: List[str]) -> np.ndarray:
+        if self.embed_fn is not None:
+            return _normalize(self.embed_fn(queries))
+        from cine_analyst.rag.embedding import load_embedder
+        vectors = load_embedder().encode(queries, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def search_vectors(self, query_vectors: np.ndarray, k: int = 5) -> List[List[int]]:
+        """정규화된 질의 벡터 배치에 대한 top-k 문서 인덱스"""
+        self.load()
+        query_vectors = np.atleast_2d(query_vectors).astype(np.float32, copy=False)
+        k = min(k, len(self.docs))
+        if k == 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        if self.ann is not None:
+            labels, _ = self.ann.knn_query(query_vectors, k=k)
+            return labels.tolist()
+
+        # 행렬을 블록 단위로 곱해 (질의 수 × 블록 크기) 점수 행렬만 메모리에 유지
+        best_scores = np.full((len(query_vectors), 0), -np.inf, dtype=np.float32)
+        best_ids = np.empty((len(query_vectors), 0), dtype=np.int64)
+        for start in range(0, len(self.matrix), self.block_size):
+            block = np.asarray(self.matrix[start:start + self.block_size])
+            scores = np.concatenate([best_scores, query_vectors @ block.T], axis=1)
+            ids = np.concatenate(
+                [best_ids, np.broadcast_to(np.arange(start, start + len(block)), (len(query_vectors), len(block)))],
+                axis=1,
+            )
+            top = _top_k(scores, k)
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_ids = np.take_along_axis(ids, top, axis=1)
+        return best_ids.tolist()
+
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """여러 질의를 한 번의 encode + 행렬곱으로 검색"""
+        hits = self.search_vectors(self._embed(queries), k)
+        return [[self.docs[i] for i in row] for row in hits]
+
+    def search(self, query: str, k: int = 5):
+        return self.search_batch([query], k)[0]
+
+    async def asearch_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        return await asyncio.to_thread(self.search_batch, queries, k)
+
+    async def awarm_up(self):
+        """memmap 페이지를 미리 읽어 첫 검색의 페이지 폴트를 제거"""
+        await asyncio.to_thread(lambda: float(np.asarray(self.load().matrix).sum()))
+
+    def ingest(self, df: pd.DataFrame):
+        """
+        DataFrame의 overview를 임베딩해 인덱스를 다시 쓰고 다시 로드 (기존 인덱스는 교체).
+        대규모 카탈로그는 OpenSearch에 적재한 뒤 'cine-build-index'로 임베딩을 재사용해 생성합니다.
+        """
+        rows = df[df['overview'].notna()]
+        doc_ids = rows['id'].astype(str) if 'id' in rows else [None] * len(rows)
+        docs = [
+            {"id": doc_id, "title": title, "overview": str(overview)}
+            for doc_id, title, overview in zip(doc_ids, rows['title'], rows['overview'])
+        ]
+        if not docs:
+            logger.warning("⚠️ No overviews to index, local vector index unchanged")
+            return 0
+        vectors = self._embed([doc["overview"] for doc in docs])
+        # 덮어쓰기 전에 기존 memmap/HNSW 참조를 놓고, 쓰기가 끝나면 새 파일로 다시 연결
+        self.matrix, self.ann, self.docs = None, None, []
+        write_local_index(self.index_dir, docs, vectors, ann=settings.LOCAL_INDEX_ANN)
+        self.load()
+        return len(docs)
+
+    def close(self):
+        pass
+
+
+# 프로세스 전역 로컬 인덱스 (prefork 시 마스터에서 로드해 워커들이 같은 docs/memmap을 공유)
+local_index = LocalVectorIndex()
+
+
+def build_from_opensearch(index_dir: str = settings.LOCAL_INDEX_DIR, ann: bool = settings.LOCAL_INDEX_ANN):
+    """OpenSearchStore.ingest가 색인한 overview_vector를 그대로 내려받아 로컬 인덱스 생성"""
+    from opensearchpy import OpenSearch, helpers
+
+    client = OpenSearch(hosts=[settings.OPENSEARCH_URL], http_compress=True, use_ssl=False, verify_certs=False)
+    docs, vectors = [], []
+    try:
+        for hit in helpers.scan(
+            client, index=settings.OPENSEARCH_INDEX,
+            query={"_source": ["title", "overview", "overview_vector"]}
+        ):
+            source = hit["_source"]
+            if "overview_vector" not in source:
+                continue
+            vectors.append(source.pop("overview_vector"))
+            docs.append({"id": hit["_id"], **source})
+    finally:
+        client.close()
+
+    if not docs:
+        logger.error("❌ No vectors found in OpenSearch. Run 'cine-ingest' first.")
+        return
+    write_local_index(index_dir, docs, np.asarray(vectors, dtype=np.float32), ann=ann)
+
+
+@click.command()
+@click.option('--output', default=settings.LOCAL_INDEX_DIR, help='로컬 인덱스 저장 경로')
+@click.option('--ann/--exact', default=settings.LOCAL_INDEX_ANN, help='대규모 카탈로그용 HNSW 인덱스 생성 여부 (hnswlib 필요)')
+def run_cli(output, ann):
+    """OpenSearch에 색인된 임베딩으로 인프로세스 벡터 인덱스 생성"""
+    build_from_opensearch(index_dir=output, ann=ann)
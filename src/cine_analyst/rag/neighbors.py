@@ -0,0 +1,198 @@
+import os
+from typing import Dict, List, Optional, Sequence
+
+import click
+import numpy as np
+from loguru import logger
+
+from cine_analyst.common.config import settings
+from cine_analyst.rag.cache import IngestStamp, register_cache
+
+# 영화별 감독/장르 목록 (Neo4jStore가 적재한 HAS_GENRE, GraphSearch가 적재한 DIRECTED 관계)
+EXPORT_QUERY = """
+MATCH (m:Movie)
+OPTIONAL MATCH (m)-[:HAS_GENRE]->(g:Genre)
+OPTIONAL MATCH (d:Person)-[:DIRECTED]->(m)
+RETURN m.title AS title, collect(DISTINCT g.name) AS genres, collect(DISTINCT d.name) AS directors
+"""
+
+
+def compute_neighbors(
+    titles: Sequence[str],
+    genres: Sequence[Sequence[str]],
+    directors: Sequence[Sequence[str]],
+    top_n: int = settings.NEIGHBOR_TOP_N,
+    director_weight: float = settings.NEIGHBOR_DIRECTOR_WEIGHT,
+    genre_weight: float = settings.NEIGHBOR_GENRE_WEIGHT,
+    block_size: int = 1024,
+):
+    """
+    영화 쌍의 관련도 = director_weight × 공유 감독 수 + genre_weight × 장르 코사인 겹침.
+    행 블록 단위로 점수를 계산해 영화별 상위 top_n 이웃(행 번호, 점수)을 반환합니다 (없으면 -1).
+    """
+    n = len(titles)
+    vocab = {name: i for i, name in enumerate(sorted({g for gs in genres for g in gs}))}
+    genre_matrix = np.zeros((n, max(len(vocab), 1)), dtype=np.float32)
+    for row, gs in enumerate(genres):
+        for g in gs:
+            genre_matrix[row, vocab[g]] = 1.0
+    genre_matrix /= np.maximum(np.linalg.norm(genre_matrix, axis=1, keepdims=True), 1e-12)
+
+    # 감독 → 영화 목록 (감독 차원은 희소하므로 행렬 대신 그룹으로 처리)
+    by_director: Dict[str, List[int]] = {}
+    for row, ds in enumerate(directors):
+        for d in ds:
+            by_director.setdefault(d, []).append(row)
+
+    top_n = min(top_n, max(n - 1, 0))
+    neighbors = np.full((n, top_n), -1, dtype=np.int32)
+    scores = np.zeros((n, top_n), dtype=np.float32)
+    if top_n == 0:
+        return neighbors, scores
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = genre_weight * (genre_matrix[start:stop] @ genre_matrix.T)
+        for row in range(start, stop):
+            for d in directors[row]:
+                block[row - start, by_director[d]] += director_weight
+            block[row - start, row] = -np.inf  # 자기 자신 제외
+
+        part = np.argpartition(-block, top_n - 1, axis=1)[:, :top_n]
+        part_scores = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        part = np.take_along_axis(part, order, axis=1)
+        part_scores = np.take_along_axis(part_scores, order, axis=1)
+        # 겹치는 것이 전혀 없는 쌍은 이웃으로 두지 않음
+        valid = part_scores > 0
+        neighbors[start:stop] = np.where(valid, part, -1)
+        scores[start:stop] = np.where(valid, part_scores, 0.0)
+    return neighbors, scores
+
+
+class NeighborIndex:
+    """
+    사전 계산된 영화별 상위 N개 이웃 테이블 (npz: titles, neighbors[int32], scores[float32]).
+    서빙 경로에서는 Neo4j 왕복 없이 제목 → 행 번호 → 이웃 행 조회만 수행하고,
+    검색 캐시와 같은 방식으로 npz 파일 mtime / 인제션 스탬프가 바뀌면 다시 읽습니다.
+    """
+
+    def __init__(self, path: str = settings.NEIGHBOR_INDEX_PATH, stamp_path: str = settings.INGEST_STAMP_PATH):
+        self.path = path
+        self.titles: np.ndarray = np.empty(0, dtype=str)
+        self.neighbors: np.ndarray = np.empty((0, 0), dtype=np.int32)
+        self.scores: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.row_of: Dict[str, int] = {}
+        self.file_stamp = IngestStamp(path)
+        self.ingest_stamp = IngestStamp(stamp_path)
+        self._invalidated = False
+        register_cache(self)
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.row_of)
+
+    def save(self, titles: Sequence[str], neighbors: np.ndarray, scores: np.ndarray):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # 서빙 중인 프로세스가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, titles=np.asarray(titles, dtype=str), neighbors=neighbors, scores=scores)
+        os.replace(tmp_path, self.path)
+        logger.success(f"✅ Neighbor index saved: {self.path} ({len(titles)} movies, top {neighbors.shape[1]})")
+
+    def invalidate(self):
+        """같은 프로세스의 인제션 훅(notify_ingested): 다음 조회 때 다시 읽음"""
+        self._invalidated = True
+
+    def _stale(self) -> bool:
+        # 두 스탬프의 기준값이 모두 갱신되도록 단락 평가하지 않음
+        changed = [self.file_stamp.changed(), self.ingest_stamp.changed()]
+        return self._invalidated or any(changed)
+
+    def load(self) -> "NeighborIndex":
+        """
+        로드되어 있고 파일/인제션 스탬프가 그대로이면 그대로 반환
+        (prefork 마스터가 올린 배열을 워커가 다시 읽지 않도록, stat은 최대 1초에 한 번)
+        """
+        if self.loaded and not self._stale():
+            return self
+        return self._read()
+
+    def refresh(self) -> "NeighborIndex":
+        """서빙 경로용: 변경이 감지된 경우에만 다시 읽음 (파일이 없으면 경고 없이 그대로)"""
+        if self._stale() and os.path.exists(self.path):
+            self._read()
+        return self
+
+    def _read(self) -> "NeighborIndex":
+        self._invalidated = False
+        if not os.path.exists(self.path):
+            logger.warning(f"⚠️ Neighbor index not found: {self.path} (recommendations disabled)")
+            return self
+        try:
+            with np.load(self.path) as data:
+                titles, neighbors, scores = data["titles"], data["neighbors"], data["scores"]
+        except Exception as e:
+            logger.warning(f"⚠️ Neighbor index reload failed, keeping previous table: {e}")
+            return self
+        self.titles, self.neighbors, self.scores = titles, neighbors, scores
+        self.row_of = {title: row for row, title in enumerate(self.titles.tolist())}
+        logger.info(f"📦 Neighbor index loaded: {len(self.titles)} movies")
+        return self
+
+    def recommend(self, title: str, k: int = settings.RECOMMENDATION_K) -> List[str]:
+        """단일 영화의 상위 k개 관련 영화"""
+        row = self.row_of.get(title)
+        if row is None:
+            return []
+        return [str(self.titles[i]) for i in self.neighbors[row, :k] if i >= 0]
+
+    def recommend_many(self, seeds: Sequence[str], k: int = settings.RECOMMENDATION_K) -> List[str]:
+        """검색된 여러 영화의 이웃 점수를 합산해 상위 k개 추천 (검색된 영화 자체는 제외)"""
+        self.refresh()
+        rows = [self.row_of[s] for s in dict.fromkeys(seeds) if s in self.row_of]
+        totals: Dict[int, float] = {}
+        for row in rows:
+            for i, score in zip(self.neighbors[row], self.scores[row]):
+                if i >= 0:
+                    totals[i] = totals.get(i, 0.0) + float(score)
+        for row in rows:
+            totals.pop(row, None)
+        ranked = sorted(totals, key=totals.get, reverse=True)[:k]
+        return [str(self.titles[i]) for i in ranked]
+
+
+def build_neighbor_index(path: str = settings.NEIGHBOR_INDEX_PATH, top_n: int = settings.NEIGHBOR_TOP_N) -> Optional[NeighborIndex]:
+    """인제션 이후 Neo4j에서 감독/장르를 한 번에 내려받아 이웃 테이블 생성"""
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD))
+    try:
+        with driver.session() as session:
+            records = list(session.run(EXPORT_QUERY))
+    finally:
+        driver.close()
+
+    if not records:
+        logger.error("❌ No movies found in Neo4j. Run 'cine-ingest' first.")
+        return None
+    titles = [r["title"] for r in records]
+    neighbors, scores = compute_neighbors(
+        titles, [r["genres"] for r in records], [r["directors"] for r in records], top_n=top_n
+    )
+    index = NeighborIndex(path)
+    index.save(titles, neighbors, scores)
+    return index
+
+
+@click.command()
+@click.option('--output', default=settings.NEIGHBOR_INDEX_PATH, help='이웃 테이블(npz) 저장 경로')
+@click.option('--top-n', default=settings.NEIGHBOR_TOP_N, type=int, help='영화별 저장할 이웃 수')
+def run_cli(output, top_n):
+    """감독/장르 겹침 기반 추천 이웃 테이블 생성 (cine-ingest 이후 실행)"""
+    build_neighbor_index(path=output, top_n=top_n)
+
+
+# 프로세스 전역 이웃 테이블 (prefork 시 app/server.py preload, 아니면 app/main.py lifespan에서 로드)
+neighbor_index = NeighborIndex()
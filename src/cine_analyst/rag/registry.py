@@ -0,0 +1,353 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from loguru import logger
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError
+
+from cine_analyst.common.config import settings
+from cine_analyst.rag.cache import CachedGraphStore, CachedVectorStore
+from cine_analyst.rag.graph import GraphSearch
+from cine_analyst.rag.vector import VectorSearch
+
+# 연속으로 반복되면 클라이언트를 교체하는 연결 계열 오류 (한 번은 드라이버가 스스로 재연결)
+CONNECTION_ERRORS = (OpenSearchConnectionError, ServiceUnavailable, SessionExpired)
+
+
+def default_vector_factory():
+    if settings.VECTOR_BACKEND == "local":
+        # 풀 슬롯마다 새로 읽지 않고 preload된 전역 인덱스를 공유 (검색은 읽기 전용)
+        from cine_analyst.rag.local_index import local_index
+        store = local_index.load()
+    else:
+        store = VectorSearch()
+    return CachedVectorStore(store) if settings.RETRIEVAL_CACHE_ENABLED else store
+
+
+def default_graph_factory():
+    store = GraphSearch()
+    return CachedGraphStore(store) if settings.RETRIEVAL_CACHE_ENABLED else store
+
+
+class PoolMetrics:
+    """커넥션 풀 사용 현황 (in-use, 대기 시간, 리셋 횟수)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.resets = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        avg_wait = self.total_wait / self.acquired if self.acquired else 0.0
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "acquired": self.acquired,
+            "avg_wait_ms": round(avg_wait * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "resets": self.resets,
+        }
+
+
+class SlotBudget:
+    """
+    동기 lease와 비동기 alease가 함께 쓰는 풀 슬롯 예산 (두 경로를 합쳐 size개까지만 동시 임대).
+    대기자는 도착 순서대로 슬롯을 넘겨받으며, 비동기 대기자는 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._free = size
+        self._lock = threading.Lock()
+        # ("sync", threading.Event) 또는 ("async", loop, future)
+        self._waiters: deque = deque()
+
+    def acquire(self):
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(("sync", event))
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            future = loop.create_future()
+            waiter = ("async", loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # 슬롯을 넘겨받은 직후 취소된 경우 (아직 넘겨받는 중이면 _hand_over가 반환)
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+        if waiter[0] == "sync":
+            waiter[1].set()
+        else:
+            _, loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _hand_over(self, future: asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class StoreRegistry:
+    """
+    앱 수명 동안 유지되는 검색 저장소 레지스트리.
+    요청마다 VectorSearch/GraphSearch를 새로 만들지 않고 풀링된 클라이언트를 임대(lease)합니다.
+    클라이언트는 모든 임대가 공유하므로 일시적인 연결 오류로는 닫지 않고(드라이버가 재연결),
+    연결 오류가 reset_after_failures번 연속되면 새 클라이언트로 교체한 뒤
+    이전 클라이언트는 마지막 임대가 반납될 때 닫습니다.
+    """
+
+    def __init__(
+        self,
+        vector_factory: Callable[[], object] = default_vector_factory,
+        graph_factory: Callable[[], object] = default_graph_factory,
+        reset_after_failures: int = settings.STORE_RESET_AFTER_FAILURES,
+    ):
+        self._factories = {"vector": vector_factory, "graph": graph_factory}
+        self._stores: Dict[str, object] = {}
+        self._lock = threading.RLock()
+        self.reset_after_failures = reset_after_failures
+        self._slots = {
+            "vector": SlotBudget(settings.OPENSEARCH_POOL_MAXSIZE),
+            "graph": SlotBudget(settings.NEO4J_MAX_POOL_SIZE),
+        }
+        # 클라이언트별 진행 중인 임대 수와, 교체되었지만 아직 임대 중인 이전 클라이언트
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, Tuple[str, object]] = {}
+        self._connection_failures = {"vector": 0, "graph": 0}
+        self.metrics = {
+            "vector": PoolMetrics(settings.OPENSEARCH_POOL_MAXSIZE),
+            "graph": PoolMetrics(settings.NEO4J_MAX_POOL_SIZE),
+        }
+
+    def startup(self):
+        """FastAPI lifespan 시작 시 클라이언트를 미리 생성"""
+        for kind in self._factories:
+            self._get(kind)
+        logger.info("🔌 Store registry started (OpenSearch / Neo4j pools ready)")
+
+    async def _awarm_up(self, kind: str):
+        await self._get(kind).awarm_up()
+
+    async def awarm_up(self):
+        """
+        각 저장소의 연결을 동시에 미리 열어 첫 요청이 연결 수립 비용을 치르지 않도록 함.
+        한 저장소가 실패해도 나머지는 계속 준비하고, 실패한 저장소는 첫 요청에서 다시 연결합니다.
+        """
+        kinds = list(self._factories)
+        results = await asyncio.gather(*(self._awarm_up(kind) for kind in kinds), return_exceptions=True)
+        for kind, result in zip(kinds, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Warm-up failed for {kind} store: {result}")
+
+    def shutdown(self):
+        """FastAPI lifespan 종료 시 모든 풀을 닫음"""
+        for kind, store in self._drain():
+            self._close(kind, store)
+        logger.info("🔌 Store registry shut down")
+
+    async def ashutdown(self):
+        """비동기 클라이언트(AsyncOpenSearch / AsyncDriver)까지 포함해 모든 풀을 닫음"""
+        for kind, store in self._drain():
+            await self._aclose(kind, store)
+        logger.info("🔌 Store registry shut down")
+
+    def _drain(self):
+        with self._lock:
+            stores = list(self._stores.items()) + list(self._retired.values())
+            self._stores, self._retired = {}, {}
+        return stores
+
+    def cached(self, kind: str, query: str, k: int):
+        """검색 캐시에 있는 결과 (캐시가 없거나 miss이면 None). 풀 슬롯을 쓰지 않음"""
+        lookup = getattr(self._get(kind), "cached", None)
+        return lookup(query, k) if lookup is not None else None
+
+    def _get(self, kind: str):
+        store = self._stores.get(kind)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(kind)
+                if store is None:
+                    store = self._factories[kind]()
+                    self._stores[kind] = store
+        return store
+
+    def _close(self, kind: str, store):
+        try:
+            store.close()
+        except Exception as e:
+            logger.warning(f"⚠️ {kind} store close failed: {e}")
+
+    async def _aclose(self, kind: str, store):
+        try:
+            if hasattr(store, "aclose"):
+                await store.aclose()
+            else:
+                store.close()
+        except Exception as e:
+            logger.warning(f"⚠️ {kind} store close failed: {e}")
+
+    def _retire(self, kind: str, store=None) -> Optional[object]:
+        """
+        현재 클라이언트를 교체 대상으로 분리 (store를 주면 그것이 아직 현재 클라이언트일 때만).
+        진행 중인 임대가 없으면 바로 닫을 클라이언트를 반환하고, 있으면 마지막 반납 때 닫습니다.
+        """
+        with self._lock:
+            current = self._stores.get(kind)
+            if current is None or (store is not None and current is not store):
+                return None
+            del self._stores[kind]
+            self._connection_failures[kind] = 0
+            self.metrics[kind].resets += 1
+            logger.warning(f"♻️ {kind} store replaced")
+            if self._leases.get(id(current)):
+                self._retired[id(current)] = (kind, current)
+                return None
+            return current
+
+    def set_factory(self, kind: str, factory: Callable[[], object]) -> Callable[[], object]:
+        """저장소 생성 함수를 교체하고 기존 클라이언트를 폐기 (벤치마크/테스트 대역용). 이전 함수를 반환"""
+        previous = self._factories[kind]
+        self._factories[kind] = factory
+        self.reset(kind)
+        return previous
+
+    def reset(self, kind: str):
+        """클라이언트를 교체해 다음 임대부터 새로 생성 (이전 클라이언트는 임대가 모두 끝나면 닫음)"""
+        store = self._retire(kind)
+        if store is not None:
+            self._close(kind, store)
+
+    async def areset(self, kind: str):
+        store = self._retire(kind)
+        if store is not None:
+            await self._aclose(kind, store)
+
+    def _borrow(self, kind: str):
+        with self._lock:
+            store = self._get(kind)
+            self._leases[id(store)] = self._leases.get(id(store), 0) + 1
+        return store
+
+    def _give_back(self, store) -> Optional[Tuple[str, object]]:
+        """임대 반납. 교체된 클라이언트의 마지막 임대였으면 (kind, store)를 반환해 호출자가 닫음"""
+        with self._lock:
+            remaining = self._leases[id(store)] - 1
+            if remaining:
+                self._leases[id(store)] = remaining
+                return None
+            del self._leases[id(store)]
+            return self._retired.pop(id(store), None)
+
+    def _connection_failed(self, kind: str, store):
+        # 임대 중에 호출되므로 교체되더라도 이전 클라이언트는 반납 시점에 닫힘
+        with self._lock:
+            if self._stores.get(kind) is not store:
+                return
+            self._connection_failures[kind] += 1
+            if self._connection_failures[kind] >= self.reset_after_failures:
+                self._retire(kind, store)
+
+    def _connection_ok(self, kind: str):
+        self._connection_failures[kind] = 0
+
+    def _checkout(self, kind: str, waited: float):
+        metrics = self.metrics[kind]
+        with self._lock:
+            metrics.acquired += 1
+            metrics.total_wait += waited
+            metrics.max_wait = max(metrics.max_wait, waited)
+            metrics.in_use += 1
+            metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+
+    def _checkin(self, kind: str):
+        with self._lock:
+            self.metrics[kind].in_use -= 1
+
+    @contextmanager
+    def lease(self, kind: str):
+        """풀 슬롯을 점유한 상태로 저장소를 빌려줌 (대기 시간/사용 중 개수 집계)"""
+        slot = self._slots[kind]
+
+        started = time.perf_counter()
+        slot.acquire()
+        self._checkout(kind, time.perf_counter() - started)
+        store = None
+        try:
+            store = self._borrow(kind)
+            yield store
+        except CONNECTION_ERRORS:
+            self._connection_failed(kind, store)
+            raise
+        else:
+            self._connection_ok(kind)
+        finally:
+            retired = self._give_back(store) if store is not None else None
+            self._checkin(kind)
+            slot.release()
+            if retired is not None:
+                self._close(*retired)
+
+    @asynccontextmanager
+    async def alease(self, kind: str):
+        """lease의 비동기 버전 (슬롯 대기 중에도 이벤트 루프를 막지 않음, 슬롯 예산은 lease와 공유)"""
+        slot = self._slots[kind]
+
+        started = time.perf_counter()
+        await slot.aacquire()
+        self._checkout(kind, time.perf_counter() - started)
+        store = None
+        try:
+            store = self._borrow(kind)
+            yield store
+        except CONNECTION_ERRORS:
+            self._connection_failed(kind, store)
+            raise
+        else:
+            self._connection_ok(kind)
+        finally:
+            retired = self._give_back(store) if store is not None else None
+            self._checkin(kind)
+            slot.release()
+            if retired is not None:
+                await self._aclose(*retired)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {kind: m.snapshot() for kind, m in self.metrics.items()}
+
+
+# 프로세스 전역 레지스트리 (app/main.py lifespan에서 startup/shutdown)
+stores = StoreRegistry()
@@ -1,19 +1,93 @@
+import asyncio
+from typing import Dict, List, Sequence
+
 from cine_analyst.rag.base import VectorStoreBase
+from cine_analyst.rag.embedding import embed_queries, embed_query
 from cine_analyst.common.config import settings
-from opensearchpy import OpenSearch
+from opensearchpy import OpenSearch, AsyncOpenSearch
 import pandas as pd
 from loguru import logger
 
+# 검색 결과로 돌려줄 필드 (384차원 overview_vector는 응답에서 제외)
+SOURCE_FIELDS = ["title", "overview"]
+
+
+def rrf_fuse(ranked_lists: Sequence[List[Dict]], k: int, rrf_k: int = settings.RRF_K) -> List[Dict]:
+    """
+    Reciprocal Rank Fusion: 문서 점수 = Σ 1 / (rrf_k + rank).
+    점수 스케일이 다른 BM25와 kNN 결과를 순위만으로 합칩니다.
+    """
+    scores: Dict[str, float] = {}
+    sources: Dict[str, Dict] = {}
+    for hits in ranked_lists:
+        for rank, hit in enumerate(hits, start=1):
+            doc_id = hit["_id"]
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+            sources.setdefault(doc_id, hit["_source"])
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [sources[doc_id] for doc_id in ranked[:k]]
+
+
+class MSearchFailed(RuntimeError):
+    """_msearch의 모든 하위 질의가 실패 (차단기/상위 호출자가 장애로 집계하도록 예외로 전달)"""
+
+
+def _hits(response: Dict):
+    """하위 질의 응답의 hit 목록. 실패한 하위 질의는 로그를 남기고 None"""
+    if "error" in response:
+        logger.warning(f"⚠️ msearch sub-query failed: {response['error']}")
+        return None
+    return response.get("hits", {}).get("hits", [])
+
+
+def _check_any_succeeded(hits: List, responses: List[Dict]):
+    if responses and all(h is None for h in hits):
+        raise MSearchFailed(f"all {len(responses)} msearch sub-queries failed: {responses[0]['error']}")
+
+
 class VectorSearch(VectorStoreBase):
-    def __init__(self):
+    def __init__(self, hybrid: bool = settings.HYBRID_SEARCH_ENABLED):
         # 실제 OpenSearch 클라이언트 연결
         self.client = OpenSearch(
             hosts=[settings.OPENSEARCH_URL],
             http_compress=True,
             use_ssl=False,
             verify_certs=False,
+            pool_maxsize=settings.OPENSEARCH_POOL_MAXSIZE,
+            timeout=settings.OPENSEARCH_TIMEOUT,
         )
         self.index_name = "movies"
+        self.hybrid = hybrid
+        # 비동기 클라이언트는 이벤트 루프 안에서 처음 사용할 때 생성
+        self._async_client = None
+
+    @property
+    def async_client(self) -> AsyncOpenSearch:
+        if self._async_client is None:
+            self._async_client = AsyncOpenSearch(
+                hosts=[settings.OPENSEARCH_URL],
+                http_compress=True,
+                use_ssl=False,
+                verify_certs=False,
+                maxsize=settings.OPENSEARCH_POOL_MAXSIZE,
+                timeout=settings.OPENSEARCH_TIMEOUT,
+            )
+        return self._async_client
+
+    async def awarm_up(self):
+        """첫 요청 전에 비동기 클라이언트 세션과 커넥션을 미리 연결"""
+        await self.async_client.ping()
+
+    def close(self):
+        """커넥션 풀 반환 (앱 종료 시 레지스트리에서 호출)"""
+        self.client.close()
+
+    async def aclose(self):
+        """비동기 클라이언트 세션까지 포함해 종료"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+        self.close()
 
     def ingest(self, df: pd.DataFrame):
         """데이터프레임을 OpenSearch 인덱스에 벌크 적재"""
@@ -22,10 +96,30 @@ class VectorSearch(VectorStoreBase):
             self.client.index(index=self.index_name, body=doc)
         logger.info(f"✅ OpenSearch에 {len(df)}건 적재 완료")
 
-    def search(self, query: str, k: int = 5):
-        """실제 OpenSearch 쿼리 실행"""
-        body = {
+    def _embed(self, query: str):
+        """kNN용 질의 임베딩. 모델을 쓸 수 없으면 None (BM25 단독 검색으로 강등)"""
+        if not self.hybrid:
+            return None
+        try:
+            return embed_query(query)
+        except Exception as e:
+            logger.warning(f"⚠️ Query embedding failed, falling back to BM25 only: {e}")
+            return None
+
+    def _embed_many(self, queries: List[str]):
+        """배치 질의 임베딩 (encode 한 번). 실패 시 None으로 배치 전체를 BM25 단독 검색"""
+        if not self.hybrid:
+            return None
+        try:
+            return embed_queries(queries)
+        except Exception as e:
+            logger.warning(f"⚠️ Batch query embedding failed, falling back to BM25 only: {e}")
+            return None
+
+    def _build_query(self, query: str, k: int):
+        return {
             "size": k,
+            "_source": SOURCE_FIELDS,
             "query": {
                 "multi_match": {
                     "query": query,
@@ -33,6 +127,77 @@ class VectorSearch(VectorStoreBase):
                 }
             }
         }
-        response = self.client.search(index=self.index_name, body=body)
-        # 검색 결과 가공
-        return [hit["_source"] for hit in response["hits"]["hits"]]
\ No newline at end of file
+
+    def _build_msearch(self, query: str, query_vector, k: int):
+        """BM25 + kNN 두 질의를 한 번의 _msearch 왕복으로 묶음"""
+        size = max(k, settings.HYBRID_CANDIDATES)
+        knn = {
+            "size": size,
+            "_source": SOURCE_FIELDS,
+            "query": {"knn": {"overview_vector": {"vector": query_vector.tolist(), "k": size}}}
+        }
+        header = {"index": self.index_name}
+        return [header, self._build_query(query, size), header, knn]
+
+    @staticmethod
+    def _ranked(responses) -> List[List[Dict]]:
+        """실패한 하위 질의(BM25 또는 kNN)는 제외하고 남은 결과만 사용. 전부 실패하면 MSearchFailed"""
+        hits = [_hits(r) for r in responses]
+        _check_any_succeeded(hits, responses)
+        return [h for h in hits if h is not None]
+
+    def _fuse(self, response, k: int):
+        return rrf_fuse(self._ranked(response["responses"]), k)
+
+    def _build_batch_msearch(self, queries: List[str], query_vectors, k: int):
+        """질의마다 BM25(+kNN) 검색을 이어 붙인 하나의 _msearch 본문"""
+        if query_vectors is None:
+            header = {"index": self.index_name}
+            return [line for query in queries for line in (header, self._build_query(query, k))]
+        return [
+            line
+            for query, query_vector in zip(queries, query_vectors)
+            for line in self._build_msearch(query, query_vector, k)
+        ]
+
+    def _split_batch(self, response, n_queries: int, hybrid: bool, k: int) -> List[List[Dict]]:
+        """_msearch 응답을 질의별 결과로 분리 (하이브리드는 질의당 2개 응답을 RRF로 결합)"""
+        per_query = 2 if hybrid else 1
+        responses = response["responses"]
+        # 일부 질의만 실패하면 해당 질의만 빈 결과, 전부 실패하면 배치 전체를 실패로 처리
+        hits = [_hits(r) for r in responses]
+        _check_any_succeeded(hits, responses)
+        results = []
+        for i in range(n_queries):
+            ranked = [h for h in hits[i * per_query:(i + 1) * per_query] if h is not None]
+            if hybrid:
+                results.append(rrf_fuse(ranked, k))
+            else:
+                results.append([hit["_source"] for hits in ranked for hit in hits])
+        return results
+
+    def search(self, query: str, k: int = 5):
+        """BM25 + kNN 하이브리드 검색 (임베딩 불가 시 BM25 단독)"""
+        query_vector = self._embed(query)
+        if query_vector is None:
+            response = self.client.search(index=self.index_name, body=self._build_query(query, k))
+            return [hit["_source"] for hit in response["hits"]["hits"]]
+        return self._fuse(self.client.msearch(body=self._build_msearch(query, query_vector, k)), k)
+
+    async def asearch(self, query: str, k: int = 5):
+        """AsyncOpenSearch를 이용한 논블로킹 하이브리드 검색 (임베딩은 스레드에서 계산)"""
+        query_vector = await asyncio.to_thread(self._embed, query)
+        if query_vector is None:
+            response = await self.async_client.search(index=self.index_name, body=self._build_query(query, k))
+            return [hit["_source"] for hit in response["hits"]["hits"]]
+        response = await self.async_client.msearch(body=self._build_msearch(query, query_vector, k))
+        return self._fuse(response, k)
+
+    async def asearch_batch(self, queries: List[str], k: int = 5):
+        """배치 검색: 질의 임베딩은 encode 한 번, 검색은 _msearch 왕복 한 번"""
+        if not queries:
+            return []
+        query_vectors = await asyncio.to_thread(self._embed_many, queries)
+        body = self._build_batch_msearch(queries, query_vectors, k)
+        response = await self.async_client.msearch(body=body)
+        return self._split_batch(response, len(queries), query_vectors is not None, k)
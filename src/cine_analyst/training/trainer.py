@@ -1,20 +1,24 @@
 import os
 import sys
 import types
-import torch
 from loguru import logger
 from cine_analyst.common.config import settings
 
-# --- Unsloth/Torch 호환성 패치 ---
-if not hasattr(torch, "int1"):
-    torch.int1 = torch.bool 
+def _patch_torch():
+    """
+    Unsloth/Torch 호환성 패치.
+    torch import(수 초)는 모듈 로드 시점이 아니라 학습을 시작할 때 수행합니다.
+    """
+    import torch
 
-if not hasattr(torch, "_inductor"):
-    torch._inductor = types.ModuleType("_inductor")
-if not hasattr(torch._inductor, "config"):
-    torch._inductor.config = types.ModuleType("config")
-sys.modules["torch._inductor.config"] = torch._inductor.config
-# --- 패치 끝 ---
+    if not hasattr(torch, "int1"):
+        torch.int1 = torch.bool 
+
+    if not hasattr(torch, "_inductor"):
+        torch._inductor = types.ModuleType("_inductor")
+    if not hasattr(torch._inductor, "config"):
+        torch._inductor.config = types.ModuleType("config")
+    sys.modules["torch._inductor.config"] = torch._inductor.config
 
 def train_model(
     base_model: str = settings.BASE_MODEL_NAME,
@@ -23,6 +27,9 @@ def train_model(
     max_steps: int = 60
 ):
     try:
+        # unsloth보다 먼저 적용되어야 함
+        _patch_torch()
+        import torch
         from unsloth import FastLanguageModel
         from trl import SFTTrainer
         from transformers import TrainingArguments
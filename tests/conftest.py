@@ -1,7 +1,32 @@
+import os
 import pytest
 import pandas as pd
 import json
 
+# 테스트 중 임베딩 모델 다운로드를 막기 위해 semantic 캐시 단계는 끔 (exact 단계만 사용)
+os.environ.setdefault("RESPONSE_CACHE_SEMANTIC", "false")
+# 토크나이저 다운로드 대신 토큰 수 추정치 사용
+os.environ.setdefault("CONTEXT_TOKENIZER", "")
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """테스트 간 응답/검색 캐시가 공유되지 않도록 초기화"""
+    from cine_analyst.app.cache import response_cache
+    from cine_analyst.rag.cache import invalidate_retrieval_caches
+    response_cache.clear()
+    invalidate_retrieval_caches()
+    yield
+    response_cache.clear()
+    invalidate_retrieval_caches()
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    """한 테스트의 주입된 장애로 열린 회로 차단기가 다음 테스트에 영향을 주지 않도록 초기화"""
+    from cine_analyst.common.resilience import breakers
+    breakers.reset()
+    yield
+    breakers.reset()
+
 @pytest.fixture
 def mock_movie_df():
     """테스트용 임의의 영화 데이터 생성"""
@@ -5,6 +5,7 @@ import pytest
 
 client = TestClient(app)
 
+
 def test_analyze_api_with_mock_agent():
     # 에이전트의 실제 실행(ainvoke)을 가짜로 가로챔
     with patch("cine_analyst.app.api.agent_app.ainvoke") as mock_invoke:
@@ -19,4 +20,127 @@ def test_analyze_api_with_mock_agent():
         )
 
         assert response.status_code == 200
-        assert response.json()["answer"] == "Mocked Agent Answer"
\ No newline at end of file
+        assert response.json()["answer"] == "Mocked Agent Answer"
+
+
+def test_analyze_stream_api_emits_tokens_then_summary():
+    async def fake_stream(messages, **params):
+        for delta in ["기생충은 ", "추천작입니다."]:
+            yield delta
+
+    with patch("cine_analyst.app.api.retrieval_app.ainvoke") as mock_invoke, \
+         patch("cine_analyst.app.api.gateway.client.stream", side_effect=fake_stream):
+        mock_invoke.return_value = {
+            "messages": [MagicMock(content="테스트 질문")],
+            "retrieved_context": ["Mocked Context"]
+        }
+
+        response = client.post("/api/v1/analyze/stream", json={"query": "테스트 질문"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block.split("\n")[0] for block in response.text.strip().split("\n\n")]
+        assert events == ["event: token", "event: token", "event: context", "event: summary"]
+        assert '"answer": "기생충은 추천작입니다."' in response.text
+
+
+def test_analyze_api_serves_repeated_query_from_cache():
+    with patch("cine_analyst.app.api.agent_app.ainvoke") as mock_invoke:
+        mock_invoke.return_value = {
+            "messages": [MagicMock(content="Cached Answer")],
+            "retrieved_context": ["Mocked Context"]
+        }
+
+        first = client.post("/api/v1/analyze", json={"query": "기생충 비슷한 영화 추천해줘"})
+        second = client.post("/api/v1/analyze", json={"query": "기생충  비슷한 영화 추천해줘"})
+
+        # 요청 ID는 요청마다 다르고 나머지 본문은 캐시된 응답과 동일
+        first_body, second_body = first.json(), second.json()
+        assert first_body.pop("request_id") != second_body.pop("request_id")
+        assert first_body == second_body
+        mock_invoke.assert_called_once()
+
+
+def test_analyze_api_propagates_request_id_and_timings():
+    """X-Request-ID 헤더 전파, 요청별 타이밍, /metrics 히스토그램 노출 검증"""
+    with patch("cine_analyst.app.api.agent_app.ainvoke") as mock_invoke:
+        mock_invoke.return_value = {
+            "messages": [MagicMock(content="Timed Answer")],
+            "retrieved_context": ["Mocked Context"]
+        }
+        response = client.post(
+            "/api/v1/analyze",
+            json={"query": "타이밍 측정 질문", "include_timings": True},
+            headers={"X-Request-ID": "trace-123"},
+        )
+
+    body = response.json()
+    assert response.headers["X-Request-ID"] == body["request_id"] == "trace-123"
+    assert "cache.lookup" in body["timings"]
+
+    generated = client.post("/api/v1/analyze", json={"query": "타이밍 측정 질문", "user_id": "alice"})
+    assert generated.json()["request_id"].startswith("alice-")
+    assert generated.json()["timings"] is None
+
+    metrics = client.get("/metrics").text
+    assert 'cine_request_duration_seconds_count{endpoint="analyze",outcome="ok"}' in metrics
+    assert 'cine_span_duration_seconds_bucket{span="cache.lookup",outcome="ok",le="+Inf"}' in metrics
+
+
+def test_analyze_batch_api_streams_ndjson():
+    import json
+    from cine_analyst.common.schemas import BatchAnalysisItem
+
+    async def fake_batch(requests, admit=None):
+        for index in reversed(range(len(requests))):
+            yield BatchAnalysisItem(index=index, answer=f"답변 {index}")
+
+    with patch("cine_analyst.app.api.analyze_batch", side_effect=fake_batch):
+        response = client.post(
+            "/api/v1/analyze/batch",
+            json={"requests": [{"query": "기생충"}, {"query": "마더"}]},
+            headers={"X-Request-ID": "report-1"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [1, 0]
+    assert lines[0]["request_id"] == "report-1/1"
+
+
+def test_analyze_api_sheds_load_with_retry_after_and_degraded_answers():
+    """속도 제한 초과 시 429 + Retry-After, 과부하 시 vLLM 없이 검색 전용 응답"""
+    from cine_analyst.app.admission import AdmissionController, RateLimiter
+
+    controller = AdmissionController(rate_limiter=RateLimiter(rate=0.01, burst=1))
+    with patch("cine_analyst.app.api.admission", controller), \
+         patch("cine_analyst.app.api.agent_app.ainvoke") as mock_invoke:
+        mock_invoke.return_value = {"messages": [MagicMock(content="답변")], "retrieved_context": []}
+        assert client.post("/api/v1/analyze", json={"query": "속도 제한 1", "user_id": "carol"}).status_code == 200
+        limited = client.post("/api/v1/analyze", json={"query": "속도 제한 2", "user_id": "carol"})
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert 'cine_request_duration_seconds_count{endpoint="analyze",outcome="rejected"}' in client.get("/metrics").text
+
+    # 일괄 분석 호출도 같은 사용자 속도 제한을 받음
+    with patch("cine_analyst.app.api.admission", controller):
+        batch = client.post("/api/v1/analyze/batch", json={"requests": [{"query": "기생충", "user_id": "carol"}]})
+    assert batch.status_code == 429
+
+    with patch("cine_analyst.app.admission.settings.ADMISSION_FORCE_DEGRADED", True), \
+         patch("cine_analyst.app.api.retrieval_app.ainvoke") as mock_retrieve, \
+         patch("cine_analyst.app.api.agent_app.ainvoke") as mock_invoke:
+        mock_retrieve.return_value = {"retrieved_context": ["기생충: 반지하 가족"], "recommendations": ["마더"]}
+        response = client.post("/api/v1/analyze", json={"query": "과부하 질문", "user_id": "dave"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["degraded"] is True
+    assert "기생충: 반지하 가족" in body["answer"] and "마더" in body["answer"]
+    mock_invoke.assert_not_called()
+
+    health = client.get("/health").json()
+    assert health["admission"]["degraded"] >= 1
+    assert "breakers" in health
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from cine_analyst.app.admission import AdmissionController, RateLimiter, Rejected, TokenBucket
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, burst=2)
+    now = bucket.updated
+    assert bucket.take(now) == 0.0
+    assert bucket.take(now) == 0.0
+    # 토큰 소진 → 초당 2개 충전이므로 0.5초 뒤 재시도
+    assert bucket.take(now) == pytest.approx(0.5)
+    assert bucket.take(now + 0.5) == 0.0
+
+def test_rate_limit_is_per_user():
+    controller = AdmissionController(rate_limiter=RateLimiter(rate=1.0, burst=1))
+    controller.check_rate("alice")
+    controller.check_rate("bob")
+    with pytest.raises(Rejected) as e:
+        controller.check_rate("alice")
+    assert e.value.status_code == 429
+    assert e.value.headers["Retry-After"] == "1"
+
+async def test_overload_degrades_or_rejects_when_expected_wait_exceeds_deadline():
+    """슬롯이 모두 찼고 예상 대기 시간이 deadline을 넘으면 대기열에 넣지 않는지 검증"""
+    controller = AdmissionController(max_concurrency=1, max_queue=10, degraded_mode=True, initial_service_time=2.0)
+    first = await controller.acquire(deadline_s=5.0)
+    assert not first.degraded and controller.in_flight == 1
+
+    # 예상 대기 2초 > deadline 1초 → 검색 전용 응답
+    degraded = await controller.acquire(deadline_s=1.0)
+    assert degraded.degraded
+    degraded.release()
+    assert controller.in_flight == 1
+
+    controller.degraded_mode = False
+    with pytest.raises(Rejected) as e:
+        await controller.acquire(deadline_s=1.0)
+    assert e.value.status_code == 503 and int(e.value.headers["Retry-After"]) >= 2
+
+    # 예상 대기가 deadline 안이면 대기열에서 기다렸다가 슬롯 획득
+    waiter = asyncio.create_task(controller.acquire(deadline_s=5.0))
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+    first.release()
+    second = await waiter
+    assert not second.degraded and controller.stats()["admitted"] == 2
+    second.release()
+    assert controller.in_flight == 0
+
+async def test_batch_generation_shares_slots_and_yields_to_interactive_requests():
+    """배치 생성은 같은 슬롯을 쓰되, 대화형 요청이 대기 중이면 먼저 양보하는지 검증"""
+    controller = AdmissionController(max_concurrency=1, max_queue=10, initial_service_time=0.1)
+    batch_ticket = await controller.acquire_background()
+    assert controller.in_flight == 1 and controller.expected_wait() > 0
+
+    interactive = asyncio.create_task(controller.acquire(deadline_s=5.0))
+    next_batch = asyncio.create_task(controller.acquire_background())
+    await asyncio.sleep(0)
+    batch_ticket.release()
+
+    ticket = await asyncio.wait_for(interactive, timeout=1.0)
+    await asyncio.sleep(0.01)
+    assert not next_batch.done()
+    ticket.release()
+    (await asyncio.wait_for(next_batch, timeout=1.0)).release()
+    assert controller.in_flight == 0 and controller.stats()["background"] == 2
@@ -1,8 +1,8 @@
 import pytest
-from unittest.mock import patch, MagicMock # 1. MagicMock 임포트 확인
+from unittest.mock import patch, AsyncMock
 from langchain_core.messages import HumanMessage
 # workflow.py에서 정의한 정확한 노드 함수명을 가져옵니다.
-from cine_analyst.app.agents.workflow import plan_node, vector_retrieve_node, analyze_node
+from cine_analyst.app.agents.workflow import plan_node, parallel_retrieve_node
 
 def test_planner_routing_logic():
     """질문에 따른 분기 로직 검증 (Vector vs Graph)"""
@@ -14,38 +14,61 @@ def test_planner_routing_logic():
     state_g = {"messages": [HumanMessage(content="봉준호 감독 작품 알려줘")]}
     assert plan_node(state_g)["next_step"] == "graph"
 
-@patch('cine_analyst.app.agents.workflow.VectorSearch')
-def test_vector_retrieve_node_mock(mock_vector):
+@patch('cine_analyst.app.agents.workflow.stores')
+async def test_retrieve_node_mock(mock_stores):
     """DB 없이 Mock으로 검색 노드 로직 검증"""
-    mock_inst = mock_vector.return_value
-    # base.py 인터페이스인 search 메서드를 mock 처리
-    mock_inst.search.return_value = [{"title": "기생충", "overview": "테스트 데이터"}]
+    mock_stores.cached.return_value = None
+    mock_inst = mock_stores.alease.return_value.__aenter__.return_value
+    # base.py 인터페이스인 asearch 메서드를 mock 처리
+    mock_inst.asearch = AsyncMock(return_value=[{"title": "기생충", "overview": "테스트 데이터"}])
 
-    state = {"messages": [HumanMessage(content="쿼리")]}
-    result = vector_retrieve_node(state)
+    state = {"messages": [HumanMessage(content="쿼리")], "next_step": "vector"}
+    result = await parallel_retrieve_node(state)
 
     assert "기생충" in str(result["retrieved_context"])
-    mock_inst.search.assert_called_once()
+    assert mock_inst.asearch.await_count == 2
+    assert [c.args[0] for c in mock_stores.alease.call_args_list] == ["vector", "graph"]
+
+@patch('cine_analyst.app.agents.workflow.settings')
+@patch('cine_analyst.app.agents.workflow._retrieve')
+async def test_parallel_retrieve_merges_partial_results(mock_retrieve, mock_settings):
+    """느린 저장소는 예산 초과 시 버리고, 도착한 결과를 Planner 우선순위대로 병합하는지 검증"""
+    import asyncio
+    mock_settings.VECTOR_RETRIEVE_TIMEOUT = mock_settings.GRAPH_RETRIEVE_TIMEOUT = 1.0
+    mock_settings.RETRIEVAL_BUDGET = 0.1
+
+    async def fake_retrieve(kind, query, timeout=None):
+        if kind == "graph":
+            await asyncio.sleep(1.0)
+        return [f"{kind}-result"]
+    mock_retrieve.side_effect = fake_retrieve
+
+    state = {"messages": [HumanMessage(content="봉준호 감독 작품")], "next_step": "graph"}
+    result = await parallel_retrieve_node(state)
+    assert result["retrieved_context"] == ["vector-result"]
+
+    mock_settings.RETRIEVAL_BUDGET = 2.0
+    async def both_retrieve(kind, query, timeout=None):
+        return [f"{kind}-result", "shared"]
+    mock_retrieve.side_effect = both_retrieve
+    result = await parallel_retrieve_node(state)
+    assert result["retrieved_context"] == ["graph-result", "shared", "vector-result"]
 
 @pytest.mark.asyncio
 async def test_full_workflow_mock():
     """에이전트 전체 실행 흐름 통합 테스트 (vLLM 제외)"""
     from cine_analyst.app.agents.workflow import app as agent_app
     
-    # VectorSearch와 requests.post(vLLM 호출)를 모두 Mock 처리하여 환경변수/네트워크 에러 방지
-    with patch("cine_analyst.rag.vector.VectorSearch.search") as mock_s, \
-         patch("cine_analyst.app.agents.workflow.requests.post") as mock_post:
+    # VectorSearch와 vLLM 호출을 모두 Mock 처리하여 환경변수/네트워크 에러 방지
+    with patch("cine_analyst.rag.vector.VectorSearch.asearch") as mock_s, \
+         patch("cine_analyst.rag.graph.GraphSearch.asearch", AsyncMock(return_value=["마더"])), \
+         patch("cine_analyst.app.agents.workflow.gateway.client.chat") as mock_chat:
         
         # 검색 결과 Mock
         mock_s.return_value = [{"title": "기생충"}]
         
         # vLLM 응답 Mock
-        mock_res = MagicMock()
-        mock_res.status_code = 200
-        mock_res.json.return_value = {
-            "choices": [{"message": {"content": "분석 완료되었습니다."}}]
-        }
-        mock_post.return_value = mock_res
+        mock_chat.return_value = "분석 완료되었습니다."
         
         input_data = {
             "messages": [HumanMessage(content="영화 분석해줘")],
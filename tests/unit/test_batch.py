@@ -0,0 +1,33 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from cine_analyst.app.agents.batch import analyze_batch
+from cine_analyst.common.schemas import AnalysisRequest
+
+async def test_analyze_batch_retrieves_once_per_chunk_and_returns_every_request():
+    """청크마다 저장소별 배치 검색 1회, 결과는 index로 원래 요청과 대응되는지 검증"""
+    vector_store, graph_store = MagicMock(), MagicMock()
+    vector_store.asearch_batch = AsyncMock(side_effect=lambda queries, k: [[{"title": f"v-{q}"}] for q in queries])
+    graph_store.asearch_batch = AsyncMock(side_effect=lambda queries, k: [[f"g-{q}"] for q in queries])
+
+    def lease(kind):
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=vector_store if kind == "vector" else graph_store)
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    async def fake_chat(messages, **params):
+        return "답변: " + messages[-1]["content"][-10:]
+
+    requests = [AnalysisRequest(query=q) for q in ["액션 영화", "봉준호 감독 작품", "로맨스", "가족 영화", "SF"]]
+    with patch("cine_analyst.app.agents.batch.stores") as mock_stores, \
+         patch("cine_analyst.app.agents.workflow.gateway.client.chat", side_effect=fake_chat), \
+         patch("cine_analyst.app.agents.batch.settings.RESPONSE_CACHE_ENABLED", False):
+        mock_stores.alease.side_effect = lease
+        items = [item async for item in analyze_batch(requests, chunk_size=2, concurrency=2)]
+
+    assert sorted(item.index for item in items) == [0, 1, 2, 3, 4]
+    # 5건 / 청크 2 → 저장소별 배치 검색 3회
+    assert vector_store.asearch_batch.await_count == graph_store.asearch_batch.await_count == 3
+    by_index = {item.index: item for item in items}
+    # Planner 규칙: 감독 질문은 그래프 결과를 앞에 둠
+    assert by_index[1].context.splitlines()[0] == "g-봉준호 감독 작품"
+    assert by_index[0].context.splitlines() == ["v-액션 영화", "g-액션 영화"]
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+from unittest.mock import patch
+from cine_analyst.common.cache import TTLCache
+from cine_analyst.common.schemas import AnalysisResponse
+from cine_analyst.app.cache import ResponseCache
+
+def test_ttl_cache_lru_and_expiry():
+    """크기 초과 시 LRU 제거, TTL 만료 시 miss 처리 검증"""
+    evicted = []
+    cache = TTLCache(maxsize=2, ttl=10, on_evict=evicted.append)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a를 최근 사용으로 갱신
+    cache.set("c", 3)
+    assert evicted == ["b"]
+
+    with patch("cine_analyst.common.cache.time.monotonic", return_value=1e12):
+        assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+def test_response_cache_exact_and_semantic_tiers():
+    """정규화 exact 적중과 코사인 임계값 기반 semantic 적중 검증"""
+    vectors = {
+        "기생충 비슷한 영화 추천해줘": np.array([1.0, 0.0], dtype=np.float32),
+        "기생충이랑 비슷한 영화 추천": np.array([0.99, 0.141], dtype=np.float32),
+        "로맨스 영화 추천": np.array([0.0, 1.0], dtype=np.float32),
+    }
+    cache = ResponseCache(maxsize=4, ttl=60, threshold=0.9, embed_fn=vectors.__getitem__)
+    response = AnalysisResponse(answer="캐시된 답변")
+
+    miss, vector = cache.lookup("기생충 비슷한 영화 추천해줘")
+    assert miss is None
+    cache.store("기생충 비슷한 영화 추천해줘", response, vector)
+
+    assert cache.lookup("  기생충   비슷한 영화 추천해줘 ")[0] is response
+    assert cache.lookup("기생충이랑 비슷한 영화 추천")[0] is response
+    assert cache.lookup("로맨스 영화 추천")[0] is None
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["lookups"]) == (1, 1, 4)
+
+def test_response_cache_invalidated_by_ingestion(tmp_path):
+    """재적재 이후에는 같은 질의라도 캐시된 답변을 내보내지 않는지 검증 (같은 프로세스/다른 프로세스)"""
+    from cine_analyst.rag.cache import notify_ingested
+
+    stamp = tmp_path / "ingest.stamp"
+    cache = ResponseCache(maxsize=4, ttl=60, stamp_path=str(stamp))
+    cache.store("기생충 비슷한 영화", AnalysisResponse(answer="이전 답변"))
+    assert cache.lookup_exact("기생충 비슷한 영화") is not None
+
+    notify_ingested(stamp_path=str(stamp))
+    assert cache.lookup_exact("기생충 비슷한 영화") is None
+
+    # 다른 프로세스의 인제션은 스탬프 파일 mtime 변경으로 감지
+    cache.store("기생충 비슷한 영화", AnalysisResponse(answer="이전 답변"))
+    stamp.write_text("2")
+    os.utime(stamp, (stamp.stat().st_atime, stamp.stat().st_mtime + 5))
+    cache.stamp.checked_at = 0  # 확인 주기 경과로 간주
+    assert cache.lookup("기생충 비슷한 영화")[0] is None
+
+def test_semantic_lookup_skips_expired_entries():
+    """만료된 더 유사한 항목이 살아 있는 유사 항목을 가리지 않는지 검증"""
+    vectors = {
+        "기생충 비슷한 영화": np.array([1.0, 0.0], dtype=np.float32),
+        "기생충이랑 비슷한 영화": np.array([0.96, 0.28], dtype=np.float32),
+        "기생충 같은 영화": np.array([1.0, 0.0], dtype=np.float32),
+    }
+    cache = ResponseCache(maxsize=4, ttl=60, threshold=0.9, embed_fn=vectors.__getitem__)
+    fresh = AnalysisResponse(answer="유효한 답변")
+    cache.store("기생충 비슷한 영화", AnalysisResponse(answer="만료될 답변"), vectors["기생충 비슷한 영화"])
+    cache.entries.set("기생충 비슷한 영화", AnalysisResponse(answer="만료될 답변"), ttl=-1)
+    cache.store("기생충이랑 비슷한 영화", fresh, vectors["기생충이랑 비슷한 영화"])
+
+    assert cache.lookup("기생충 같은 영화")[0] is fresh
@@ -0,0 +1,22 @@
+from cine_analyst.app.agents.context import SYSTEM_PROMPT, TokenCounter, build_prompt, pack_context, project
+
+def test_project_keeps_only_title_and_overview():
+    item = {"title": "기생충", "overview": "반지하  가족의\n이야기", "overview_vector": [0.1] * 384, "id": "1"}
+    assert project(item) == "기생충: 반지하 가족의 이야기"
+    assert project("마더") == "마더"
+
+def test_pack_context_dedupes_and_respects_budget():
+    """중복 제거 후 예산을 넘는 항목은 잘라 넣고 나머지는 버리는지 검증"""
+    counter = TokenCounter()
+    items = ["기생충: 가족 이야기", "기생충: 가족 이야기", "마더: " + "아들을 지키는 어머니 " * 20, "살인의 추억"]
+    packed, used, dropped = pack_context(items, budget=40, counter=counter)
+
+    assert packed[0] == "기생충: 가족 이야기"
+    assert len(packed) == 2 and packed[1].startswith("마더")
+    assert used <= 40 and dropped == 1
+
+def test_build_prompt_puts_static_system_prompt_first():
+    prompt = build_prompt(["기생충: 가족 이야기"], "비슷한 영화 추천해줘", budget=100)
+    assert prompt.messages[0]["content"].startswith(SYSTEM_PROMPT)
+    assert prompt.messages[1] == {"role": "user", "content": "비슷한 영화 추천해줘"}
+    assert prompt.prompt_tokens > prompt.context_tokens > 0
@@ -0,0 +1,76 @@
+import os
+import numpy as np
+from unittest.mock import MagicMock
+from cine_analyst.rag.embedding import encode_texts
+
+def test_encode_texts_single_batched_call_returns_float32():
+    """행 단위가 아닌 한 번의 배치 encode 호출과 float32 결과 검증"""
+    embedder = MagicMock()
+    embedder.encode.return_value = np.ones((3, 4), dtype=np.float64)
+
+    vectors = encode_texts(embedder, ["a", "b", "c"], batch_size=2, num_workers=0)
+
+    embedder.encode.assert_called_once()
+    assert embedder.encode.call_args.kwargs["batch_size"] == 2
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (3, 4)
+
+def test_encode_texts_multi_process_pool():
+    """num_workers > 1이면 멀티 프로세스 풀을 열고 반드시 닫는지 검증"""
+    embedder = MagicMock()
+    embedder.encode.return_value = np.zeros((2, 4), dtype=np.float32)
+
+    encode_texts(embedder, ["a", "b"], batch_size=8, num_workers=2)
+
+    embedder.start_multi_process_pool.assert_called_once_with(target_devices=["cpu", "cpu"])
+    assert embedder.encode.call_args.kwargs["pool"] is embedder.start_multi_process_pool.return_value
+    embedder.stop_multi_process_pool.assert_called_once()
+
+def test_embedding_cache_reuses_vectors_across_runs(tmp_path):
+    """동일 텍스트는 재계산하지 않고 새 텍스트만 임베딩하는지 검증"""
+    from cine_analyst.rag.embedding import EmbeddingCache
+
+    calls = []
+    def fake_encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    first = EmbeddingCache(cache_dir=str(tmp_path), model_name="test/model").encode(["aa", "bbb", "aa"], fake_encode)
+    assert calls == [["aa", "bbb"]]
+
+    # 새 인스턴스(다음 인제션 실행)에서는 디스크 캐시를 그대로 사용
+    cache = EmbeddingCache(cache_dir=str(tmp_path), model_name="test/model")
+    second = cache.encode(["bbb", "cccc", "aa"], fake_encode)
+
+    assert calls[1] == ["cccc"]
+    np.testing.assert_array_equal(first[0], second[2])
+    np.testing.assert_array_equal(second[1], [4.0, 1.0])
+
+def test_embedding_cache_appends_per_chunk_and_recovers_partial_write(tmp_path):
+    """청크마다 다이제스트/벡터 파일에 이어 붙이기만 하고, 중단으로 짝이 안 맞는 꼬리 행은 버리는지 검증"""
+    from cine_analyst.rag.embedding import EmbeddingCache
+
+    calls = []
+    def fake_encode(texts):
+        calls.append(list(texts))
+        return np.array([[float(t), 1.0] for t in texts], dtype=np.float32)
+
+    cache = EmbeddingCache(cache_dir=str(tmp_path), model_name="test/model")
+    # 이전 형식 캐시의 벡터 파일 (다이제스트 파일 없음)
+    os.makedirs(cache.root)
+    np.ones((4, 2), dtype=np.float32).tofile(cache.vectors_path)
+    for start in range(0, 60, 3):
+        cache.encode([str(i) for i in range(start, start + 3)], fake_encode)
+    assert len(cache._segments) <= EmbeddingCache.MAX_SEGMENTS
+    assert os.path.getsize(cache.keys_path) == 60 * EmbeddingCache.KEY_BYTES
+
+    # 다이제스트를 쓰기 전에 중단된 벡터 행
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.zeros(2, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingCache(cache_dir=str(tmp_path), model_name="test/model")
+    assert reopened.size == 60
+    vectors = reopened.encode(["59", "7", "60"], fake_encode)
+    assert calls[-1] == ["60"]
+    np.testing.assert_array_equal(vectors[:, 0], [59.0, 7.0, 60.0])
+    assert os.path.getsize(reopened.vectors_path) == 61 * 2 * 4
@@ -1,10 +1,12 @@
 from unittest.mock import patch, MagicMock
 from cine_analyst.data.ingestor import run_ingestion
 
+
+@patch('cine_analyst.data.ingestor.notify_ingested')
 @patch('cine_analyst.data.ingestor.OpenSearchStore')
 @patch('cine_analyst.data.ingestor.Neo4jStore')
 @patch('os.path.exists')
-def test_ingest_pipeline_calls(mock_exists, mock_neo, mock_os, mock_movie_df, tmp_path):
+def test_ingest_pipeline_calls(mock_exists, mock_neo, mock_os, mock_notify, mock_movie_df, tmp_path):
     """DB 연결 없이 인제션 파이프라인 흐름 검증"""
     mock_exists.return_value = True
     raw_path = tmp_path / "raw.csv"
@@ -14,4 +16,127 @@ def test_ingest_pipeline_calls(mock_exists, mock_neo, mock_os, mock_movie_df, tm
     
     # 각 저장소의 ingest 메서드 호출 여부 확인
     mock_os.return_value.ingest.assert_called_once()
-    mock_neo.return_value.ingest.assert_called_once()
\ No newline at end of file
+    mock_neo.return_value.ingest.assert_called_once()
+    # 적재 후 검색 캐시 무효화 훅 호출
+    mock_notify.assert_called_once()
+
+
+@patch('cine_analyst.data.ingestor.helpers.streaming_bulk', side_effect=lambda client, actions, **kw: ((True, a) for a in actions))
+@patch('sentence_transformers.SentenceTransformer')
+@patch('cine_analyst.data.ingestor.OpenSearch')
+def test_opensearch_ingest_batches_embeddings(mock_client, mock_st, mock_bulk, mock_movie_df):
+    """임베딩을 행마다 호출하지 않고 한 번에 배치 인코딩하는지 검증"""
+    import numpy as np
+    from cine_analyst.data.ingestor import OpenSearchStore
+
+    mock_st.return_value.encode.return_value = np.zeros((2, 384), dtype=np.float32)
+
+    store = OpenSearchStore(batch_size=16, num_workers=0, use_cache=False)
+    assert store.ingest(mock_movie_df) == 2
+
+    mock_st.return_value.encode.assert_called_once()
+    assert mock_bulk.call_args.kwargs["chunk_size"] == store.bulk_size
+
+
+@patch('cine_analyst.data.ingestor.helpers.streaming_bulk')
+@patch('cine_analyst.data.ingestor.OpenSearch')
+def test_opensearch_bulk_records_failed_ids(mock_client, mock_bulk):
+    """raise_on_error=False로 건너뛴 문서 _id를 모아 매니페스트에서 제외할 수 있는지 검증"""
+    from cine_analyst.data.ingestor import OpenSearchStore
+
+    mock_bulk.return_value = iter([
+        (True, {"index": {"_id": "1", "status": 201}}),
+        (False, {"index": {"_id": "2", "status": 429, "error": {"type": "es_rejected_execution_exception"}}}),
+    ])
+    store = OpenSearchStore(num_workers=0, use_cache=False)
+    store.bulk_threads = 1
+
+    assert store._consume_bulk(iter([])) == 1
+    assert store.failed_ids == {"2"}
+
+
+def test_streaming_chunks_respect_limit_and_fan_out(mock_movie_df, tmp_path):
+    """청크 단위 읽기, limit 적용, 두 저장소로의 동시 분배 검증"""
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    from cine_analyst.data.ingestor import iter_csv_chunks
+    from cine_analyst.data.pipeline import fan_out
+
+    raw_path = tmp_path / "raw.csv"
+    pd.concat([mock_movie_df] * 3).to_csv(raw_path, index=False)
+
+    chunks = iter_csv_chunks(str(raw_path), chunk_size=2, limit=5)
+    left, right = fan_out(chunks, consumers=2, maxsize=1)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sizes_left = executor.submit(lambda: [len(c) for c in left])
+        sizes_right = executor.submit(lambda: [len(c) for c in right])
+        assert sizes_left.result(timeout=5) == [2, 2, 1]
+        assert sizes_right.result(timeout=5) == [2, 2, 1]
+
+
+def test_fan_out_survives_failed_consumer():
+    """한 소비자가 실패해도 다른 소비자는 끝까지 받는지 검증 (교착 방지)"""
+    from cine_analyst.data.pipeline import fan_out
+
+    failing, healthy = fan_out(iter(range(10)), consumers=2, maxsize=1)
+    next(failing)
+    failing.close()
+
+    assert list(healthy) == list(range(10))
+
+
+def test_fan_out_survives_consumer_failing_before_first_chunk():
+    """소비자가 청크를 받기 전에 실패해도(예: 인덱스 생성 실패) 생산자가 막히지 않는지 검증"""
+    from concurrent.futures import ThreadPoolExecutor
+    from cine_analyst.data.ingestor import _run_stage
+    from cine_analyst.data.pipeline import fan_out
+
+    def fail_before_iterating(chunks):
+        raise ConnectionError("OpenSearch is down")
+
+    failing, healthy = fan_out(iter(range(10)), consumers=2, maxsize=1)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        failed = executor.submit(_run_stage, "opensearch", fail_before_iterating, failing)
+        consumed = executor.submit(_run_stage, "neo4j", list, healthy)
+        assert failed.result(timeout=5) is None
+        assert consumed.result(timeout=5) == list(range(10))
+
+
+def test_ingestion_report_collects_stage_stats():
+    from cine_analyst.data.pipeline import IngestionReport
+
+    report = IngestionReport.collect(
+        {"rows": 100, "skipped": 2, "indexed": 98, "embed_time": 1.5, "bulk_time": 0.5},
+        {"rows": 100, "skipped": 1, "written": 99, "graph_time": 0.8},
+        wall_time=2.0
+    )
+    assert report.as_dict()["throughput_rows_per_sec"] == 50.0
+    assert report.rows_skipped_vector == 2 and report.graph_rows_written == 99
+
+
+@patch('cine_analyst.data.ingestor.GraphDatabase')
+def test_neo4j_ingest_uses_unwind_batches(mock_gdb, mock_movie_df):
+    """행마다 session.run 하지 않고 batch_size 단위 쓰기 트랜잭션으로 적재하는지 검증"""
+    import pandas as pd
+    from cine_analyst.data.ingestor import Neo4jStore
+
+    df = pd.concat([mock_movie_df] * 3, ignore_index=True)
+    session = mock_gdb.driver.return_value.session.return_value.__enter__.return_value
+
+    count = Neo4jStore(batch_size=4).ingest(df)
+
+    assert count == 6
+    batches = [c.args[2] for c in session.execute_write.call_args_list]
+    assert [len(b) for b in batches] == [4, 2]
+    assert batches[0][0]["genres"] == [{"id": 28, "name": "Action"}]
+
+
+def test_ingestor_import_does_not_load_torch():
+    """cine-ingest 모듈 import만으로 sentence-transformers/torch를 로드하지 않는지 검증"""
+    import subprocess, sys
+    from pathlib import Path
+    probe = "import sys, cine_analyst.data.ingestor; print('sentence_transformers' in sys.modules)"
+    src = Path(__file__).resolve().parents[2] / "src"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, cwd=src)
+    assert result.stdout.strip() == "False"
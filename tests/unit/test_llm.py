@@ -0,0 +1,139 @@
+import httpx
+from cine_analyst.app.agents.llm import VLLMClient
+
+async def test_vllm_client_chat_with_mock_transport():
+    """vLLM 서버 없이 비동기 chat 호출 및 응답 파싱 검증"""
+    def handler(request: httpx.Request):
+        assert request.url.path == "/v1/chat/completions"
+        return httpx.Response(200, json={"choices": [{"message": {"content": "비동기 답변"}}]})
+
+    client = VLLMClient(base_url="http://vllm:8000/v1")
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+
+    answer = await client.chat([{"role": "user", "content": "질문"}])
+    assert answer == "비동기 답변"
+    await client.aclose()
+
+async def test_vllm_client_stream_parses_sse_deltas():
+    """stream=True 응답의 delta 파싱 및 [DONE] 종료 처리 검증"""
+    body = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "안녕"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "하세요"}}]}\n\n'
+        'data: [DONE]\n\n'
+    )
+    def handler(request: httpx.Request):
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    client = VLLMClient(base_url="http://vllm:8000/v1")
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+
+    deltas = [delta async for delta in client.stream([{"role": "user", "content": "질문"}])]
+    assert deltas == ["안녕", "하세요"]
+    await client.aclose()
+
+async def test_gateway_single_flight_and_batching():
+    """동일 프롬프트는 한 번만 호출하고, 동시성 여유가 없을 때 창 안의 요청을 한 배치로 묶는지 검증"""
+    import asyncio
+    from unittest.mock import MagicMock
+    from cine_analyst.app.agents.gateway import LLMGateway
+
+    calls = []
+    async def fake_chat(messages, **params):
+        calls.append(messages[-1]["content"])
+        await asyncio.sleep(0.01)
+        return f"답변:{messages[-1]['content']}"
+
+    client = MagicMock()
+    client.chat = fake_chat
+    gateway = LLMGateway(client, max_concurrency=1, window_ms=20, max_batch=8)
+
+    same = [{"role": "user", "content": "기생충"}]
+    other = [{"role": "user", "content": "마더"}]
+    third = [{"role": "user", "content": "괴물"}]
+    results = await asyncio.gather(gateway.chat(same), gateway.chat(same), gateway.chat(other), gateway.chat(third))
+
+    assert results == ["답변:기생충", "답변:기생충", "답변:마더", "답변:괴물"]
+    assert sorted(calls) == ["괴물", "기생충", "마더"]
+    stats = gateway.stats()
+    # 첫 요청은 바로 발송, 슬롯이 찬 동안 들어온 두 요청은 한 배치
+    assert stats["deduplicated"] == 1 and stats["immediate"] == 1
+    assert stats["batches"] == 1 and stats["max_batch_size"] == 2
+    assert stats["peak_in_flight"] == 1 and stats["max_queue_wait_ms"] > 0
+
+async def test_gateway_propagates_errors_to_all_waiters():
+    import asyncio
+    import pytest
+    from unittest.mock import AsyncMock, MagicMock
+    from cine_analyst.app.agents.gateway import LLMGateway
+
+    client = MagicMock()
+    client.chat = AsyncMock(side_effect=RuntimeError("vLLM down"))
+    gateway = LLMGateway(client, max_concurrency=4, window_ms=1, max_batch=8)
+
+    messages = [{"role": "user", "content": "질문"}]
+    results = await asyncio.gather(gateway.chat(messages), gateway.chat(messages), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    client.chat.assert_awaited_once()
+    # 실패 후에는 같은 프롬프트를 다시 호출할 수 있어야 함
+    with pytest.raises(RuntimeError):
+        await gateway.chat(messages)
+    assert client.chat.await_count == 2
+
+async def test_gateway_fails_fast_when_llm_circuit_is_open():
+    """연속 실패로 차단기가 열리면 vLLM을 호출하지 않고 즉시 CircuitOpen"""
+    import pytest
+    from unittest.mock import AsyncMock, MagicMock
+    from cine_analyst.app.agents.gateway import LLMGateway
+    from cine_analyst.common.resilience import CircuitBreaker, CircuitOpen
+
+    client = MagicMock()
+    client.chat = AsyncMock(side_effect=RuntimeError("vLLM down"))
+    gateway = LLMGateway(client, window_ms=1, breaker=CircuitBreaker("llm-test", failure_threshold=2))
+
+    for i in range(2):
+        with pytest.raises(RuntimeError):
+            await gateway.chat([{"role": "user", "content": f"질문 {i}"}])
+    with pytest.raises(CircuitOpen):
+        await gateway.chat([{"role": "user", "content": "질문 3"}])
+    assert client.chat.await_count == 2
+    assert gateway.breaker.snapshot()["state"] == "open"
+
+async def test_gateway_dispatches_immediately_when_idle():
+    """동시성 여유가 있으면 배치 창을 기다리지 않고 바로 발송"""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+    from cine_analyst.app.agents.gateway import LLMGateway
+
+    client = MagicMock()
+    client.chat = AsyncMock(return_value="답변")
+    gateway = LLMGateway(client, max_concurrency=4, window_ms=5000, max_batch=8)
+
+    assert await asyncio.wait_for(gateway.chat([{"role": "user", "content": "질문"}]), timeout=1.0) == "답변"
+    assert gateway.stats()["immediate"] == 1 and gateway.stats()["batches"] == 0
+
+async def test_gateway_stream_enforces_inter_token_deadline(monkeypatch):
+    """토큰 사이가 LLM_CALL_TIMEOUT을 넘으면 스트림을 끊고 차단기 실패로 집계"""
+    import asyncio
+    import pytest
+    from unittest.mock import MagicMock
+    from cine_analyst.app.agents.gateway import LLMGateway, settings
+    from cine_analyst.common.resilience import CircuitBreaker
+
+    async def stalled_stream(messages, **params):
+        yield "첫 토큰"
+        await asyncio.sleep(10.0)
+        yield "도착하지 않음"
+
+    monkeypatch.setattr(settings, "LLM_CALL_TIMEOUT", 0.05)
+    client = MagicMock()
+    client.stream = stalled_stream
+    gateway = LLMGateway(client, breaker=CircuitBreaker("llm-stream-test", failure_threshold=5))
+
+    deltas = []
+    with pytest.raises(asyncio.TimeoutError):
+        async for delta in gateway.stream([{"role": "user", "content": "질문"}]):
+            deltas.append(delta)
+    assert deltas == ["첫 토큰"]
+    assert gateway.breaker.snapshot()["failures"] == 1
+    assert gateway.stats()["in_flight"] == 0 and gateway._active == 0
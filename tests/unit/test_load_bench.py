@@ -0,0 +1,37 @@
+import json
+from cine_analyst.bench.load import LatencyModel, load_queries, run_load_test
+
+def test_load_queries_from_jsonl(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text(
+        json.dumps({"query": "기생충 같은 영화"}, ensure_ascii=False) + "\n\n"
+        + json.dumps({"request_id": "x", "title": "액션 영화"}, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    assert load_queries(str(path)) == ["기생충 같은 영화", "액션 영화"]
+
+async def test_closed_loop_load_test_reports_percentiles():
+    """대역 서비스로 앱을 실행해 요청 수, 오류율, 지연 백분위를 집계하는지 검증"""
+    report = await run_load_test(
+        ["기생충 같은 영화", "봉준호 감독 작품"],
+        requests=12,
+        concurrency=4,
+        vector=LatencyModel(1.0, 0.1),
+        graph=LatencyModel(1.0, 0.1),
+        llm=LatencyModel(2.0, 0.1),
+    )
+    assert report["requests"] == 12 and report["errors"] == 0
+    assert report["status_codes"] == {"200": 12}
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["mode"] == "closed" and report["rps"] > 0
+
+async def test_open_loop_load_test_counts_injected_errors():
+    report = await run_load_test(
+        ["액션 영화"],
+        requests=6,
+        rate=200.0,
+        llm=LatencyModel(1.0, 0.1, error_rate=1.0),
+    )
+    # vLLM 장애 시에도 대체 답변으로 200을 반환
+    assert report["mode"] == "open" and report["requests"] == 6
+    assert report["errors"] == 0
@@ -0,0 +1,69 @@
+import numpy as np
+from cine_analyst.bench.vector_index import benchmark, local_search_fn, recall_at_k
+from cine_analyst.rag.local_index import LocalVectorIndex, write_local_index
+
+def _build(tmp_path, n=50, dim=8):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    docs = [{"id": str(i), "title": f"movie-{i}", "overview": ""} for i in range(n)]
+    write_local_index(str(tmp_path), docs, vectors, ann=False)
+    return vectors
+
+def test_local_index_matches_brute_force_top_k(tmp_path):
+    """블록 단위 matmul top-k가 전체 정렬 결과와 같은지 검증"""
+    vectors = _build(tmp_path)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = LocalVectorIndex(str(tmp_path), block_size=7).load()
+
+    hits = index.search_vectors(normed[:3], k=5)
+    expected = np.argsort(-(normed[:3] @ normed.T), axis=1)[:, :5]
+    assert hits == expected.tolist()
+    assert [row[0] for row in hits] == [0, 1, 2]
+
+def test_local_index_search_uses_embed_fn(tmp_path):
+    """질의 임베딩 후 문서 메타데이터를 반환하는지 검증"""
+    vectors = _build(tmp_path)
+    index = LocalVectorIndex(str(tmp_path), embed_fn=lambda queries: vectors[[7] * len(queries)])
+
+    assert index.search("아무 질의", k=2)[0]["title"] == "movie-7"
+    assert [len(r) for r in index.search_batch(["a", "b"], k=3)] == [3, 3]
+
+def test_benchmark_reports_recall_and_latency(tmp_path):
+    _build(tmp_path)
+    index = LocalVectorIndex(str(tmp_path)).load()
+    queries = np.asarray(index.matrix[:4])
+    truth = [[index.docs[i]["id"] for i in row] for row in index.search_vectors(queries, 3)]
+
+    report = benchmark({"local_exact": local_search_fn(index)}, queries, truth, k=3)
+    assert report["backends"]["local_exact"]["recall@3"] == 1.0
+    assert recall_at_k([["1", "2"]], [["2", "9"]], k=2) == 0.5
+
+def test_vector_factory_shares_preloaded_index(tmp_path, monkeypatch):
+    """local 백엔드의 풀 슬롯들이 preload된 전역 인덱스 하나를 공유하는지 검증"""
+    from cine_analyst.rag import local_index as module
+    from cine_analyst.rag.registry import default_vector_factory, settings
+
+    _build(tmp_path)
+    monkeypatch.setattr(module, "local_index", LocalVectorIndex(str(tmp_path)).load())
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+
+    assert default_vector_factory() is default_vector_factory() is module.local_index
+
+def test_local_index_ingest_rebuilds_from_dataframe(tmp_path):
+    """DataFrame을 임베딩해 인덱스를 다시 쓰고, 줄거리가 없는 행은 건너뛰는지 검증"""
+    import pandas as pd
+
+    _build(tmp_path)
+    basis = {"가난한 가족 이야기": [1.0, 0.0], "우주 탐험": [0.0, 1.0]}
+    index = LocalVectorIndex(str(tmp_path), embed_fn=lambda texts: np.array([basis[t] for t in texts])).load()
+    df = pd.DataFrame({
+        "id": [1, 2, 3],
+        "title": ["기생충", "인터스텔라", "제목만"],
+        "overview": ["가난한 가족 이야기", "우주 탐험", None],
+    })
+
+    assert index.ingest(df) == 2
+    assert index.matrix.shape == (2, 2)
+    assert index.search("우주 탐험", k=1) == [{"id": "2", "title": "인터스텔라", "overview": "우주 탐험"}]
+    assert LocalVectorIndex(str(tmp_path)).load().docs == index.docs
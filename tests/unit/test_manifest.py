@@ -0,0 +1,60 @@
+import pandas as pd
+from cine_analyst.data.manifest import IngestManifest
+
+def test_manifest_detects_new_modified_and_deleted_rows(mock_movie_df, tmp_path):
+    """두 번째 실행에서 변경/신규/삭제분만 골라내는지 검증"""
+    path = str(tmp_path / "manifest.json")
+
+    first = IngestManifest(path=path)
+    assert len(first.changed(mock_movie_df)) == 2
+    first.commit()
+
+    # 1번 영화 수정, 2번 삭제, 3번 신규
+    updated = pd.DataFrame({
+        'id': [1, 3],
+        'title': ['Test Movie 1', 'Test Movie 3'],
+        'overview': ['Updated description 1.', 'Description 3 for testing.'],
+        'genres': mock_movie_df['genres'].tolist()
+    })
+    second = IngestManifest(path=path)
+    changed = second.changed(updated)
+
+    assert changed['id'].tolist() == [1, 3]
+    assert second.deleted_ids() == [2]
+
+    second.commit(second.deleted_ids())
+    third = IngestManifest(path=path)
+    assert third.changed(updated).empty
+    assert third.unchanged == 2
+
+def test_manifest_skips_failed_rows(mock_movie_df, tmp_path):
+    """색인에 실패한 행은 해시를 남기지 않아 다음 실행에서 다시 변경분으로 잡히는지 검증"""
+    path = str(tmp_path / "manifest.json")
+
+    first = IngestManifest(path=path)
+    first.changed(mock_movie_df)
+    first.commit(failed_ids=["2"])
+
+    second = IngestManifest(path=path)
+    assert second.changed(mock_movie_df)['id'].tolist() == [2]
+
+def test_manifest_hash_ignores_chunk_dtype_inference(tmp_path):
+    """결측치 때문에 청크마다 int/float 추론이 달라져도 변경 없는 행은 변경분으로 잡히지 않음"""
+    csv_path = tmp_path / "movies.csv"
+    pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'title': ['A', 'B', 'C', 'D'],
+        'runtime': [120, 95, None, 101],
+        'overview': ['a', None, 'c', 'd'],
+    }).to_csv(csv_path, index=False)
+    path = str(tmp_path / "manifest.json")
+
+    first = IngestManifest(path=path)
+    assert len(first.changed(pd.read_csv(csv_path))) == 4
+    first.commit()
+
+    second = IngestManifest(path=path)
+    for chunk in pd.read_csv(csv_path, chunksize=2):
+        assert second.changed(chunk).empty
+    assert second.unchanged == 4
+    assert second.deleted_ids() == []
@@ -0,0 +1,63 @@
+from cine_analyst.rag.neighbors import NeighborIndex, compute_neighbors
+
+TITLES = ["기생충", "마더", "살인의 추억", "어벤져스"]
+GENRES = [["드라마", "스릴러"], ["드라마", "스릴러"], ["범죄", "스릴러"], ["액션"]]
+DIRECTORS = [["봉준호"], ["봉준호"], ["봉준호"], ["루소 형제"]]
+
+def test_compute_neighbors_weights_director_and_genre_overlap():
+    """감독 공유 + 장르 겹침이 큰 순서로 정렬되고, 겹침이 없으면 이웃에서 빠지는지 검증"""
+    neighbors, scores = compute_neighbors(TITLES, GENRES, DIRECTORS, top_n=3, block_size=2)
+
+    assert neighbors[0].tolist() == [1, 2, -1]
+    assert scores[0, 0] > scores[0, 1] > 0
+    assert neighbors[3].tolist() == [-1, -1, -1]
+
+def test_neighbor_index_roundtrip_and_recommend_many(tmp_path):
+    neighbors, scores = compute_neighbors(TITLES, GENRES, DIRECTORS, top_n=3)
+    path = str(tmp_path / "neighbors.npz")
+    NeighborIndex(path).save(TITLES, neighbors, scores)
+
+    index = NeighborIndex(path).load()
+    assert index.recommend("기생충", k=1) == ["마더"]
+    # 검색된 영화 자체는 추천에서 제외
+    assert index.recommend_many(["기생충", "마더"], k=5) == ["살인의 추억"]
+    assert index.recommend_many(["없는 영화"]) == []
+
+def test_missing_index_disables_recommendations(tmp_path):
+    index = NeighborIndex(str(tmp_path / "missing.npz")).load()
+    assert not index.loaded and index.recommend_many(["기생충"]) == []
+
+def test_load_is_noop_once_loaded(tmp_path):
+    """preload된 테이블을 lifespan에서 다시 읽지 않는지 검증 (워커 간 copy-on-write 공유)"""
+    neighbors, scores = compute_neighbors(TITLES, GENRES, DIRECTORS, top_n=3)
+    path = str(tmp_path / "neighbors.npz")
+    NeighborIndex(path).save(TITLES, neighbors, scores)
+
+    index = NeighborIndex(path).load()
+    titles = index.titles
+    assert index.load() is index and index.titles is titles
+
+def test_index_reloads_when_file_or_ingest_stamp_changes(tmp_path):
+    """npz가 다시 만들어지거나 인제션 스탬프가 바뀌면 서빙 중에도 새 테이블을 읽는지 검증"""
+    import os
+    from cine_analyst.rag.cache import notify_ingested
+
+    path = str(tmp_path / "neighbors.npz")
+    stamp_path = str(tmp_path / "ingest.stamp")
+    neighbors, scores = compute_neighbors(TITLES, GENRES, DIRECTORS, top_n=3)
+    NeighborIndex(path).save(TITLES, neighbors, scores)
+    index = NeighborIndex(path, stamp_path=stamp_path).load()
+    assert index.recommend_many(["기생충"], k=1) == ["마더"]
+
+    # cine-neighbors 재실행: 파일 mtime 변경 (stat은 1초에 한 번이므로 확인 시각을 되돌림)
+    titles = ["기생충", "괴물"]
+    neighbors, scores = compute_neighbors(titles, [["드라마"], ["드라마"]], [["봉준호"], ["봉준호"]], top_n=1)
+    NeighborIndex(path).save(titles, neighbors, scores)
+    os.utime(path, (1, 1))
+    index.file_stamp.checked_at -= 2
+    assert index.recommend_many(["기생충"], k=1) == ["괴물"]
+
+    # 같은 프로세스의 인제션 훅도 다음 조회에서 다시 읽게 함
+    NeighborIndex(path).save(TITLES, *compute_neighbors(TITLES, GENRES, DIRECTORS, top_n=3))
+    notify_ingested(stamp_path)
+    assert index.recommend_many(["기생충"], k=1) == ["마더"]
@@ -2,6 +2,7 @@ import os
 import json
 from cine_analyst.data.preprocessor import preprocess_for_training
 
+
 def test_preprocess_logic(mock_movie_df, tmp_path):
     """임의 데이터를 통한 JSONL 변환 로직 검증"""
     raw_path = tmp_path / "raw.csv"
@@ -13,4 +14,42 @@ def test_preprocess_logic(mock_movie_df, tmp_path):
     assert os.path.exists(processed_path)
     with open(processed_path, 'r') as f:
         first_line = json.loads(f.readline())
-        assert "messages" in first_line # 스키마 구조 확인
\ No newline at end of file
+        assert "messages" in first_line # 스키마 구조 확인
+
+
+def test_vectorized_lines_match_training_example_schema(mock_movie_df):
+    """문자열 템플릿으로 만든 라인이 TrainingExample 직렬화 결과와 동일한지 검증"""
+    import pandas as pd
+    from cine_analyst.common.schemas import TrainingExample
+    from cine_analyst.data.preprocessor import build_jsonl_lines, SYSTEM_PROMPT
+
+    df = pd.concat([mock_movie_df, pd.DataFrame({'title': ['Short'], 'overview': ['짧음'], 'genres': ['[]']})])
+    lines = build_jsonl_lines(df).tolist()
+    assert len(lines) == 2  # 10자 미만 overview 제외
+
+    row = mock_movie_df.iloc[0]
+    expected = TrainingExample(messages=[
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Title: {row['title']}\nGenres: {row['genres']}\nOverview: {row['overview']}"},
+        {"role": "assistant", "content": json.dumps({
+            "summary": row['overview'][:50] + "...",
+            "analysis": "This movie features strong narrative elements."
+        }, ensure_ascii=False)}
+    ])
+    assert lines[0] == json.dumps(expected.model_dump(), ensure_ascii=False) + '\n'
+
+
+def test_preprocess_sharded_output(mock_movie_df, tmp_path):
+    """샤드 출력 시 행이 라운드로빈으로 나뉘는지 검증"""
+    import pandas as pd
+
+    raw_path = tmp_path / "raw.csv"
+    pd.concat([mock_movie_df] * 3).to_csv(raw_path, index=False)
+
+    written = preprocess_for_training(
+        input_path=str(raw_path), output_path=str(tmp_path / "train.jsonl"), num_shards=4, chunk_size=4
+    )
+
+    assert written == 6
+    counts = [len(open(tmp_path / f"train-{i:05d}-of-00004.jsonl").readlines()) for i in range(4)]
+    assert counts == [2, 2, 1, 1]
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError
+from cine_analyst.rag.registry import StoreRegistry
+
+def test_registry_reuses_pooled_store():
+    """같은 저장소 인스턴스를 재사용하고 사용 현황을 집계하는지 검증"""
+    vector_factory = MagicMock()
+    registry = StoreRegistry(vector_factory=vector_factory, graph_factory=MagicMock())
+
+    for _ in range(3):
+        with registry.lease("vector") as store:
+            store.search("쿼리", k=3)
+
+    vector_factory.assert_called_once()
+    stats = registry.stats()["vector"]
+    assert stats["acquired"] == 3
+    assert stats["in_use"] == 0
+
+    registry.shutdown()
+    vector_factory.return_value.close.assert_called_once()
+
+def test_registry_replaces_store_only_after_repeated_connection_errors():
+    """일시적인 연결 오류로는 공유 클라이언트를 닫지 않고, 연속 오류 시에만 교체 후 마지막 임대 반납 때 닫는지 검증"""
+    vector_factory = MagicMock(side_effect=lambda: MagicMock())
+    registry = StoreRegistry(vector_factory=vector_factory, graph_factory=MagicMock(), reset_after_failures=2)
+
+    with registry.lease("vector") as in_flight:
+        with pytest.raises(OpenSearchConnectionError):
+            with registry.lease("vector"):
+                raise OpenSearchConnectionError("N/A", "down", None)
+        assert vector_factory.call_count == 1
+
+        with pytest.raises(OpenSearchConnectionError):
+            with registry.lease("vector"):
+                raise OpenSearchConnectionError("N/A", "down", None)
+        # 교체되었지만 아직 임대 중인 이전 클라이언트는 닫지 않음
+        in_flight.close.assert_not_called()
+        with registry.lease("vector") as replacement:
+            assert replacement is not in_flight
+    in_flight.close.assert_called_once()
+
+    assert vector_factory.call_count == 2
+    assert registry.stats()["vector"]["resets"] == 1
+
+async def test_registry_sync_and_async_leases_share_one_budget():
+    """동기/비동기 임대가 같은 슬롯 예산을 쓰는지 검증 (합쳐서 풀 크기를 넘지 않음)"""
+    import asyncio, threading
+    registry = StoreRegistry(vector_factory=MagicMock(), graph_factory=MagicMock())
+    size = registry.metrics["vector"].size
+    release = threading.Event()
+
+    def hold():
+        with registry.lease("vector"):
+            release.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(size)]
+    for t in threads:
+        t.start()
+    while registry.stats()["vector"]["in_use"] < size:
+        await asyncio.sleep(0.01)
+
+    async def use():
+        async with registry.alease("vector"):
+            return registry.stats()["vector"]["in_use"]
+
+    waiting = asyncio.create_task(use())
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    release.set()
+    assert await asyncio.wait_for(waiting, timeout=5) <= size
+    for t in threads:
+        t.join()
+    assert registry.stats()["vector"]["peak_in_use"] == size
+
+async def test_registry_async_lease_and_shutdown():
+    """비동기 임대 경로와 aclose 기반 종료 검증"""
+    vector_factory = MagicMock()
+    vector_factory.return_value.aclose = AsyncMock()
+    registry = StoreRegistry(vector_factory=vector_factory, graph_factory=MagicMock())
+
+    async with registry.alease("vector") as store:
+        assert store is vector_factory.return_value
+        assert registry.stats()["vector"]["in_use"] == 1
+
+    await registry.ashutdown()
+    vector_factory.return_value.aclose.assert_awaited_once()
+
+async def test_registry_warm_up_isolates_store_failures():
+    """한 저장소의 워밍업이 실패해도 다른 저장소는 준비되는지 검증"""
+    vector_factory, graph_factory = MagicMock(), MagicMock()
+    vector_factory.return_value.awarm_up = AsyncMock(side_effect=ConnectionError("OpenSearch down"))
+    graph_factory.return_value.awarm_up = AsyncMock()
+    registry = StoreRegistry(vector_factory=vector_factory, graph_factory=graph_factory)
+
+    await registry.awarm_up()
+
+    vector_factory.return_value.awarm_up.assert_awaited_once()
+    graph_factory.return_value.awarm_up.assert_awaited_once()
+
+async def test_warm_up_runs_steps_and_survives_failures():
+    """워밍업이 저장소 연결을 미리 열고, 일부 단계가 실패해도 계속 진행하는지 검증"""
+    from unittest.mock import AsyncMock, patch
+    from cine_analyst.app import warmup
+
+    with patch.object(warmup.stores, "awarm_up", AsyncMock()) as mock_stores, \
+         patch.object(warmup, "_warm_llm", AsyncMock(side_effect=ConnectionError("vLLM down"))), \
+         patch.object(warmup, "_warm_tokenizer", AsyncMock()), \
+         patch.object(warmup, "_warm_embedder", AsyncMock()) as mock_embedder, \
+         patch.object(warmup, "_needs_embedder", return_value=True):
+        timings = await warmup.warm_up()
+
+    mock_stores.assert_awaited_once()
+    mock_embedder.assert_awaited_once()
+    assert set(timings) == {"stores", "tokenizer", "llm", "embedder", "total"}
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from cine_analyst.common.resilience import CircuitBreaker, CircuitOpen, hedged
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def _fail():
+    raise ConnectionError("backend down")
+
+async def _ok():
+    return "ok"
+
+async def test_breaker_opens_then_probes_half_open():
+    """연속 실패 → open(즉시 실패) → reset_timeout 후 half-open 시험 호출 1개 → 결과에 따라 closed/open"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("vector", failure_threshold=2, reset_timeout=10.0, half_open_probes=1, clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        await breaker.call(_ok)
+
+    clock.now = 10.0
+    assert breaker.state == "half_open"
+    probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(0.01, "ok")))
+    await asyncio.sleep(0)
+    # 시험 호출이 진행 중이면 추가 호출은 차단
+    with pytest.raises(CircuitOpen):
+        await breaker.call(_ok)
+    assert await probe == "ok"
+    assert breaker.state == "closed"
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+    clock.now = 25.0
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    # half-open 시험 실패는 곧바로 다시 open
+    assert breaker.state == "open" and breaker.snapshot()["opened"] == 3
+
+async def test_breaker_counts_deadline_as_failure():
+    breaker = CircuitBreaker("graph", failure_threshold=1)
+    with pytest.raises(asyncio.TimeoutError):
+        await breaker.call(lambda: asyncio.sleep(1.0), timeout=0.01)
+    assert breaker.state == "open"
+
+async def test_hedged_request_wins_over_stalled_call():
+    """첫 호출이 멈추면 hedge_after 이후 보낸 두 번째 호출 결과를 쓰고 첫 호출은 취소"""
+    breaker = CircuitBreaker("vector")
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(10.0)
+            return "stalled"
+        return "hedge"
+
+    assert await asyncio.wait_for(hedged(call, hedge_after=0.01, breaker=breaker), timeout=1.0) == "hedge"
+    assert len(attempts) == 2
+    assert breaker.hedged == breaker.hedge_wins == 1
+
+async def test_retrieval_circuit_opens_with_fault_injecting_stand_in():
+    """오류를 주입하는 OpenSearch 대역으로 차단기가 열리고, 이후 검색은 저장소를 호출하지 않고 빈 결과"""
+    from cine_analyst.app.agents.workflow import _retrieve_branch
+    from cine_analyst.bench.load import LatencyModel, StubVectorStore
+    from cine_analyst.common.resilience import breakers
+    from cine_analyst.rag.registry import stores
+
+    class CountingStore(StubVectorStore):
+        calls = 0
+
+        async def asearch(self, query, k=5):
+            CountingStore.calls += 1
+            return await super().asearch(query, k)
+
+    previous = stores.set_factory("vector", lambda: CountingStore(LatencyModel(median_ms=1.0, error_rate=1.0)))
+    try:
+        breaker = breakers.get("vector")
+        for _ in range(breaker.failure_threshold + 3):
+            assert await _retrieve_branch("vector", "기생충", timeout=1.0) == []
+    finally:
+        stores.set_factory("vector", previous)
+
+    assert CountingStore.calls == breaker.failure_threshold
+    assert breaker.snapshot()["state"] == "open"
+    assert breaker.snapshot()["short_circuited"] == 3
+
+async def test_retrieval_cache_hits_are_not_latency_samples():
+    """검색 캐시 적중은 차단기를 거치지 않아 헤지 기준 지연 표본에 섞이지 않음"""
+    from cine_analyst.app.agents.workflow import _retrieve
+    from cine_analyst.bench.load import LatencyModel, StubVectorStore
+    from cine_analyst.common.resilience import breakers
+    from cine_analyst.rag.cache import CachedVectorStore
+    from cine_analyst.rag.registry import stores
+
+    previous = stores.set_factory("vector", lambda: CachedVectorStore(StubVectorStore(LatencyModel(median_ms=20.0, sigma=0.0))))
+    try:
+        breaker = breakers.get("vector")
+        first = await _retrieve("vector", "기생충", timeout=1.0)
+        for _ in range(5):
+            assert await _retrieve("vector", "기생충", timeout=1.0) == first
+    finally:
+        stores.set_factory("vector", previous)
+
+    assert len(breaker.latencies) == 1
+    assert breaker.percentile(min_samples=1) >= 0.01
+
+async def test_retrieval_circuit_opens_when_stand_in_stalls(monkeypatch):
+    """멈춘 그래프 대역: 병렬 검색 노드의 브랜치 타임아웃이 차단기 실패로 집계되어 차단기가 열림"""
+    from langchain_core.messages import HumanMessage
+    from cine_analyst.app.agents.workflow import parallel_retrieve_node, settings
+    from cine_analyst.bench.load import LatencyModel, StubGraphStore, StubVectorStore
+    from cine_analyst.common.resilience import breakers
+    from cine_analyst.rag.registry import stores
+
+    monkeypatch.setattr(settings, "GRAPH_RETRIEVE_TIMEOUT", 0.05)
+    monkeypatch.setattr(settings, "RETRIEVAL_BUDGET", 0.2)
+    previous = {
+        "vector": stores.set_factory("vector", lambda: StubVectorStore(LatencyModel(median_ms=1.0))),
+        "graph": stores.set_factory("graph", lambda: StubGraphStore(LatencyModel(stall_rate=1.0, stall_ms=5000))),
+    }
+    state = {"messages": [HumanMessage(content="기생충")], "next_step": "vector"}
+    try:
+        breaker = breakers.get("graph")
+        for _ in range(breaker.failure_threshold):
+            result = await parallel_retrieve_node(state)
+            assert result["retrieved_context"]
+    finally:
+        for kind, factory in previous.items():
+            stores.set_factory(kind, factory)
+
+    assert breaker.snapshot()["state"] == "open"
+    assert breaker.snapshot()["failures"] == breaker.failure_threshold
+    assert breakers.get("vector").snapshot()["state"] == "closed"
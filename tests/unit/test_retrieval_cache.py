@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock, AsyncMock
+from cine_analyst.rag.cache import CachedGraphStore, CachedVectorStore, notify_ingested
+
+def test_cached_vector_store_memoizes_and_invalidates(tmp_path):
+    """같은 질의는 한 번만 조회하고, 인제션 훅 이후에는 다시 조회하는지 검증"""
+    inner = MagicMock()
+    inner.search.return_value = [{"title": "기생충"}]
+    store = CachedVectorStore(inner, ttl=60, maxsize=8, stamp_path=str(tmp_path / "ingest.stamp"))
+
+    assert store.search("기생충", k=3) == [{"title": "기생충"}]
+    store.search("기생충", k=3)
+    inner.search.assert_called_once()
+
+    notify_ingested(stamp_path=str(tmp_path / "ingest.stamp"))
+    store.search("기생충", k=3)
+    assert inner.search.call_count == 2
+
+async def test_cached_graph_store_detects_external_ingestion(tmp_path):
+    """다른 프로세스의 인제션(스탬프 파일 변경)을 감지해 캐시를 비우는지 검증"""
+    stamp = tmp_path / "ingest.stamp"
+    inner = MagicMock()
+    inner.asearch = AsyncMock(return_value=["마더"])
+    store = CachedGraphStore(inner, ttl=60, maxsize=8, stamp_path=str(stamp))
+
+    await store.asearch("기생충", k=3)
+    await store.asearch("기생충", k=3)
+    inner.asearch.assert_awaited_once()
+
+    stamp.write_text("1")
+    store.stamp.checked_at = 0  # 확인 주기 경과로 간주
+    await store.asearch("기생충", k=3)
+    assert inner.asearch.await_count == 2
@@ -0,0 +1,35 @@
+import time
+from cine_analyst.app import server
+from cine_analyst.app.server import WorkerTable
+
+def test_worker_table_reports_stale_heartbeat_as_unhealthy():
+    """heartbeat가 끊긴 워커와 아직 뜨지 않은 워커는 unhealthy로 보고되는지 검증"""
+    table = WorkerTable(3)
+    now = time.time()
+    table.set(0, "pid", 101)
+    table.set(0, "started_at", now - 10)
+    table.set(0, "heartbeat", now)
+    table.set(1, "pid", 102)
+    table.set(1, "started_at", now - 100)
+    table.set(1, "heartbeat", now - 90)
+    table.incr(1, "restarts")
+
+    workers = table.snapshot(heartbeat_timeout=60)
+    assert [w["healthy"] for w in workers] == [True, False, False]
+    assert workers[1]["restarts"] == 1
+    assert workers[2]["heartbeat_age_s"] is None
+
+def test_worker_status_counts_requests_per_worker(monkeypatch):
+    assert server.worker_status() is None  # 단일 프로세스 모드
+
+    table = WorkerTable(2)
+    monkeypatch.setattr(server, "worker_table", table)
+    monkeypatch.setattr(server, "worker_index", 1)
+    server.record_request()
+    server.record_request()
+    server.heartbeat()
+
+    status = server.worker_status()
+    assert status["self"] == 1
+    assert status["workers"][1]["requests"] == 2
+    assert status["workers"][0]["requests"] == 0
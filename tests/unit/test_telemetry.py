@@ -0,0 +1,31 @@
+import pytest
+from cine_analyst.common.telemetry import Histogram, request_timings, span, start_request, traced_node
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "test", ("span",), (0.1, 1.0))
+    histogram.observe(0.05, span="a")
+    histogram.observe(0.5, span="a")
+    histogram.observe(5.0, span="a")
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{span="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{span="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{span="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{span="a"} 3' in lines
+
+async def test_spans_are_collected_per_request():
+    """노드 래퍼와 span이 요청 컨텍스트의 타이밍 목록에 기록되고, 예외도 기록 후 전파되는지 검증"""
+    request_id = start_request(user_id="bob")
+    assert request_id.startswith("bob-")
+
+    async def node(state):
+        with span("store.vector.search") as s:
+            s.size = 3
+        return {"ok": True}
+
+    assert await traced_node("retrieve", node)({}) == {"ok": True}
+    with pytest.raises(ValueError):
+        with span("llm.chat"):
+            raise ValueError("boom")
+
+    assert set(request_timings()) == {"node.retrieve", "store.vector.search", "llm.chat"}
@@ -0,0 +1,67 @@
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock, patch
+from cine_analyst.rag.vector import VectorSearch, rrf_fuse
+
+def _hits(*ids):
+    return [{"_id": i, "_source": {"title": i}} for i in ids]
+
+def test_rrf_fuse_prefers_documents_ranked_by_both():
+    """두 검색기 모두에 등장한 문서가 상위로 올라오는지 검증"""
+    fused = rrf_fuse([_hits("a", "b", "c"), _hits("c", "d", "a")], k=2, rrf_k=60)
+    assert [doc["title"] for doc in fused] == ["a", "c"]
+
+def test_hybrid_search_uses_single_msearch():
+    """BM25와 kNN 질의를 _msearch 한 번으로 보내고 벡터 필드 없이 결과를 반환하는지 검증"""
+    store = VectorSearch(hybrid=True)
+    store.client = MagicMock()
+    store.client.msearch.return_value = {"responses": [{"hits": {"hits": _hits("a", "b")}}, {"hits": {"hits": _hits("b")}}]}
+
+    with patch("cine_analyst.rag.vector.embed_query", return_value=np.zeros(4, dtype=np.float32)):
+        results = store.search("기생충", k=2)
+
+    assert results == [{"title": "b"}, {"title": "a"}]
+    body = store.client.msearch.call_args.kwargs["body"]
+    assert len(body) == 4 and "knn" in body[3]["query"]
+    assert body[1]["_source"] == body[3]["_source"] == ["title", "overview"]
+    store.client.search.assert_not_called()
+
+async def test_hybrid_asearch_falls_back_to_bm25_when_embedding_fails():
+    store = VectorSearch(hybrid=True)
+    store._async_client = MagicMock()
+    store._async_client.search = AsyncMock(return_value={"hits": {"hits": _hits("a")}})
+
+    with patch("cine_analyst.rag.vector.embed_query", side_effect=RuntimeError("no model")):
+        assert await store.asearch("기생충", k=1) == [{"title": "a"}]
+    store._async_client.search.assert_awaited_once()
+
+async def test_asearch_batch_embeds_once_and_splits_msearch_responses():
+    """배치 검색이 encode 1회 + _msearch 1회로 처리되고 질의별 RRF 결과로 분리되는지 검증"""
+    store = VectorSearch(hybrid=True)
+    store._async_client = MagicMock()
+    store._async_client.msearch = AsyncMock(return_value={"responses": [
+        {"hits": {"hits": _hits("a", "b")}}, {"hits": {"hits": _hits("b")}},
+        {"hits": {"hits": _hits("c")}}, {"error": "knn failed"},
+    ]})
+
+    with patch("cine_analyst.rag.vector.embed_queries", return_value=np.zeros((2, 4), dtype=np.float32)) as mock_embed:
+        results = await store.asearch_batch(["기생충", "마더"], k=2)
+
+    assert results == [[{"title": "b"}, {"title": "a"}], [{"title": "c"}]]
+    mock_embed.assert_called_once_with(["기생충", "마더"])
+    body = store._async_client.msearch.await_args.kwargs["body"]
+    assert len(body) == 8 and "knn" in body[7]["query"]
+
+async def test_msearch_raises_when_every_sub_query_fails():
+    """하위 질의가 전부 실패하면 빈 결과 대신 예외로 올려 차단기가 장애를 집계하는지 검증"""
+    import pytest
+    from cine_analyst.rag.vector import MSearchFailed
+
+    store = VectorSearch(hybrid=True)
+    store._async_client = MagicMock()
+    store._async_client.msearch = AsyncMock(return_value={"responses": [
+        {"error": "index_not_found_exception"}, {"error": "index_not_found_exception"},
+    ]})
+
+    with patch("cine_analyst.rag.vector.embed_query", return_value=np.zeros(4, dtype=np.float32)):
+        with pytest.raises(MSearchFailed):
+            await store.asearch("기생충", k=2)